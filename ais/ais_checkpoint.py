@@ -0,0 +1,305 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_snapshot import save_snapshot, load_snapshot, SNAPSHOT_DTYPES, PathType
+
+
+# Delta log file of the checkpoint snapshot - snapshot filename with the suffix
+DELTA_SUFFIX = '.delta'
+# Delta record starts with the magic bytes, flags, number of rows, number of tracks & CRC-32 of the rows.
+DELTA_MAGIC = b'AISD'
+DELTA_HEADER = struct.Struct('<4sIIQI')
+# Delta record flag - tracks recorded before the delta are dropped (new fleet state is checkpointed)
+DELTA_RESET = 0x1
+# Delta record flag - the last record of the reset pass (the whole new fleet state is recorded)
+DELTA_COMPLETE = 0x2
+# Delta record columns - indices of tracks followed by items of all fleet state columns (fixed width)
+DELTA_COLUMNS = [('index', np.dtype('<u4'), ())] + [(name, SNAPSHOT_DTYPES[name], shape)
+                                                    for name, (_, shape) in FLEET_COLUMNS.items()]
+# Size of delta record data of a single track
+DELTA_ROW_SIZE = sum(dtype.itemsize * int(np.prod(shape)) for _, dtype, shape in DELTA_COLUMNS)
+
+DeltaRows = Dict[str, np.ndarray]
+
+
+def get_delta_path(filename: PathType) -> Path:
+    """
+    Returns path of the delta log of given checkpoint snapshot file.
+    """
+    path = Path(filename)
+    return path.with_name(f'{path.name}{DELTA_SUFFIX}')
+
+
+def read_delta_log(filename: PathType) -> Tuple[List[Tuple[DeltaRows, int, int]], int]:
+    """
+    Returns tuple - list of delta records (rows - dict of columns, number of tracks, flags) and size of the valid
+    part of the delta log. Torn or corrupted record (e.g. written during a crash) ends the log.
+    """
+    path = Path(filename)
+    data = path.read_bytes() if path.exists() else b''
+    deltas = []
+    pos = 0
+    while pos + DELTA_HEADER.size <= len(data):
+        magic, flags, rows_count, size, crc = DELTA_HEADER.unpack_from(data, pos)
+        start = pos + DELTA_HEADER.size
+        end = start + rows_count * DELTA_ROW_SIZE
+        if magic != DELTA_MAGIC or end > len(data) or zlib.crc32(data[start:end]) != crc:
+            break
+        rows = {}
+        for name, dtype, shape in DELTA_COLUMNS:
+            count = rows_count * int(np.prod(shape))
+            rows[name] = np.frombuffer(data, dtype=dtype, count=count, offset=start).reshape((rows_count,) + shape)
+            start += count * dtype.itemsize
+        deltas.append((rows, size, flags))
+        pos = end
+    return deltas, pos
+
+
+def restore_checkpoint(filename: PathType) -> FleetState:
+    """
+    Returns fleet state restored from checkpoint - snapshot file (if exists) with applied delta log records.
+    The snapshot is memory-mapped (copy-on-write). Reset pass records replace the fleet state only if the pass
+    is complete - the previous state is kept, if the pass was torn (e.g. by a crash).
+    """
+    path = Path(filename)
+    fleet = load_snapshot(filename=path) if path.exists() else FleetState()
+    # Fleet state of the reset pass (replaces the fleet state, when the pass is complete)
+    pass_fleet: Optional[FleetState] = None
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    for rows, size, flags in deltas:
+        if flags & DELTA_RESET:
+            pass_fleet = FleetState()
+        target = fleet if pass_fleet is None else pass_fleet
+        target.set_rows(indices=rows['index'], rows=rows, size=size)
+        if pass_fleet is not None and flags & DELTA_COMPLETE:
+            fleet = pass_fleet
+            pass_fleet = None
+    return fleet
+
+
+class CheckpointStats:
+    """
+    Class represents checkpointer statistics. Pause is the time of copying changed tracks in the emit loop.
+    """
+    def __init__(self) -> None:
+        self.checkpoints = 0
+        self.rows = 0
+        self.bytes = 0
+        self.compactions = 0
+        self.errors = 0
+        self.max_pause = 0.0
+        self.total_pause = 0.0
+
+    def __str__(self) -> str:
+        mean_pause = self.total_pause / self.checkpoints if self.checkpoints else 0
+        return f'{self.checkpoints} checkpoints, {self.rows} rows ({self.bytes / 1e6:.1f} MB) written, ' \
+               f'{self.compactions} compactions, {self.errors} errors, ' \
+               f'pause mean {mean_pause * 1e3:.2f} ms / max {self.max_pause * 1e3:.2f} ms'
+
+
+class Checkpointer:
+    """
+    Class represents background checkpointer of fleet state. Tracks changed since the last checkpoint are copied
+    (double-buffered) into delta records (columns of fixed-width items), which are appended to the delta log
+    by the writer thread.
+    The emit loop pause is bounded - tracks changed since the last checkpoint are taken as a generation (the marks
+    are cleared) and at most max_rows tracks of the generation are copied at once, the remaining ones are copied
+    with the next calls. Tracks changed meanwhile are marked for the next generation, so every changed track is
+    copied, even if some tracks change with every call. The whole fleet state (first checkpoint or resync after write error) is recorded
+    by a reset pass of records - the last one is flagged complete, torn pass is not restored.
+    The writer thread compacts the log into the snapshot file (snapshot with applied delta records), when the log
+    is larger than compact_ratio of the snapshot (and no reset pass is in progress) - the live fleet state is not used.
+    """
+    def __init__(self, fleet: FleetState, filename: PathType, interval: float = 60.0, max_rows: int = 25000,
+                 compact_ratio: float = 1.0) -> None:
+        self.fleet = fleet
+        self.path = Path(filename)
+        self.delta_path = get_delta_path(filename=filename)
+        self.interval = interval
+        self.max_rows = max_rows
+        self.compact_ratio = compact_ratio
+        self.stats = CheckpointStats()
+        self.last_error: Optional[Exception] = None
+        self._next_due: Optional[float] = None
+        # Indices of changed tracks of the checkpoint left for the next calls (None - no checkpoint in progress)
+        self._generation: Optional[np.ndarray] = None
+        # Changed tracks left for the next call (more than max_rows tracks changed)
+        self._pending = False
+        # The whole fleet state is checkpointed first - tracks recorded before are dropped
+        self._reset = True
+        # Reset pass records are queued (the last record is not queued yet)
+        self._in_pass = False
+        # Delta record was not written (OS error) - the whole fleet state is checkpointed again
+        self._resync = False
+        # Writer thread drops records until the reset pass of the resync (used only by the writer thread)
+        self._skip = False
+        # Reset pass records are written (the last record is not written yet, used only by the writer thread)
+        self._writing_pass = False
+        fleet.mark_dirty()
+        # Torn record at the end of the log (e.g. crash during write) is dropped, so new records can be read
+        _, valid_size = read_delta_log(filename=self.delta_path)
+        if self.delta_path.exists() and self.delta_path.stat().st_size != valid_size:
+            os.truncate(self.delta_path, valid_size)
+        self._queue: queue.Queue = queue.Queue(maxsize=2)
+        self._thread = threading.Thread(target=self._write_loop, name='checkpointer', daemon=True)
+        self._thread.start()
+
+    def checkpoint(self, now: float) -> bool:
+        """
+        Copies tracks changed since the last checkpoint and queues them for the writer thread, if the checkpoint
+        is due (or changed tracks are left from the last call). Should be called by the thread which changes
+        the fleet state. Returns True, if the delta record was queued.
+        """
+        if self._next_due is None:
+            self._next_due = now
+        if now < self._next_due and not self._pending:
+            return False
+        if self._queue.full():
+            # Writer thread is behind - retry with next call
+            return False
+        start = time.perf_counter()
+        queued = self._queue_rows(max_rows=self.max_rows)
+        pause = time.perf_counter() - start
+        if not self._pending:
+            self._next_due = now + self.interval
+        if queued:
+            self.stats.checkpoints += 1
+            self.stats.total_pause += pause
+            self.stats.max_pause = max(self.stats.max_pause, pause)
+        return queued
+
+    def _queue_rows(self, max_rows: Optional[int]) -> bool:
+        """
+        Copies changed tracks (at most max_rows) into delta record rows and queues them for the writer thread.
+        Without max_rows, the rest of the generation and all tracks changed meanwhile are copied.
+        """
+        fleet = self.fleet
+        if self._resync:
+            self._resync = False
+            self._reset = True
+            self._generation = None
+            fleet.mark_dirty()
+        if self._generation is None:
+            self._generation = fleet.take_dirty()
+        elif max_rows is None:
+            self._generation = np.union1d(self._generation, fleet.take_dirty())
+        indices = self._generation[:max_rows]
+        self._generation = self._generation[len(indices):]
+        self._pending = len(self._generation) > 0
+        if not self._pending:
+            self._generation = None
+        if self._reset:
+            self._in_pass = True
+        elif not len(indices):
+            return False
+        if len(indices) and indices[-1] - indices[0] + 1 == len(indices):
+            # Contiguous tracks (e.g. the whole fleet state) are copied with slices
+            indices = slice(int(indices[0]), int(indices[-1]) + 1)
+            rows = {'index': np.arange(indices.start, indices.stop, dtype=np.uint32)}
+        else:
+            rows = {'index': indices.astype(np.uint32)}
+        for name in FLEET_COLUMNS:
+            rows[name] = getattr(fleet, name)[indices].copy()
+        flags = DELTA_RESET if self._reset else 0
+        if self._in_pass and not self._pending:
+            flags |= DELTA_COMPLETE
+            self._in_pass = False
+        self._queue.put((rows, len(fleet), flags))
+        self._reset = False
+        return True
+
+    def flush(self) -> None:
+        """
+        Waits until queued delta records are written.
+        """
+        self._queue.join()
+
+    def close(self, compact: bool = True) -> None:
+        """
+        Writes all changed tracks, stops the writer thread and compacts the delta log into the snapshot file.
+        """
+        self._queue_rows(max_rows=None)
+        self._queue.put(None)
+        self._thread.join()
+        if compact:
+            self._run(self.compact)
+
+    def compact(self) -> None:
+        """
+        Replaces the snapshot file with the snapshot with applied delta records and clears the delta log.
+        """
+        save_snapshot(fleet=restore_checkpoint(filename=self.path), filename=self.path)
+        # Crash before clearing the log is safe - delta records are applied to the new snapshot again
+        with open(self.delta_path, 'wb'):
+            pass
+        self.stats.compactions += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                _, _, flags = item
+                if self._skip and not flags & DELTA_RESET:
+                    # Records queued before the resync - the whole fleet state is recorded again
+                    continue
+                self._skip = False
+                if not self._run(self._write_delta, *item):
+                    self._skip = True
+                    self._resync = True
+                    continue
+                if flags & DELTA_RESET:
+                    self._writing_pass = True
+                if flags & DELTA_COMPLETE:
+                    self._writing_pass = False
+                if not self._writing_pass and self._should_compact():
+                    self._run(self.compact)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, func, *args) -> bool:
+        """
+        Runs writer function - OS errors are counted (the emit loop is not stopped), the last one is kept.
+        Returns False, if the function failed.
+        """
+        try:
+            func(*args)
+        except OSError as error:
+            self.stats.errors += 1
+            self.last_error = error
+            return False
+        return True
+
+    def _write_delta(self, rows: DeltaRows, size: int, flags: int) -> None:
+        """
+        Appends delta record to the delta log (synced to disk).
+        """
+        columns = [np.ascontiguousarray(rows[name], dtype=dtype) for name, dtype, _ in DELTA_COLUMNS]
+        crc = 0
+        for column in columns:
+            crc = zlib.crc32(column.data, crc)
+        rows_count = len(rows['index'])
+        header = DELTA_HEADER.pack(DELTA_MAGIC, flags, rows_count, size, crc)
+        with open(self.delta_path, 'ab') as file:
+            file.write(header)
+            for column in columns:
+                file.write(column.data)
+            file.flush()
+            os.fsync(file.fileno())
+        self.stats.rows += rows_count
+        self.stats.bytes += len(header) + rows_count * DELTA_ROW_SIZE
+
+    def _should_compact(self) -> bool:
+        if not self.path.exists():
+            return True
+        return self.delta_path.stat().st_size > self.compact_ratio * self.path.stat().st_size
@@ -0,0 +1,324 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ais.ais_track import AISTrack, AISTrackList, AISTrackMsgMixin, TYPE_5_FIELDS
+from ais.ais_utils import ShipDimension, ShipEta, calculate_distances
+from ais.ais_motion import MotionModel, GeodesicMotionModel
+from nmea.nmea_msg import NMEAMessage
+from ais.constants import NavigationStatusEnum, ShipTypeEnum, FieldCharsCountEnum
+
+
+DIMENSION_ATTRS = ['to_bow', 'to_stern', 'to_port', 'to_starboard']
+ETA_ATTRS = ['month', 'day', 'hour', 'minute']
+
+# Fleet state columns - name: (dtype, item shape).
+FLEET_COLUMNS = {
+    # Dynamic data
+    'mmsi': (np.uint32, ()),
+    'nav_status': (np.uint8, ()),
+    'lon': (np.float64, ()),
+    'lat': (np.float64, ()),
+    'speed': (np.float64, ()),
+    'course': (np.float64, ()),
+    'true_heading': (np.uint16, ()),
+    'timestamp': (np.uint8, ()),
+    'updated_at': (np.float64, ()),
+    'seq_msg_id': (np.uint8, ()),
+    # Static and voyage related data
+    'imo': (np.uint32, ()),
+    'call_sign': (f'S{FieldCharsCountEnum.call_sign}', ()),
+    'ship_name': (f'S{FieldCharsCountEnum.ship_name}', ()),
+    'ship_type': (np.uint8, ()),
+    'dimension': (np.uint16, (len(DIMENSION_ATTRS),)),
+    'eta': (np.uint8, (len(ETA_ATTRS),)),
+    'draught': (np.float64, ()),
+    'destination': (f'S{FieldCharsCountEnum.destination}', ()),
+}
+
+
+class FleetColumn:
+    """
+    Descriptor exposing single item of a fleet state column as an AISTrack-like attribute.
+    """
+    def __init__(self, to_value: Callable = None, to_item: Callable = None, column: str = '') -> None:
+        self.to_value = to_value
+        self.to_item = to_item
+        self.column = column
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.column = self.column or name
+        self.type_5_field = self.column in TYPE_5_FIELDS
+
+    def __get__(self, view: Optional['AISTrackView'], owner) -> Any:
+        if view is None:
+            return self
+        item = view._fleet._data[self.column][view._index]
+        return self.to_value(item) if self.to_value else item
+
+    def __set__(self, view: 'AISTrackView', value: Any) -> None:
+        item = self.to_item(value) if self.to_item else value
+        view._fleet._data[self.column][view._index] = item
+        view._fleet._dirty[view._index] = True
+        if self.type_5_field:
+            # Static and voyage related data changed - invalidate cached AIS msg type 5
+            view._type_5_msg = None
+
+
+def _text_to_value(item: bytes) -> str:
+    return item.decode()
+
+
+def _text_to_item(value: str) -> bytes:
+    return value.encode()
+
+
+def _dimension_to_value(item: np.ndarray) -> ShipDimension:
+    return ShipDimension.construct(**dict(zip(DIMENSION_ATTRS, item.tolist())))
+
+
+def _dimension_to_item(value: ShipDimension) -> List[int]:
+    return [getattr(value, attr) for attr in DIMENSION_ATTRS]
+
+
+def _eta_to_value(item: np.ndarray) -> ShipEta:
+    return ShipEta.construct(**dict(zip(ETA_ATTRS, item.tolist())))
+
+
+def _eta_to_item(value: ShipEta) -> List[int]:
+    return [getattr(value, attr) for attr in ETA_ATTRS]
+
+
+class AISTrackView(AISTrackMsgMixin):
+    """
+    Class represents lightweight view of a single track stored in FleetState. It looks like an AISTrack object,
+    but reads and writes the fleet state columns directly (without pydantic validation).
+    """
+    __slots__ = ('_fleet', '_index')
+
+    mmsi = FleetColumn(to_value=int)
+    nav_status = FleetColumn(to_value=NavigationStatusEnum)
+    lon = FleetColumn(to_value=float)
+    lat = FleetColumn(to_value=float)
+    speed = FleetColumn(to_value=float)
+    course = FleetColumn(to_value=float)
+    true_heading = FleetColumn(to_value=int)
+    timestamp = FleetColumn(to_value=int)
+    _updated_at = FleetColumn(to_value=float, column='updated_at')
+    imo = FleetColumn(to_value=int)
+    call_sign = FleetColumn(to_value=_text_to_value, to_item=_text_to_item)
+    ship_name = FleetColumn(to_value=_text_to_value, to_item=_text_to_item)
+    ship_type = FleetColumn(to_value=ShipTypeEnum)
+    dimension = FleetColumn(to_value=_dimension_to_value, to_item=_dimension_to_item)
+    eta = FleetColumn(to_value=_eta_to_value, to_item=_eta_to_item)
+    draught = FleetColumn(to_value=float)
+    destination = FleetColumn(to_value=_text_to_value, to_item=_text_to_item)
+
+    def __init__(self, fleet: 'FleetState', index: int) -> None:
+        self._fleet = fleet
+        self._index = index
+
+    def __repr__(self) -> str:
+        return f'AISTrackView(index={self._index}, mmsi={self.mmsi})'
+
+    @property
+    def _type_5_msg(self) -> Optional[NMEAMessage]:
+        return self._fleet._type_5_msgs.get(self._index)
+
+    @_type_5_msg.setter
+    def _type_5_msg(self, msg: Optional[NMEAMessage]) -> None:
+        if msg is None:
+            self._fleet._type_5_msgs.pop(self._index, None)
+        else:
+            self._fleet._type_5_msgs[self._index] = msg
+
+    def _next_seq_msg_id(self) -> int:
+        """
+        Returns next sequential message ID (for multi-sentence NMEA messages).
+        """
+        seq_msg_ids = self._fleet._data['seq_msg_id']
+        current = int(seq_msg_ids[self._index])
+        seq_msg_ids[self._index] = (current + 1) % 10
+        self._fleet._dirty[self._index] = True
+        return current
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns track data as a dict (the same schema as AISTrack model). Fields with default values are excluded.
+        """
+        track = {}
+        for name, field in AISTrack.__fields__.items():
+            value = getattr(self, name)
+            if not field.required and value == field.default:
+                continue
+            track[name] = value.dict() if isinstance(value, (ShipDimension, ShipEta)) else value
+        return track
+
+
+class FleetState:
+    """
+    Class represents AIS tracks data stored as NumPy columns (struct of arrays).
+    The tracks are validated once (on load) by the AISTrack model, then the columns are the source of truth.
+    """
+    def __init__(self, capacity: int = 0) -> None:
+        self._size = 0
+        # Cached NMEA msgs with AIS msg type 5 - track index: msg
+        self._type_5_msgs: Dict[int, NMEAMessage] = {}
+        self._data: Dict[str, np.ndarray] = {
+            name: np.zeros((capacity,) + shape, dtype=dtype) for name, (dtype, shape) in FLEET_COLUMNS.items()
+        }
+        # Tracks changed since the last checkpoint
+        self._dirty = np.zeros(capacity, dtype=bool)
+
+    @classmethod
+    def from_track_list(cls, track_list: AISTrackList) -> 'FleetState':
+        """
+        Creates fleet state from validated AISTrackList object.
+        """
+        fleet = cls(capacity=len(track_list.tracks))
+        fleet.extend(tracks=track_list.tracks)
+        return fleet
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> 'FleetState':
+        """
+        Creates fleet state from columns of the same length (e.g. memory-mapped snapshot columns).
+        The columns are used as they are - not copied.
+        """
+        fleet = cls()
+        fleet._data = {name: columns[name] for name in FLEET_COLUMNS}
+        fleet._size = len(fleet._data['mmsi'])
+        fleet._dirty = np.zeros(fleet._size, dtype=bool)
+        return fleet
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        """
+        Returns column (NumPy array) with data of all tracks.
+        """
+        if name in FLEET_COLUMNS:
+            return self._data[name][:self._size]
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+    def __getitem__(self, index: int) -> AISTrackView:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('track index out of range')
+        return AISTrackView(fleet=self, index=index)
+
+    def __iter__(self) -> Iterator[AISTrackView]:
+        for index in range(self._size):
+            yield AISTrackView(fleet=self, index=index)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data['mmsi'])
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns number of bytes used by the fleet state columns.
+        """
+        return sum(column.nbytes for column in self._data.values())
+
+    def _reserve(self, capacity: int) -> None:
+        """
+        Grows columns to hold at least given number of tracks.
+        """
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        for name, column in self._data.items():
+            new_column = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            new_column[:self._size] = column[:self._size]
+            self._data[name] = new_column
+        dirty = np.zeros(capacity, dtype=bool)
+        dirty[:self._size] = self._dirty[:self._size]
+        self._dirty = dirty
+
+    def append(self, track: AISTrack) -> AISTrackView:
+        """
+        Appends validated AISTrack to the fleet state. Returns view of the appended track.
+        """
+        self._reserve(self._size + 1)
+        index = self._size
+        self._size += 1
+        view = AISTrackView(fleet=self, index=index)
+        for name in AISTrack.__fields__:
+            setattr(view, name, getattr(track, name))
+        view._updated_at = track._updated_at
+        # SequentialMsgId wraps on the next use, so its start can be 10
+        self._data['seq_msg_id'][index] = track._seq_msg_id.start % 10
+        return view
+
+    def extend(self, tracks: List[AISTrack]) -> None:
+        """
+        Appends validated AISTrack objects to the fleet state.
+        """
+        self._reserve(self._size + len(tracks))
+        for track in tracks:
+            self.append(track=track)
+
+    def update_positions(self, current_timestamp: float, motion_model: Optional[MotionModel] = None,
+                         indices: Optional[np.ndarray] = None) -> None:
+        """
+        Updates positions of all moving tracks (speed greater than 0) in one call. Only tracks with given indices
+        are updated, if indices are provided.
+        By default the exact WGS84 geodesic is used, other motion model can be selected to trade accuracy for speed.
+        """
+        motion_model = motion_model or GeodesicMotionModel()
+        if indices is None:
+            moving = np.flatnonzero(self.speed > 0)
+        else:
+            indices = np.asarray(indices, dtype=np.intp)
+            moving = indices[self.speed[indices] > 0]
+        if not len(moving):
+            return
+        distances = calculate_distances(last_timestamps=self.updated_at[moving],
+                                        current_timestamp=current_timestamp,
+                                        speeds=self.speed[moving])
+        lons, lats = motion_model.advance(lons=self.lon[moving],
+                                          lats=self.lat[moving],
+                                          courses=self.course[moving],
+                                          distances=distances)
+        self.lon[moving] = lons
+        self.lat[moving] = lats
+        self.updated_at[moving] = current_timestamp
+        self._dirty[moving] = True
+
+    def mark_dirty(self, indices: Optional[np.ndarray] = None) -> None:
+        """
+        Marks tracks with given indices (all tracks by default) as changed since the last checkpoint.
+        """
+        if indices is None:
+            self._dirty[:self._size] = True
+        else:
+            self._dirty[indices] = True
+
+    def take_dirty(self) -> np.ndarray:
+        """
+        Returns indices of tracks changed since the last checkpoint and clears their marks.
+        """
+        indices = np.flatnonzero(self._dirty[:self._size])
+        self._dirty[indices] = False
+        return indices
+
+    def set_rows(self, indices: np.ndarray, rows: Any, size: int) -> None:
+        """
+        Sets items of all columns of tracks with given indices (rows - column name to items mapping, e.g. NumPy
+        structured array) and resizes the fleet state to given number of tracks.
+        """
+        self._reserve(size)
+        self._size = size
+        for name in FLEET_COLUMNS:
+            self._data[name][indices] = rows[name]
+        self._type_5_msgs.clear()
+
+    def to_track_list(self) -> AISTrackList:
+        """
+        Converts fleet state to AISTrackList object.
+        """
+        return AISTrackList(tracks=[view.to_dict() for view in self])
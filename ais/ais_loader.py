@@ -0,0 +1,231 @@
+from json.decoder import WHITESPACE
+from typing import Any, Iterator, List, NamedTuple, Optional, TextIO
+import json
+import time
+
+from pydantic import ValidationError
+
+from ais.ais_track import AISTrack
+from ais.ais_fleet import FleetState
+
+
+# Key of the AIS tracks array in the JSON file
+TRACKS_KEY = 'tracks'
+# Number of chars read from the JSON file at once
+READ_CHUNK_SIZE = 1 << 16
+# Max size (in chars) of a single JSON array item - longer items are reported as invalid JSON
+MAX_ITEM_SIZE = 1 << 20
+
+
+class JSONArrayReader:
+    """
+    Class represents incremental reader of JSON array items. The array is placed under given key of the top-level
+    JSON object. The file is read in chunks and each item is decoded as soon as it is complete, so the memory usage
+    depends on the size of a single item - not on the size of the whole file.
+    """
+    def __init__(self, file: TextIO, key: str, chunk_size: int = READ_CHUNK_SIZE,
+                 max_item_size: int = MAX_ITEM_SIZE) -> None:
+        self.key = key
+        self._file = file
+        self._chunk_size = chunk_size
+        self._max_item_size = max_item_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        # Position of the buffer start in the file - chars offset, line number and offset of the line start
+        self._offset = 0
+        self._lines = 0
+        self._line_start = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yields decoded items of the array. Raises KeyError, if the top-level object has no such key.
+        """
+        self._expect(chars='{')
+        if self._next_char() == '}':
+            raise KeyError(self.key)
+        while True:
+            key = self._decode()
+            if not isinstance(key, str):
+                raise self._error(msg='Expecting property name enclosed in double quotes', pos=self._pos)
+            self._expect(chars=':')
+            if key == self.key:
+                break
+            # Skip value of other key
+            self._next_char()
+            self._decode()
+            if self._expect(chars=',}') == '}':
+                raise KeyError(self.key)
+            self._next_char()
+        self._expect(chars='[')
+        if self._next_char() == ']':
+            return
+        while True:
+            self._next_char()
+            yield self._decode()
+            if self._expect(chars=',]') == ']':
+                return
+
+    def _read(self) -> bool:
+        """
+        Reads next chunk of the file into the buffer (the consumed part of the buffer is dropped).
+        Returns False at the end of the file.
+        """
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        consumed = self._buffer[:self._pos]
+        newlines = consumed.count('\n')
+        if newlines:
+            self._lines += newlines
+            self._line_start = self._offset + consumed.rfind('\n') + 1
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        """
+        Returns next non-whitespace char (the char is not consumed) or empty str at the end of the file.
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars: str) -> str:
+        """
+        Consumes and returns next non-whitespace char, which should be one of given chars.
+        """
+        char = self._next_char()
+        if not char or char not in chars:
+            raise self._error(msg=f'Expecting {" or ".join(repr(item) for item in chars)} delimiter', pos=self._pos)
+        self._pos += 1
+        return char
+
+    def _decode(self) -> Any:
+        """
+        Decodes JSON value starting at the current position. More data is read, while the value is incomplete.
+        """
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as error:
+                if len(self._buffer) - self._pos <= self._max_item_size and self._read():
+                    continue
+                raise self._error(msg=error.msg, pos=error.pos)
+            # Number at the end of the buffer may be incomplete
+            if end == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _error(self, msg: str, pos: int) -> json.JSONDecodeError:
+        """
+        Returns JSON decode error with position in the whole file (the buffer holds only its part).
+        """
+        consumed = self._buffer[:pos]
+        newlines = consumed.count('\n')
+        line_start = self._offset + consumed.rfind('\n') + 1 if newlines else self._line_start
+        error = json.JSONDecodeError(msg, self._buffer, pos)
+        error.pos = self._offset + pos
+        error.lineno = self._lines + newlines + 1
+        error.colno = error.pos - line_start + 1
+        error.args = (f'{msg}: line {error.lineno} column {error.colno} (char {error.pos})',)
+        return error
+
+
+class TrackLoadError(NamedTuple):
+    """
+    Class represents validation error of single item of the tracks array (item numbers start from 1).
+    """
+    item_no: int
+    field: str
+    msg: str
+
+    def __str__(self) -> str:
+        return f'check item with no {self.item_no}, "{self.field}" {self.msg}'
+
+
+class TrackLoader:
+    """
+    Class represents streaming loader of AIS tracks from JSON file. The tracks array is parsed one item at a time,
+    each track is validated by the AISTrack model and appended to the fleet state. Invalid items are reported
+    (all their errors) and skipped - the loading is not stopped.
+    """
+    def __init__(self, filename: str, fleet: Optional[FleetState] = None, chunk_size: int = READ_CHUNK_SIZE) -> None:
+        self.filename = filename
+        self.fleet = fleet if fleet is not None else FleetState()
+        self.chunk_size = chunk_size
+        self.errors: List[TrackLoadError] = []
+        # Number of parsed items of the tracks array (valid and invalid)
+        self.items_count = 0
+        self.done = False
+        self._file: Optional[TextIO] = None
+        self._items: Optional[Iterator[Any]] = None
+
+    @property
+    def invalid_count(self) -> int:
+        """
+        Returns number of skipped (invalid) items.
+        """
+        return len({error.item_no for error in self.errors})
+
+    def load(self, max_items: Optional[int] = None, timeout: Optional[float] = None) -> range:
+        """
+        Loads next tracks - all remaining tracks by default, at most max_items items of the array or as many items
+        as possible within given time (in seconds). Returns range of fleet indices of the appended tracks.
+        Raises OSError, json.JSONDecodeError and KeyError (no tracks array) - the loader is closed then.
+        """
+        first_index = len(self.fleet)
+        if self.done:
+            return range(first_index, first_index)
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        try:
+            if self._items is None:
+                self._file = open(self.filename)
+                self._items = iter(JSONArrayReader(file=self._file, key=TRACKS_KEY, chunk_size=self.chunk_size))
+            loaded = 0
+            for item in self._items:
+                self.items_count += 1
+                self._add_track(item=item)
+                loaded += 1
+                if (max_items is not None and loaded >= max_items) or \
+                        (deadline is not None and time.perf_counter() >= deadline):
+                    break
+            else:
+                self.close()
+        except (OSError, ValueError, KeyError):
+            self.close()
+            raise
+        return range(first_index, len(self.fleet))
+
+    def _add_track(self, item: Any) -> None:
+        """
+        Validates single item of the tracks array and appends it to the fleet state (or records its errors).
+        """
+        try:
+            track = AISTrack.parse_obj(item)
+        except ValidationError as error:
+            for error_data in error.errors():
+                self.errors.append(TrackLoadError(item_no=self.items_count,
+                                                  field=str(error_data['loc'][-1]),
+                                                  msg=error_data['msg']))
+            return
+        self.fleet.append(track=track)
+
+    def close(self) -> None:
+        """
+        Closes the file and marks the loading as done.
+        """
+        self.done = True
+        self._items = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,167 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Type
+
+import numpy as np
+
+from ais.ais_utils import advance_positions, get_geod
+
+
+# WGS84 ellipsoid parameters
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+WGS84_E = np.sqrt(WGS84_E2)
+# Knots to m/s conversion.
+KNOT_MS = 0.514444444
+# Tracks moving beyond the latitude (polar band) are advanced along the geodesic - approximate models divide
+# by the cosine of latitude, which is close to 0 near the poles
+POLAR_LATITUDE = 85.0
+
+
+def _meridional_radius(lats_rad: np.ndarray) -> np.ndarray:
+    """
+    Returns WGS84 meridional radius of curvature (in meters) for given latitudes.
+    """
+    return WGS84_A * (1 - WGS84_E2) / (1 - WGS84_E2 * np.sin(lats_rad) ** 2) ** 1.5
+
+
+def _prime_vertical_radius(lats_rad: np.ndarray) -> np.ndarray:
+    """
+    Returns WGS84 prime vertical radius of curvature (in meters) for given latitudes.
+    """
+    return WGS84_A / np.sqrt(1 - WGS84_E2 * np.sin(lats_rad) ** 2)
+
+
+def _isometric_latitude(lats_rad: np.ndarray) -> np.ndarray:
+    """
+    Returns WGS84 isometric latitude for given latitudes.
+    """
+    sin_lats = np.sin(lats_rad)
+    return np.arctanh(sin_lats) - WGS84_E * np.arctanh(WGS84_E * sin_lats)
+
+
+def _normalize(lons: np.ndarray, lats: np.ndarray) -> tuple:
+    """
+    Wraps longitudes to -180 to 180 range and clips latitudes to -90 to 90 range.
+    """
+    return (lons + 180) % 360 - 180, np.clip(lats, -90, 90)
+
+
+class MotionModel(ABC):
+    """
+    Class represents an abstract motion model used to move AIS tracks (dead reckoning).
+    """
+    name = ''
+
+    @abstractmethod
+    def advance(self, lons, lats, courses, distances) -> tuple:
+        """
+        Calculates new coordinates based on distances and azimuths (ships courses).
+        Accepts scalars or arrays of equal length, returns tuple - (longitudes, latitudes).
+        """
+        pass
+
+    def max_error(self, step: float = 15, speed: float = 102.2, lat_limit: float = 90) -> float:
+        """
+        Returns maximum positional error (in meters) against the WGS84 geodesic after a single step (in seconds)
+        made with the given speed (in knots). The error is sampled over latitudes up to lat_limit (including
+        the polar band) and all courses.
+        """
+        lats = np.append(np.arange(-lat_limit, lat_limit, 5.0), lat_limit)
+        lats = np.union1d(lats, np.clip([-POLAR_LATITUDE, POLAR_LATITUDE], -lat_limit, lat_limit))
+        lats, courses = np.meshgrid(lats, np.arange(0, 360, 5.0))
+        lats, courses = lats.ravel(), courses.ravel()
+        lons = np.zeros_like(lats)
+        distances = np.full_like(lats, step * speed * KNOT_MS)
+        lons_exact, lats_exact = advance_positions(lons=lons, lats=lats, courses=courses, distances=distances)
+        lons_model, lats_model = self.advance(lons=lons, lats=lats, courses=courses, distances=distances)
+        _, _, errors = get_geod().inv(lons_exact, lats_exact, lons_model, lats_model)
+        return float(np.max(np.abs(errors)))
+
+
+def _advance_polar(lons, lats, courses, distances, lons_new, lats_new) -> tuple:
+    """
+    Returns coordinates calculated by an approximate motion model, in which tracks starting or ending in the polar
+    band (or with invalid coordinates) are advanced along the geodesic instead.
+    """
+    polar = (np.abs(lats) > POLAR_LATITUDE) | ~(np.abs(lats_new) <= POLAR_LATITUDE)
+    if not np.any(polar):
+        return _normalize(lons=lons_new, lats=lats_new)
+    if np.ndim(polar) == 0:
+        return advance_positions(lons=lons, lats=lats, courses=courses, distances=distances)
+    lons, lats, courses, distances = np.broadcast_arrays(lons, lats, courses, distances)
+    with np.errstate(invalid='ignore'):
+        lons_new, lats_new = _normalize(lons=lons_new, lats=lats_new)
+    lons_new[polar], lats_new[polar] = advance_positions(lons=lons[polar], lats=lats[polar], courses=courses[polar],
+                                                         distances=distances[polar])
+    return lons_new, lats_new
+
+
+class GeodesicMotionModel(MotionModel):
+    """
+    Class represents exact motion model - forward transformation along the WGS84 geodesic (pyproj Geod.fwd).
+    """
+    name = 'geodesic'
+
+    def advance(self, lons, lats, courses, distances) -> tuple:
+        return advance_positions(lons=lons, lats=lats, courses=courses, distances=distances)
+
+    def max_error(self, step: float = 15, speed: float = 102.2, lat_limit: float = 90) -> float:
+        return 0.0
+
+
+class TangentPlaneMotionModel(MotionModel):
+    """
+    Class represents flat-earth motion model - move in the local tangent plane (east, north) of the start point,
+    scaled with the WGS84 radii of curvature. Accurate for short steps away from the poles (the polar band
+    is handled by the geodesic).
+    """
+    name = 'tangent_plane'
+
+    def advance(self, lons, lats, courses, distances) -> tuple:
+        lats_rad, courses_rad = np.radians(lats), np.radians(courses)
+        north = distances * np.cos(courses_rad)
+        east = distances * np.sin(courses_rad)
+        lats_new = lats + np.degrees(north / _meridional_radius(lats_rad))
+        lons_new = lons + np.degrees(east / (_prime_vertical_radius(lats_rad) * np.cos(lats_rad)))
+        return _advance_polar(lons=lons, lats=lats, courses=courses, distances=distances, lons_new=lons_new,
+                              lats_new=lats_new)
+
+
+class RhumbLineMotionModel(MotionModel):
+    """
+    Class represents rhumb line (loxodrome) motion model - move with the constant course on the WGS84 ellipsoid.
+    The rhumb line spirals into the pole, so the polar band is handled by the geodesic.
+    """
+    name = 'rhumb_line'
+
+    def advance(self, lons, lats, courses, distances) -> tuple:
+        lats_rad, courses_rad = np.radians(lats), np.radians(courses)
+        # Isometric latitude of the poles is infinite - the polar band results are replaced
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lats_mid_rad = lats_rad + distances * np.cos(courses_rad) / (2 * _meridional_radius(lats_rad))
+            lats_new_rad = lats_rad + distances * np.cos(courses_rad) / _meridional_radius(lats_mid_rad)
+            delta_psi = _isometric_latitude(lats_new_rad) - _isometric_latitude(lats_rad)
+            # Course close to east or west - isometric latitude change too small to use
+            east_west = np.abs(delta_psi) < 1e-12
+            delta_lon_rad = np.where(east_west,
+                                     distances * np.sin(courses_rad) / (_prime_vertical_radius(lats_rad) *
+                                                                        np.cos(lats_rad)),
+                                     np.tan(courses_rad) * delta_psi)
+        return _advance_polar(lons=lons, lats=lats, courses=courses, distances=distances,
+                              lons_new=lons + np.degrees(delta_lon_rad), lats_new=np.degrees(lats_new_rad))
+
+
+MOTION_MODELS: Dict[str, Type[MotionModel]] = {
+    model.name: model for model in [GeodesicMotionModel, TangentPlaneMotionModel, RhumbLineMotionModel]
+}
+
+
+def get_motion_model(name: str = 'geodesic') -> MotionModel:
+    """
+    Returns motion model object with given name.
+    """
+    try:
+        return MOTION_MODELS[name]()
+    except KeyError:
+        raise ValueError(f'Invalid motion model {name}. Should be one of: {", ".join(MOTION_MODELS)}.')
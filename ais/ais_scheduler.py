@@ -0,0 +1,236 @@
+from typing import Any, Callable, Dict, List, Tuple
+import math
+import time
+
+from ais.ais_utils import get_reporting_interval, get_current_timestamp
+from ais.constants import ReportingIntervalEnum
+
+
+# AIS msg types handled by the scheduler
+MSG_TYPE_POSITION = 1
+MSG_TYPE_STATIC = 5
+# Fractional part of the golden ratio - first reports of tracks added one by one are spread with the additive
+# recurrence (offsets are evenly distributed without knowing the final number of tracks).
+GOLDEN_RATIO_FRACTION = (math.sqrt(5) - 1) / 2
+
+
+class SchedulerMetrics:
+    """
+    Class represents scheduler statistics - fired events, missed deadlines and lag (in seconds).
+    Events are fired with tick granularity, so an event misses its deadline only if it is fired more than
+    two ticks after its due time.
+    """
+    def __init__(self) -> None:
+        self.ticks = 0
+        self.overruns = 0
+        self.events = 0
+        self.missed_deadlines = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def add_event(self, lag: float, tick: float) -> None:
+        self.events += 1
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag > 2 * tick:
+            self.missed_deadlines += 1
+
+    def merge(self, other: 'SchedulerMetrics') -> None:
+        """
+        Adds statistics of other scheduler (e.g. of a shard generated by a worker process).
+        """
+        self.ticks += other.ticks
+        self.overruns += other.overruns
+        self.events += other.events
+        self.missed_deadlines += other.missed_deadlines
+        self.max_lag = max(self.max_lag, other.max_lag)
+        self.total_lag += other.total_lag
+
+    def as_dict(self) -> Dict[str, Any]:
+        metrics = dict(self.__dict__)
+        metrics['mean_lag'] = self.total_lag / self.events if self.events else 0.0
+        return metrics
+
+    def __str__(self) -> str:
+        metrics = self.as_dict()
+        return f'{metrics["events"]} events, {metrics["missed_deadlines"]} missed deadlines, ' \
+               f'lag mean {metrics["mean_lag"]:.3f} s / max {metrics["max_lag"]:.3f} s, ' \
+               f'{metrics["overruns"]} of {metrics["ticks"]} ticks overrun'
+
+
+class TimingWheel:
+    """
+    Class represents hashed timing wheel. Events are stored in the slot of their due tick, so adding an event and
+    firing it are O(1). Events due more than one wheel revolution ahead stay in their slot until their tick comes.
+    """
+    def __init__(self, tick: float, slots_count: int, start: float) -> None:
+        self.tick = tick
+        self.slots_count = slots_count
+        self.slots: List[List[Tuple[int, float, Any]]] = [[] for _ in range(slots_count)]
+        # The last processed tick
+        self.current_tick = math.floor(start / tick)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def schedule(self, due: float, item: Any) -> None:
+        """
+        Adds item due at the given time. Items already overdue are fired with the next tick.
+        """
+        due_tick = max(math.ceil(due / self.tick), self.current_tick + 1)
+        self.slots[due_tick % self.slots_count].append((due_tick, due, item))
+        self._size += 1
+
+    def _expire_slot(self, slot_index: int, tick: int) -> List[Tuple[int, float, Any]]:
+        """
+        Removes and returns items of the slot due at the given tick (or earlier).
+        """
+        slot = self.slots[slot_index]
+        if not slot:
+            return []
+        if all(entry[0] <= tick for entry in slot):
+            self.slots[slot_index] = []
+            return slot
+        expired = [entry for entry in slot if entry[0] <= tick]
+        self.slots[slot_index] = [entry for entry in slot if entry[0] > tick]
+        return expired
+
+    def advance(self, now: float) -> List[Tuple[float, Any]]:
+        """
+        Moves the wheel to the given time. Returns list of (due time, item) tuples due until now.
+        """
+        now_tick = math.floor(now / self.tick)
+        expired = []
+        if now_tick - self.current_tick >= self.slots_count:
+            # Wheel stopped for more than one revolution - check every slot once
+            for slot_index in range(self.slots_count):
+                expired += self._expire_slot(slot_index=slot_index, tick=now_tick)
+        else:
+            for tick in range(self.current_tick + 1, now_tick + 1):
+                expired += self._expire_slot(slot_index=tick % self.slots_count, tick=tick)
+        self.current_tick = max(self.current_tick, now_tick)
+        self._size -= len(expired)
+        return [(due, item) for _, due, item in expired]
+
+
+class Ticker:
+    """
+    Class represents drift-corrected periodic clock. Tick times are computed from the start time, so time spent
+    on processing does not accumulate. Overruns (ticks that started too late) are counted in the metrics.
+    """
+    def __init__(self, tick: float, metrics: SchedulerMetrics, clock: Callable[[], float] = get_current_timestamp,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.tick = tick
+        self.metrics = metrics
+        self.clock = clock
+        self.sleep = sleep
+        self.start = clock()
+        self.tick_number = 0
+
+    def next_delay(self) -> float:
+        """
+        Moves to the next tick. Returns delay (in seconds) until the tick - ticks missed because of the slow
+        processing are skipped.
+        """
+        self.tick_number += 1
+        self.metrics.ticks += 1
+        target = self.start + self.tick_number * self.tick
+        now = self.clock()
+        if now > target + self.tick:
+            self.metrics.overruns += 1
+            # Skip missed ticks
+            self.tick_number = math.floor((now - self.start) / self.tick)
+            return 0.0
+        return max(0.0, target - now)
+
+    def wait(self) -> float:
+        """
+        Sleeps until the next tick. Returns the current time.
+        """
+        delay = self.next_delay()
+        if delay > 0:
+            self.sleep(delay)
+        return self.clock()
+
+
+class ReportScheduler:
+    """
+    Class represents per-track AIS reports schedule kept in a timing wheel. Each report is a
+    (due time, track index, AIS msg type) tuple.
+    """
+    def __init__(self, start: float, tick: float = 0.5, slots_count: int = 1024) -> None:
+        self.tick = tick
+        self.metrics = SchedulerMetrics()
+        self._wheel = TimingWheel(tick=tick, slots_count=slots_count, start=start)
+        self._now = start
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    def schedule(self, due: float, track_index: int, msg_type: int) -> None:
+        """
+        Adds AIS report to the schedule.
+        """
+        self._wheel.schedule(due=due, item=(track_index, msg_type))
+
+    def schedule_tracks(self, fleet, start: float) -> None:
+        """
+        Adds first AIS reports of all fleet tracks. Reports are spread evenly over the reporting interval of each
+        track, so they are not sent in a synchronized burst.
+        """
+        tracks_count = len(fleet)
+        for index, (speed, nav_status) in enumerate(zip(fleet.speed.tolist(), fleet.nav_status.tolist())):
+            self._schedule_first_reports(start=start, offset=index / tracks_count, track_index=index,
+                                         speed=speed, nav_status=nav_status)
+
+    def schedule_new_tracks(self, fleet, start: float, indices: range) -> None:
+        """
+        Adds first AIS reports of fleet tracks with given indices (e.g. tracks appended while the fleet is still
+        being loaded). The final number of tracks is not known, so the reports are spread with the golden ratio
+        sequence of track indices.
+        """
+        speeds = fleet.speed[indices.start:indices.stop].tolist()
+        nav_statuses = fleet.nav_status[indices.start:indices.stop].tolist()
+        for index, speed, nav_status in zip(indices, speeds, nav_statuses):
+            self._schedule_first_reports(start=start, offset=(index * GOLDEN_RATIO_FRACTION) % 1, track_index=index,
+                                         speed=speed, nav_status=nav_status)
+
+    def _schedule_first_reports(self, start: float, offset: float, track_index: int, speed: float,
+                                nav_status: int) -> None:
+        """
+        Adds first position report and static data report of the track. Offset is a fraction of reporting intervals.
+        """
+        self.schedule(due=start + offset * get_reporting_interval(speed=speed, nav_status=nav_status),
+                      track_index=track_index,
+                      msg_type=MSG_TYPE_POSITION)
+        self.schedule(due=start + offset * ReportingIntervalEnum.static_data,
+                      track_index=track_index,
+                      msg_type=MSG_TYPE_STATIC)
+
+    def pop_due(self, now: float) -> List[Tuple[float, int, int]]:
+        """
+        Removes and returns all AIS reports due at the given time.
+        """
+        self._now = now
+        due_reports = []
+        for due, (track_index, msg_type) in self._wheel.advance(now=now):
+            self.metrics.add_event(lag=now - due, tick=self.tick)
+            due_reports.append((due, track_index, msg_type))
+        return due_reports
+
+    def reschedule(self, report: Tuple[float, int, int], fleet) -> None:
+        """
+        Adds next AIS report of the same type for the track. The interval is based on the current track data.
+        The report keeps its cadence, but intervals already missed (late report) are skipped.
+        """
+        due, index, msg_type = report
+        if msg_type == MSG_TYPE_POSITION:
+            interval = get_reporting_interval(speed=float(fleet.speed[index]), nav_status=int(fleet.nav_status[index]))
+        else:
+            interval = ReportingIntervalEnum.static_data
+        next_due = due + interval
+        if next_due <= self._now:
+            next_due += interval * (math.floor((self._now - next_due) / interval) + 1)
+        self.schedule(due=next_due, track_index=index, msg_type=msg_type)
@@ -0,0 +1,264 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+import multiprocessing
+import queue
+import signal
+
+import numpy as np
+
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_motion import MotionModel, get_motion_model
+from ais.ais_scheduler import ReportScheduler, Ticker, SchedulerMetrics, MSG_TYPE_POSITION
+from ais.ais_utils import get_current_timestamp
+from nmea.nmea_batch import encode_type1_batch
+from nmea.nmea_ring import SharedRingBuffer, RING_SLOTS_COUNT, RING_SLOT_SIZE
+
+
+# Time (in seconds) of waiting for the worker processes to exit, when the generation is stopped
+SHARD_STOP_TIMEOUT = 10.0
+# Interval (in seconds) of checking the worker processes results, while the ring buffers are read
+SHARD_POLL_INTERVAL = 0.01
+
+
+def get_shard_indices(fleet: FleetState, shards_count: int) -> List[np.ndarray]:
+    """
+    Returns list of track indices of each shard - tracks are partitioned by MMSI, so all reports of a vessel
+    are generated by the same shard.
+    """
+    shard_numbers = fleet.mmsi.astype(np.int64) % shards_count
+    return [np.flatnonzero(shard_numbers == shard) for shard in range(shards_count)]
+
+
+def generate_shard_msgs(fleet: FleetState, scheduler: ReportScheduler, now: float,
+                        motion_model: Optional[MotionModel] = None) -> List[bytes]:
+    """
+    Generates NMEA msgs for all AIS reports due at the given time and schedules the next reports. Position reports
+    of all due tracks are encoded at once (vectorized). Returns list of ready to send bytes - each item holds
+    whole msgs (sentences of multi-sentence msgs are not split).
+    """
+    due_reports = scheduler.pop_due(now=now)
+    position_indices = [index for _, index, msg_type in due_reports if msg_type == MSG_TYPE_POSITION]
+    nmea_msgs = []
+    if position_indices:
+        fleet.update_positions(current_timestamp=now, motion_model=motion_model, indices=position_indices)
+        indices = np.asarray(position_indices, dtype=np.intp)
+        nmea_msgs.append(encode_type1_batch(mmsi=fleet.mmsi[indices],
+                                            lon=fleet.lon[indices],
+                                            lat=fleet.lat[indices],
+                                            speed=fleet.speed[indices],
+                                            course=fleet.course[indices],
+                                            heading=fleet.true_heading[indices],
+                                            nav_status=fleet.nav_status[indices],
+                                            timestamp=fleet.timestamp[indices],
+                                            as_bytes=True))
+    for report in due_reports:
+        _, index, msg_type = report
+        if msg_type != MSG_TYPE_POSITION:
+            nmea_msgs.append(b''.join(fleet[index].generate_nmea_type_5(as_bytes=True)))
+        scheduler.reschedule(report=report, fleet=fleet)
+    return nmea_msgs
+
+
+def pack_msgs(nmea_msgs: Iterable[bytes], max_size: int) -> Iterator[bytes]:
+    """
+    Returns iterator of NMEA msgs packed into chunks up to given size. Items larger than max_size are split
+    at sentence ends - only items of single-sentence msgs (e.g. encoded position reports batch) can be larger.
+    """
+    chunk = []
+    chunk_size = 0
+    for item in nmea_msgs:
+        if chunk and chunk_size + len(item) > max_size:
+            yield b''.join(chunk)
+            chunk = []
+            chunk_size = 0
+        while len(item) > max_size:
+            end = item.rfind(b'\n', 0, max_size) + 1
+            if not end:
+                raise ValueError(f'NMEA msg size exceeds chunk size {max_size}')
+            yield item[:end]
+            item = item[end:]
+        chunk.append(item)
+        chunk_size += len(item)
+    if chunk:
+        yield b''.join(chunk)
+
+
+class SimulatedClock:
+    """
+    Class represents simulated clock - the time moves only by sleeping, so ticks are processed as fast as possible
+    (e.g. in tests and benchmarks).
+    """
+    def __init__(self, start: float) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, delay: float) -> None:
+        self.now += delay
+
+
+class ShardStats:
+    """
+    Class represents statistics of a single shard - generated msgs (sentences) and chunks dropped, when the sender
+    was not reading the ring buffer in time.
+    """
+    def __init__(self, shard: int, tracks: int) -> None:
+        self.shard = shard
+        self.tracks = tracks
+        self.msgs = 0
+        self.bytes = 0
+        self.dropped = 0
+
+    def __str__(self) -> str:
+        return f'{self.shard}: {self.tracks} tracks, {self.msgs} msgs ({self.bytes / 1e6:.1f} MB) generated, ' \
+               f'{self.dropped} chunks dropped'
+
+
+def _run_shard(shard: int, columns: Dict[str, np.ndarray], ring: SharedRingBuffer, stop, results,
+               motion_model: str, tick: float, start: float, clock: Optional[SimulatedClock],
+               ticks_count: Optional[int]) -> None:
+    """
+    Worker process - generates NMEA msgs of the shard tracks each tick (until stopped) and writes them into the ring
+    buffer. Shard tracks state, scheduler metrics and statistics are sent back with the results queue.
+    """
+    # Ctrl + c is handled by the sender process (which stops the workers)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    fleet = FleetState.from_columns(columns=columns)
+    stats = ShardStats(shard=shard, tracks=len(fleet))
+    scheduler = ReportScheduler(start=start, tick=tick)
+    scheduler.schedule_tracks(fleet=fleet, start=start)
+    if clock:
+        ticker = Ticker(tick=tick, metrics=scheduler.metrics, clock=clock, sleep=clock.sleep)
+    else:
+        ticker = Ticker(tick=tick, metrics=scheduler.metrics)
+    model = get_motion_model(name=motion_model)
+    try:
+        while not stop.is_set() and (ticks_count is None or ticker.tick_number < ticks_count):
+            nmea_msgs = generate_shard_msgs(fleet=fleet, scheduler=scheduler, now=ticker.wait(), motion_model=model)
+            for chunk in pack_msgs(nmea_msgs=nmea_msgs, max_size=ring.max_size):
+                # Sender is behind - the chunk is dropped after a tick (generation is not stopped)
+                if ring.put(data=chunk, timeout=tick):
+                    stats.msgs += chunk.count(b'\n')
+                    stats.bytes += len(chunk)
+                else:
+                    stats.dropped += 1
+    finally:
+        ring.close()
+        results.put((shard, {name: getattr(fleet, name) for name in FLEET_COLUMNS}, scheduler.metrics, stats))
+
+
+class ShardedGenerator:
+    """
+    Class represents NMEA msgs generation sharded across worker processes. Tracks are partitioned by MMSI, each
+    worker updates positions and encodes msgs of its own shard tracks and writes them into its shared memory ring
+    buffer, from which the sender process reads ready to send bytes.
+    Each track is owned by exactly one worker, so its sequential message IDs are allocated by a single process.
+    The shard tracks state is merged back into the fleet state, when the generation is stopped.
+    """
+    def __init__(self, fleet: FleetState, processes: int, motion_model: str = 'geodesic', tick: float = 0.5,
+                 clock: Optional[SimulatedClock] = None, ticks_count: Optional[int] = None,
+                 slots_count: int = RING_SLOTS_COUNT, slot_size: int = RING_SLOT_SIZE) -> None:
+        self.fleet = fleet
+        self.processes = processes
+        self.motion_model = motion_model
+        self.tick = tick
+        # Simulated clock and number of ticks, after which the workers stop (e.g. for benchmarks)
+        self.clock = clock
+        self.ticks_count = ticks_count
+        self.shard_indices = get_shard_indices(fleet=fleet, shards_count=processes)
+        self.metrics = SchedulerMetrics()
+        self.stats: List[ShardStats] = []
+        self._context = multiprocessing.get_context()
+        self._ready = self._context.Semaphore(0)
+        self._stop = self._context.Event()
+        self._results = self._context.Queue()
+        self._rings = [SharedRingBuffer(slots_count=slots_count, slot_size=slot_size, ready=self._ready,
+                                        context=self._context) for _ in range(processes)]
+        self._workers: List[multiprocessing.Process] = []
+
+    def start(self, start: Optional[float] = None) -> None:
+        """
+        Starts worker processes. First AIS reports of all tracks are scheduled from the given time (current
+        time by default).
+        """
+        if start is None:
+            start = self.clock() if self.clock else get_current_timestamp()
+        for shard, (indices, ring) in enumerate(zip(self.shard_indices, self._rings)):
+            columns = {name: getattr(self.fleet, name)[indices] for name in FLEET_COLUMNS}
+            worker = self._context.Process(target=_run_shard,
+                                           name=f'shard-{shard}',
+                                           kwargs=dict(shard=shard, columns=columns, ring=ring, stop=self._stop,
+                                                       results=self._results, motion_model=self.motion_model,
+                                                       tick=self.tick, start=start, clock=self.clock,
+                                                       ticks_count=self.ticks_count),
+                                           daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def read(self, timeout: Optional[float] = None) -> List[bytes]:
+        """
+        Waits (at most timeout seconds) until any worker writes NMEA msgs. Returns list of chunks (whole msgs)
+        read from all ring buffers.
+        """
+        chunks = []
+        if not self._ready.acquire(timeout=timeout):
+            return chunks
+        for ring in self._rings:
+            while True:
+                chunk = ring.get()
+                if chunk is None:
+                    break
+                chunks.append(chunk)
+        # Ready count of the other read chunks (chunks written meanwhile are read with the next call)
+        for _ in range(len(chunks) - 1):
+            if not self._ready.acquire(block=False):
+                break
+        return chunks
+
+    def get_msgs(self, timeout: Optional[float] = None) -> List[bytes]:
+        """
+        Returns list of ready to send NMEA sentences generated by the workers (waits at most timeout seconds).
+        """
+        return b''.join(self.read(timeout=timeout)).splitlines(keepends=True)
+
+    def is_alive(self) -> bool:
+        return any(worker.is_alive() for worker in self._workers)
+
+    def stop(self) -> FleetState:
+        """
+        Stops the workers and merges their shard tracks state into the fleet state. NMEA msgs not read yet are
+        dropped. Returns the fleet state.
+        """
+        self._stop.set()
+        return self.collect()
+
+    def collect(self) -> FleetState:
+        """
+        Waits until the workers exit (e.g. after ticks_count ticks) and merges their shard tracks state into the fleet
+        state. NMEA msgs not read yet are dropped. Returns the fleet state.
+        """
+        results = []
+        while len(results) < len(self._workers):
+            # Workers blocked by full rings are released
+            self.read(timeout=SHARD_POLL_INTERVAL)
+            try:
+                results.append(self._results.get(block=False))
+            except queue.Empty:
+                if not self.is_alive():
+                    # Results sent just before the workers exited
+                    try:
+                        while len(results) < len(self._workers):
+                            results.append(self._results.get(block=False))
+                    except queue.Empty:
+                        pass
+                    break
+        for worker in self._workers:
+            worker.join(timeout=SHARD_STOP_TIMEOUT)
+        for ring in self._rings:
+            ring.unlink()
+        for shard, columns, metrics, stats in sorted(results, key=lambda result: result[0]):
+            indices = self.shard_indices[shard]
+            self.fleet.set_rows(indices=indices, rows=columns, size=len(self.fleet))
+            self.metrics.merge(other=metrics)
+            self.stats.append(stats)
+        return self.fleet
@@ -0,0 +1,147 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import argparse
+import json
+import os
+import struct
+
+import numpy as np
+
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_loader import TrackLoader
+
+
+# Snapshot file starts with the magic bytes, format version, size of the JSON columns description & number of tracks.
+SNAPSHOT_MAGIC = b'AISFLEET'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sIIQ')
+# Columns data (and the data start) is aligned to 64 bytes in the file
+SNAPSHOT_ALIGNMENT = 64
+# Suffix of snapshot files (other files are saved in JSON format)
+SNAPSHOT_SUFFIX = '.snap'
+# Columns data types in the snapshot file (little-endian)
+SNAPSHOT_DTYPES = {name: np.dtype(dtype).newbyteorder('<') for name, (dtype, _) in FLEET_COLUMNS.items()}
+
+PathType = Union[str, Path]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+
+def save_snapshot(fleet: FleetState, filename: PathType) -> None:
+    """
+    Saves fleet state to binary snapshot file - header followed by fleet state columns (fixed-width items of all
+    tracks). The file is replaced atomically, so the previous snapshot is kept, if the saving fails.
+    """
+    size = len(fleet)
+    columns_data = []
+    columns = []
+    offset = 0
+    for name, (_, shape) in FLEET_COLUMNS.items():
+        column = np.ascontiguousarray(getattr(fleet, name), dtype=SNAPSHOT_DTYPES[name])
+        columns.append({'name': name, 'dtype': column.dtype.str, 'shape': list(shape), 'offset': offset})
+        columns_data.append((offset, column))
+        offset = _align(offset + column.nbytes)
+    meta = json.dumps({'columns': columns}).encode()
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(meta), size) + meta
+    data_start = _align(len(header))
+    path = Path(filename)
+    temp_path = path.with_name(f'{path.name}.tmp')
+    with open(temp_path, 'wb') as file:
+        file.write(header.ljust(data_start, b'\0'))
+        for column_offset, column in columns_data:
+            file.seek(data_start + column_offset)
+            file.write(column.data)
+        file.truncate(data_start + offset)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(filename: PathType, mmap_mode: Optional[str] = 'c') -> FleetState:
+    """
+    Loads fleet state from binary snapshot file. By default the file is memory-mapped (copy-on-write) - the fleet
+    state columns are views of the file and changes of the columns are not written back to the file.
+    Whole file is read into memory, if mmap_mode is None. Raises ValueError, if the file is not a valid snapshot.
+    """
+    if mmap_mode is None:
+        data = np.fromfile(filename, dtype=np.uint8)
+    else:
+        data = np.asarray(np.memmap(filename, dtype=np.uint8, mode=mmap_mode))
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError(f'Invalid snapshot file {filename}')
+    magic, version, meta_size, size = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f'Invalid snapshot file {filename}')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'Unsupported snapshot version {version} (file {filename})')
+    meta_end = SNAPSHOT_HEADER.size + meta_size
+    meta: Dict[str, List[Dict[str, Any]]] = json.loads(bytes(data[SNAPSHOT_HEADER.size:meta_end]))
+    data_start = _align(meta_end)
+    columns = {}
+    for column_meta in meta['columns']:
+        name = column_meta['name']
+        if name not in FLEET_COLUMNS:
+            continue
+        dtype = np.dtype(column_meta['dtype'])
+        shape = (size,) + tuple(column_meta['shape'])
+        if dtype != SNAPSHOT_DTYPES[name] or shape[1:] != FLEET_COLUMNS[name][1]:
+            raise ValueError(f'Incompatible snapshot column {name} (file {filename})')
+        start = data_start + column_meta['offset']
+        end = start + int(np.prod(shape)) * dtype.itemsize
+        if end > len(data):
+            raise ValueError(f'Truncated snapshot file {filename}')
+        columns[name] = data[start:end].view(dtype).reshape(shape)
+    missing = set(FLEET_COLUMNS) - set(columns)
+    if missing:
+        raise ValueError(f'Missing snapshot columns {", ".join(sorted(missing))} (file {filename})')
+    return FleetState.from_columns(columns=columns)
+
+
+def is_snapshot(filename: PathType) -> bool:
+    """
+    Returns True, if the file starts with the snapshot magic bytes.
+    """
+    with open(filename, 'rb') as file:
+        return file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def save_tracks_json(fleet: FleetState, filename: PathType) -> None:
+    """
+    Dumps fleet state tracks to JSON file (the tracks file schema).
+    """
+    # Convert fleet state to dictionary & exclude not set fields or with default values
+    tracks: List[Dict] = fleet.to_track_list().dict(exclude_unset=True)['tracks']
+    # Strip selected AIS track attrs (model fields) values
+    for track in tracks:
+        values_to_strip = ['ship_name', 'destination', 'call_sign']
+        for string in values_to_strip:
+            track[string] = track[string].strip()
+    # Dump data as a dict
+    tracks_to_dump = {
+        'tracks': tracks
+    }
+    with open(filename, 'w') as write_file:
+        json.dump(tracks_to_dump, write_file, indent=4)
+
+
+def convert(source: PathType, target: PathType) -> None:
+    """
+    Converts JSON tracks file to binary snapshot or snapshot to JSON tracks file (based on the source file content).
+    Invalid tracks of the JSON file are reported and skipped.
+    """
+    if is_snapshot(filename=source):
+        save_tracks_json(fleet=load_snapshot(filename=source), filename=target)
+        return
+    loader = TrackLoader(filename=str(source))
+    loader.load()
+    for error in loader.errors:
+        print(f'Error: File "{source}" - {error}')
+    save_snapshot(fleet=loader.fleet, filename=target)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converts AIS tracks JSON file to binary fleet snapshot and back')
+    parser.add_argument('source', help='JSON tracks file or binary fleet snapshot')
+    parser.add_argument('target', help='Converted file')
+    args = parser.parse_args()
+    convert(source=args.source, target=args.target)
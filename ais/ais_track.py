@@ -1,3 +1,4 @@
+from abc import ABC, abstractmethod
 from typing import List, Optional, Union
 from datetime import datetime
 
@@ -14,11 +15,109 @@ from ais.ais_utils import (
     calculate_new_position,
     SequentialMsgId
 )
-from nmea.nmea_msg import AISMsgPayloadType1, AISMsgPayloadType5, NMEAMessage
+from ais.ais_motion import MotionModel
+from nmea.nmea_msg import AISMsgPayloadType1Lite, AISMsgPayloadType5Lite, NMEAMessage
 from ais.constants import NavigationStatusEnum, ShipTypeEnum, FieldCharsCountEnum
 
 
-class AISTrack(BaseModel):
+# AISTrack fields encoded in AIS msg type 5 - cached type 5 msg is invalidated when any of them is changed.
+TYPE_5_FIELDS = {'mmsi', 'imo', 'call_sign', 'ship_name', 'ship_type', 'dimension', 'eta', 'draught', 'destination'}
+
+
+class AISTrackMsgMixin(ABC):
+    """
+    Class represents AIS track behaviour shared by the AISTrack model and the fleet state track views.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def _next_seq_msg_id(self) -> int:
+        """
+        Returns next sequential message ID (for multi-sentence NMEA messages).
+        """
+
+    def generate_nmea(self, as_bytes: bool = False) -> Union[List[str], List[bytes]]:
+        """
+        Generate list of NMEA msgs for current AISTrack (ready to send bytes if as_bytes is set).
+        """
+        return self.generate_nmea_type_1(as_bytes=as_bytes) + self.generate_nmea_type_5(as_bytes=as_bytes)
+
+    def generate_nmea_type_1(self, as_bytes: bool = False) -> Union[List[str], List[bytes]]:
+        """
+        Generate list of NMEA sentences with AIS msg type 1 (position report) for current AISTrack.
+        """
+        return NMEAMessage(payload=self.generate_payload_type_1()).get_sentences(as_bytes=as_bytes)
+
+    def generate_nmea_type_5(self, as_bytes: bool = False) -> Union[List[str], List[bytes]]:
+        """
+        Generate list of NMEA sentences with AIS msg type 5 (static and voyage related data) for current AISTrack.
+        """
+        # sequential message ID (for multi-sentence NMEA messages)
+        seq_msg_id = self._next_seq_msg_id()
+        return self._get_type_5_msg().get_sentences(seq_msg_id=seq_msg_id, as_bytes=as_bytes)
+
+    def _get_type_5_msg(self) -> NMEAMessage:
+        """
+        Returns NMEA msg with AIS msg type 5 (static and voyage related data). The msg is encoded once and cached
+        until any of the TYPE_5_FIELDS is changed.
+        """
+        if self._type_5_msg is None:
+            self._type_5_msg = NMEAMessage(payload=self.generate_payload_type_5())
+        return self._type_5_msg
+
+    def generate_payload_type_1(self) -> AISMsgPayloadType1Lite:
+        """
+        Generates AIS Type 1 msg object. The track data is already validated, so lightweight payload is used.
+        """
+        msg = AISMsgPayloadType1Lite(mmsi=self.mmsi,
+                                     lon=self.lon,
+                                     lat=self.lat,
+                                     course=self.course,
+                                     true_heading=self.true_heading,
+                                     nav_status=self.nav_status,
+                                     speed=self.speed,
+                                     timestamp=self.timestamp)
+        return msg
+
+    def generate_payload_type_5(self) -> AISMsgPayloadType5Lite:
+        """
+        Generates AIS Type 5 msg object. The track data is already validated, so lightweight payload is used.
+        """
+        msg = AISMsgPayloadType5Lite(mmsi=self.mmsi,
+                                     imo=self.imo,
+                                     call_sign=self.call_sign,
+                                     ship_name=self.ship_name,
+                                     ship_type=self.ship_type,
+                                     dimension=self.dimension,
+                                     eta=self.eta,
+                                     draught=self.draught,
+                                     destination=self.destination)
+        return msg
+
+    def update_position(self, current_timestamp: float, motion_model: Optional[MotionModel] = None) -> None:
+        """
+        Updates the AIS track position. The position will be updated every time the method is called.
+        By default the exact WGS84 geodesic is used, other motion model can be selected to trade accuracy for speed.
+        """
+        # Calculate distance to new position
+        distance = calculate_distance(last_timestamp=self._updated_at,
+                                      current_timestamp=current_timestamp,
+                                      speed=self.speed)
+        # Update position update timestamp
+        self._updated_at = current_timestamp
+        if motion_model:
+            lon_new, lat_new = motion_model.advance(lons=self.lon, lats=self.lat, courses=self.course, distances=distance)
+        else:
+            lon_new, lat_new = calculate_new_position(lon_start=self.lon,
+                                                      lat_start=self.lat,
+                                                      course=self.course,
+                                                      distance=distance)
+        # Update AIS track coordinates
+        self.lon = float(lon_new)
+        self.lat = float(lat_new)
+
+
+class AISTrack(AISTrackMsgMixin, BaseModel):
     """
     Class represents single AIS track.
     """
@@ -40,6 +139,9 @@ class AISTrack(BaseModel):
     timestamp: Optional[int] = 60
     _updated_at: float = datetime.utcnow().timestamp()
     _seq_msg_id: SequentialMsgId = SequentialMsgId()
+    _type_5_msg: Optional[NMEAMessage] = None
+    # Values of nested models (dimension & eta) encoded in the cached AIS msg type 5
+    _type_5_nested: Optional[tuple] = None
 
     class Config:
         """
@@ -107,64 +209,29 @@ class AISTrack(BaseModel):
             value = 25.5
         return value
 
-    def generate_nmea(self) -> List[str]:
-        """
-        Generate list of NMEA msgs for current AISTrack.
-        """
-        payloads = [self.generate_payload_type_1(), self.generate_payload_type_5()]
-        msgs = []
-        # sequential message ID (for multi-sentence NMEA messages)
-        seq_msg_id = next(self._seq_msg_id)
-        for payload in payloads:
-            msgs += NMEAMessage(payload=payload).get_sentences(seq_msg_id=seq_msg_id)
-        return msgs
-
-    def generate_payload_type_1(self) -> AISMsgPayloadType1:
-        """
-        Generates AIS Type 1 msg object.
-        """
-        msg = AISMsgPayloadType1(mmsi=self.mmsi,
-                                 lon=self.lon,
-                                 lat=self.lat,
-                                 course=self.course,
-                                 true_heading=self.true_heading,
-                                 nav_status=self.nav_status,
-                                 speed=self.speed,
-                                 timestamp=self.timestamp)
-        return msg
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in TYPE_5_FIELDS:
+            # Static and voyage related data changed - invalidate cached AIS msg type 5
+            self._type_5_msg = None
 
-    def generate_payload_type_5(self) -> AISMsgPayloadType5:
+    def _get_type_5_msg(self) -> NMEAMessage:
         """
-        Generates AIS Type 5 msg object.
+        Returns NMEA msg with AIS msg type 5 (static and voyage related data). Nested models (dimension & eta) can be
+        changed in place (not by assignment to the track), so the cached msg is invalidated, when their values differ.
         """
-        msg = AISMsgPayloadType5(mmsi=self.mmsi,
-                                 imo=self.imo,
-                                 call_sign=self.call_sign,
-                                 ship_name=self.ship_name,
-                                 ship_type=self.ship_type,
-                                 dimension=self.dimension,
-                                 eta=self.eta,
-                                 draught=self.draught,
-                                 destination=self.destination)
-        return msg
-
-    def update_position(self, current_timestamp: float) -> None:
+        nested = (self.dimension and tuple(self.dimension.__dict__.values()),
+                  self.eta and tuple(self.eta.__dict__.values()))
+        if nested != self._type_5_nested:
+            self._type_5_msg = None
+            self._type_5_nested = nested
+        return super()._get_type_5_msg()
+
+    def _next_seq_msg_id(self) -> int:
         """
-        Updates the AIS track position. The position will be updated every time the method is called.
+        Returns next sequential message ID (for multi-sentence NMEA messages).
         """
-        # Calculate distance to new position
-        distance = calculate_distance(last_timestamp=self._updated_at,
-                                      current_timestamp=current_timestamp,
-                                      speed=self.speed)
-        # Update position update timestamp
-        self._updated_at = current_timestamp
-        lon_new, lat_new = calculate_new_position(lon_start=self.lon,
-                                                  lat_start=self.lat,
-                                                  course=self.course,
-                                                  distance=distance)
-        # Update AIS track coordinates
-        self.lon = lon_new
-        self.lat = lat_new
+        return next(self._seq_msg_id)
 
 
 class AISTrackList(BaseModel):
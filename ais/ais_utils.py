@@ -1,9 +1,13 @@
+from datetime import datetime
+from functools import lru_cache
 from ipaddress import IPv4Address
+from typing import List, Optional
 
-from pydantic import BaseModel, validator, root_validator, conint, conlist
+import numpy as np
+from pydantic import BaseModel, validator, root_validator, conint, confloat
 from pyproj import Geod
 
-from ais.constants import MmsiCountryEnum
+from ais.constants import MmsiCountryEnum, NavigationStatusEnum, ReportingIntervalEnum
 from nmea.nmea_utils import convert_int_to_bits
 
 
@@ -111,9 +115,11 @@ class ShipEta(BaseModel):
 class Client(BaseModel):
     """
     Class represents a single client to which a UDP stream will be sent.
+    Optional rate (datagrams per second) limits the stream sent to the client by the fan-out engine.
     """
     host: IPv4Address
     port: conint(gt=0, lt=65536)
+    rate: Optional[confloat(gt=0)] = None
 
     @validator('host')
     def ip_address_obj_to_str(cls, value):
@@ -123,11 +129,51 @@ class Client(BaseModel):
         return str(value)
 
 
+class MulticastGroup(BaseModel):
+    """
+    Class represents IPv4 multicast group to which a UDP stream will be sent (once for all group members).
+    """
+    group: IPv4Address
+    port: conint(gt=0, lt=65536)
+    ttl: conint(ge=0, le=255) = 1
+    loopback: bool = True
+    # IP address of the local interface used for sending (default - chosen by the system)
+    interface: Optional[IPv4Address] = None
+
+    @validator('group')
+    def check_multicast_group(cls, value):
+        if not value.is_multicast:
+            raise ValueError(f'field value {value} is invalid. Should be IPv4 multicast address.')
+        return str(value)
+
+    @validator('interface')
+    def ip_address_obj_to_str(cls, value):
+        """
+        Converts IPv4Address object to str representation.
+        """
+        return str(value) if value is not None else value
+
+
 class Clients(BaseModel):
     """
-    Class represents list of Client objects.
+    Class represents list of Client objects and multicast groups. Max number of clients is configurable (default 10).
     """
-    clients: conlist(Client, min_items=1, max_items=10)
+    max_clients: conint(gt=0) = 10
+    clients: List[Client] = []
+    multicast: List[MulticastGroup] = []
+
+    @validator('clients')
+    def check_clients_count(cls, value, values):
+        max_clients = values.get('max_clients', 10)
+        if len(value) > max_clients:
+            raise ValueError(f'ensure this value has at most {max_clients} items')
+        return value
+
+    @root_validator(skip_on_failure=True)
+    def check_destinations(cls, values):
+        if not values['clients'] and not values['multicast']:
+            raise ValueError('at least one client or multicast group is required')
+        return values
 
 
 class SequentialMsgId:
@@ -189,6 +235,27 @@ def verify_sixbit_ascii(text: str) -> bool:
     return True
 
 
+def get_reporting_interval(speed: float, nav_status: int) -> int:
+    """
+    Returns AIS msg type 1 (position report) interval in seconds for given ship speed and navigational status.
+    """
+    interval = ReportingIntervalEnum
+    if nav_status in (NavigationStatusEnum.At_anchor, NavigationStatusEnum.Moored):
+        return interval.anchored_or_moored if speed <= 3 else interval.anchored_or_moored_moving
+    if speed <= 14:
+        return interval.speed_0_14
+    if speed <= 23:
+        return interval.speed_14_23
+    return interval.speed_over_23
+
+
+def get_current_timestamp() -> float:
+    """
+    Returns current UTC timestamp (the same clock is used for AIS tracks position updates).
+    """
+    return datetime.utcnow().timestamp()
+
+
 def calculate_distance(last_timestamp: float, current_timestamp: float, speed: int) -> int:
     """
     Calculates the distance passed after the indicated time (in meters).
@@ -201,13 +268,37 @@ def calculate_distance(last_timestamp: float, current_timestamp: float, speed: i
     return round(speed_ms * time_delta, 3)
 
 
+def calculate_distances(last_timestamps: np.ndarray, current_timestamp: float, speeds: np.ndarray) -> np.ndarray:
+    """
+    Calculates the distances passed by many tracks after the indicated time (in meters).
+    """
+    # Knots to m/s conversion. Distance in meters - rounded to 3 digits from the decimal point
+    return np.round(speeds * 0.514444444 * (current_timestamp - last_timestamps), 3)
+
+
+@lru_cache(maxsize=None)
+def get_geod(ellps: str = 'WGS84') -> Geod:
+    """
+    Returns cached Geod object for given ellipsoid.
+    """
+    return Geod(ellps=ellps)
+
+
 def calculate_new_position(lon_start: float, lat_start: float, course: float, distance: float) -> tuple:
     """
     Calculates new coordinates based on distance and azimuth (ship course).
     """
     # Use WGS84 ellipsoid.
-    g = Geod(ellps='WGS84')
+    g = get_geod()
     # Forward transformation - returns longitude, latitude, back azimuth of terminus points
     lon_end, lat_end, back_azimuth = g.fwd(lon_start, lat_start, course, distance)
     return lon_end, lat_end
 
+
+def advance_positions(lons, lats, courses, distances) -> tuple:
+    """
+    Calculates new coordinates of many points at once based on distances and azimuths (ships courses).
+    Accepts arrays of equal length, returns tuple of arrays - (longitudes, latitudes).
+    """
+    lons_end, lats_end, back_azimuths = get_geod().fwd(lons, lats, courses, distances)
+    return lons_end, lats_end
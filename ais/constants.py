@@ -153,6 +153,25 @@ class AISMsgType5ConstsEnum(IntEnum):
         return {k: v.value for k, v in cls.__members__.items()}
 
 
+class ReportingIntervalEnum(IntEnum):
+    """
+    Class A shipborne mobile AIS reporting intervals in seconds (ITU-R M.1371, Table 1).
+    Course changes are not simulated, so the intervals for ships changing course are not listed.
+    """
+    # Ship at anchor or moored and not moving faster than 3 knots
+    anchored_or_moored = 180
+    # Ship at anchor or moored and moving faster than 3 knots
+    anchored_or_moored_moving = 10
+    # Ship 0-14 knots
+    speed_0_14 = 10
+    # Ship 14-23 knots
+    speed_14_23 = 6
+    # Ship faster than 23 knots
+    speed_over_23 = 2
+    # Static and voyage related data (AIS msg type 5)
+    static_data = 360
+
+
 class FieldBitsCountEnum(IntEnum):
     """
     Bits count for AIS msg fields.
@@ -183,6 +202,15 @@ class FieldBitsCountEnum(IntEnum):
     draught = 8
     destination = 120
     dte = 1
+    # Ship dimension and ETA sub-fields (AIS msg type 5)
+    dimension_to_bow = 9
+    dimension_to_stern = 9
+    dimension_to_port = 6
+    dimension_to_starboard = 6
+    eta_month = 4
+    eta_day = 5
+    eta_hour = 5
+    eta_minute = 6
 
     @classmethod
     def dict(cls) -> Dict[str, int]:
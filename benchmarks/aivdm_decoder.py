@@ -0,0 +1,72 @@
+"""
+Throughput benchmark of the streaming AIVDM decoder on the generator output (type 1 msgs with 5% of type 5 msgs).
+
+Run from the repository root: python -m benchmarks.aivdm_decoder
+"""
+import time
+
+import numpy as np
+
+from nmea.nmea_batch import encode_type1_batch
+from nmea.nmea_decoder import AIVDMDecoder, AISMessageBatch, decode_batch
+from nmea.nmea_msg import NMEAMessage, AISMsgPayloadType5Lite
+from ais.ais_utils import ShipDimension, ShipEta
+
+
+TYPE_1_MSGS = 500000
+TYPE_5_MSGS = TYPE_1_MSGS // 20
+CHUNK_SIZE = 65536
+
+
+def generate_stream() -> bytes:
+    """
+    Returns NMEA stream with type 1 msgs of random tracks, type 5 msgs are spread evenly in the stream.
+    """
+    rng = np.random.default_rng(seed=1)
+    type_1_data = encode_type1_batch(mmsi=rng.integers(200000000, 800000000, TYPE_1_MSGS),
+                                     lon=rng.uniform(-180, 180, TYPE_1_MSGS),
+                                     lat=rng.uniform(-90, 90, TYPE_1_MSGS),
+                                     speed=rng.uniform(0, 30, TYPE_1_MSGS),
+                                     course=rng.uniform(0, 360, TYPE_1_MSGS),
+                                     as_bytes=True).splitlines(keepends=True)
+    payload = AISMsgPayloadType5Lite(mmsi=205344990, imo=9134270, call_sign='3FOF8', ship_name='EVER DIADEM',
+                                     ship_type=70,
+                                     dimension=ShipDimension(to_bow=225, to_stern=70, to_port=1, to_starboard=31),
+                                     eta=ShipEta(month=5, day=15, hour=14, minute=0), draught=12.2,
+                                     destination='NEW YORK')
+    type_5_msg = NMEAMessage(payload=payload)
+    step = TYPE_1_MSGS // TYPE_5_MSGS
+    lines = []
+    for number in range(TYPE_5_MSGS):
+        lines += type_1_data[number * step:(number + 1) * step]
+        lines += type_5_msg.get_sentences(seq_msg_id=number % 10, as_bytes=True)
+    return b''.join(lines)
+
+
+def main() -> None:
+    data = generate_stream()
+    sentences_count = data.count(b'\n')
+    decoder = AIVDMDecoder()
+    start = time.perf_counter()
+    batches = []
+    for offset in range(0, len(data), CHUNK_SIZE):
+        batches.append(decoder.feed(data[offset:offset + CHUNK_SIZE]))
+    msgs = AISMessageBatch.join(batches)
+    elapsed = time.perf_counter() - start
+    print(f'Decoder: {decoder.stats}')
+    print(f'Parsing, checksums & reassembly: {sentences_count / elapsed:.0f} sentences/s')
+    start = time.perf_counter()
+    decode_batch(msgs=msgs, msg_type=1)
+    decode_batch(msgs=msgs, msg_type=5)
+    elapsed = time.perf_counter() - start
+    print(f'Payload fields (NumPy columns): {len(msgs) / elapsed:.0f} msgs/s')
+    start = time.perf_counter()
+    count = 100000
+    for msg in msgs[:count]:
+        msg.fields()
+    elapsed = time.perf_counter() - start
+    print(f'Payload fields (dict per msg): {count / elapsed:.0f} msgs/s')
+
+
+if __name__ == '__main__':
+    main()
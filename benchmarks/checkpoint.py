@@ -0,0 +1,63 @@
+"""
+Benchmark of the background checkpointer on 1M tracks fleet - emit loop pause (copying of changed tracks) and
+background writing / compaction time. Full JSON dump time is extrapolated from 10k tracks.
+
+Run from the repository root: python -m benchmarks.checkpoint
+"""
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+
+from ais.ais_checkpoint import Checkpointer
+from ais.ais_snapshot import save_tracks_json
+from benchmarks.fleet_snapshot import generate_fleet
+
+
+FLEET_TRACKS = 1000000
+# Number of tracks changed between checkpoints
+CHANGED_TRACKS = 50000
+JSON_TRACKS = 10000
+
+
+def main() -> None:
+    rng = np.random.default_rng(seed=1)
+    with tempfile.TemporaryDirectory() as directory:
+        fleet = generate_fleet(size=FLEET_TRACKS)
+        checkpointer = Checkpointer(fleet=fleet, filename=Path(directory) / 'fleet.snap', interval=0)
+        start = time.perf_counter()
+        now = 0
+        # The first checkpoint of the whole fleet is spread over max_rows slices
+        while checkpointer.checkpoint(now=now) or checkpointer._pending:
+            now += 1
+        checkpointer.flush()
+        elapsed = time.perf_counter() - start
+        print(f'First full checkpoint (1M tracks): {elapsed * 1e3:.0f} ms, {checkpointer.stats}')
+        pauses = []
+        for _ in range(10):
+            now += 1
+            fleet.mark_dirty(indices=rng.choice(FLEET_TRACKS, CHANGED_TRACKS, replace=False))
+            # Changed tracks are copied in max_rows slices
+            while True:
+                start = time.perf_counter()
+                checkpointer.checkpoint(now=now)
+                pauses.append(time.perf_counter() - start)
+                checkpointer.flush()
+                if not checkpointer._pending:
+                    break
+        print(f'Delta checkpoint ({CHANGED_TRACKS} changed tracks): {len(pauses)} calls, '
+              f'pause mean {np.mean(pauses) * 1e3:.2f} ms / max {np.max(pauses) * 1e3:.2f} ms')
+        start = time.perf_counter()
+        checkpointer.compact()
+        print(f'Compaction (background thread): {(time.perf_counter() - start) * 1e3:.0f} ms')
+        checkpointer.close(compact=False)
+        json_fleet = generate_fleet(size=JSON_TRACKS)
+        start = time.perf_counter()
+        save_tracks_json(fleet=json_fleet, filename=Path(directory) / 'tracks.json')
+        elapsed = (time.perf_counter() - start) * FLEET_TRACKS / JSON_TRACKS
+        print(f'Full JSON dump (blocking, extrapolated to 1M tracks): {elapsed:.0f} s')
+
+
+if __name__ == '__main__':
+    main()
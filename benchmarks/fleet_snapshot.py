@@ -0,0 +1,70 @@
+"""
+Benchmark of the binary fleet snapshot save / load (1M tracks) compared with the JSON tracks file (10k tracks).
+
+Run from the repository root: python -m benchmarks.fleet_snapshot
+"""
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_loader import TrackLoader
+from ais.ais_snapshot import save_snapshot, load_snapshot, save_tracks_json
+
+
+SNAPSHOT_TRACKS = 1000000
+JSON_TRACKS = 10000
+
+
+def generate_fleet(size: int) -> FleetState:
+    """
+    Returns fleet state with random (valid) tracks data.
+    """
+    rng = np.random.default_rng(seed=1)
+    columns = {name: np.zeros((size,) + shape, dtype=dtype) for name, (dtype, shape) in FLEET_COLUMNS.items()}
+    columns['mmsi'][:] = rng.integers(205000000, 205999999, size)
+    columns['lon'][:] = rng.uniform(-180, 180, size)
+    columns['lat'][:] = rng.uniform(-90, 90, size)
+    columns['speed'][:] = rng.uniform(0, 30, size).round(1)
+    columns['course'][:] = rng.uniform(0, 360, size).round(1)
+    columns['true_heading'][:] = 511
+    columns['timestamp'][:] = 60
+    columns['call_sign'][:] = b'3FOF8'
+    columns['ship_name'][:] = b'EVER DIADEM'
+    columns['ship_type'][:] = 70
+    columns['dimension'][:] = [225, 70, 1, 31]
+    columns['eta'][:] = [5, 15, 14, 0]
+    columns['destination'][:] = b'NEW YORK'
+    return FleetState.from_columns(columns=columns)
+
+
+def measure(name: str, func, tracks_count: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<36} {elapsed * 1e3:10.1f} ms {elapsed / tracks_count * 1e6:10.3f} us/track')
+    return elapsed
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = Path(directory) / 'fleet.snap'
+        json_path = Path(directory) / 'tracks.json'
+        fleet = generate_fleet(size=SNAPSHOT_TRACKS)
+        measure('save_snapshot (1M tracks)', lambda: save_snapshot(fleet=fleet, filename=snapshot_path),
+                SNAPSHOT_TRACKS)
+        measure('load_snapshot - mmap (1M tracks)', lambda: load_snapshot(filename=snapshot_path), SNAPSHOT_TRACKS)
+        measure('load_snapshot - read (1M tracks)', lambda: load_snapshot(filename=snapshot_path, mmap_mode=None),
+                SNAPSHOT_TRACKS)
+        print(f'Snapshot size: {snapshot_path.stat().st_size / SNAPSHOT_TRACKS:.0f} bytes/track')
+        fleet = generate_fleet(size=JSON_TRACKS)
+        measure('save_tracks_json (10k tracks)', lambda: save_tracks_json(fleet=fleet, filename=json_path),
+                JSON_TRACKS)
+        measure('TrackLoader.load (10k tracks)', lambda: TrackLoader(filename=str(json_path)).load(), JSON_TRACKS)
+        print(f'JSON size: {json_path.stat().st_size / JSON_TRACKS:.0f} bytes/track')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark of NMEA log replay - index build on open, reading at max speed and seeking (1M sentences log).
+
+Run from the repository root: python -m benchmarks.log_replay
+"""
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fleet_snapshot import generate_fleet
+from nmea.nmea_batch import encode_type1_batch
+from nmea.nmea_replay import NMEALog, LogReplay
+
+
+LOG_SENTENCES = 1000000
+# Number of sentences received within one second of the log
+SENTENCES_PER_SECOND = 1000
+
+
+def write_log(filename: Path) -> None:
+    """
+    Writes log with AIS type 1 sentences preceded by the receive time.
+    """
+    fleet = generate_fleet(size=LOG_SENTENCES)
+    sentences = encode_type1_batch(mmsi=fleet.mmsi, lon=fleet.lon, lat=fleet.lat, speed=fleet.speed,
+                                   course=fleet.course, as_bytes=True).splitlines(keepends=True)
+    times = 1577836800 + np.arange(LOG_SENTENCES) / SENTENCES_PER_SECOND
+    with open(filename, 'wb') as file:
+        file.writelines(b'%.3f %s' % (timestamp, sentence) for timestamp, sentence in zip(times.tolist(), sentences))
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'ais.log'
+        write_log(filename=path)
+        start = time.perf_counter()
+        log = NMEALog(filename=path)
+        elapsed = time.perf_counter() - start
+        print(f'Open with index build ({path.stat().st_size / 1e6:.0f} MB, {len(log.index_times)} index entries): '
+              f'{elapsed:.2f} s, {log.lines_count / elapsed:,.0f} lines/s')
+        replay = LogReplay(log=log, speed=0)
+        start = time.perf_counter()
+        for _ in replay.replay():
+            pass
+        elapsed = time.perf_counter() - start
+        print(f'Replay at max speed: {elapsed:.2f} s, {replay.stats.sentences / elapsed:,.0f} sentences/s '
+              f'({replay.stats})')
+        start = time.perf_counter()
+        next(log.read_batches(time_offset=log.duration * 0.9))
+        print(f'Seek to 90% of the log: {(time.perf_counter() - start) * 1e3:.2f} ms')
+        log.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Microbenchmark of the NMEA checksum and sentence building.
+Compares the current bytes-native implementation with the previous str based one.
+
+Run from the repository root: python -m benchmarks.nmea_sentences
+"""
+import timeit
+from typing import Callable, List
+
+from nmea.nmea_msg import NMEAMessage, AISMsgPayloadType1Lite, AISMsgPayloadType5Lite
+from nmea.nmea_utils import nmea_checksum, xor_checksum
+from ais.ais_utils import ShipDimension, ShipEta
+
+
+SENTENCE_DATA = 'AIVDM,2,1,8,A,56;OaD02B8EL990b221`P4v1T4pN0HDpN2222216HHN>B6U30A2hCDhD`888,0'
+NUMBER = 100000
+
+
+def legacy_nmea_checksum(data: str) -> str:
+    """
+    Returns NMEA checksum (previous implementation - bytearray per char and hex formatting through str).
+    """
+    check_sum: int = 0
+    for char in data:
+        num = bytearray(char, encoding='utf-8')[0]
+        check_sum = (check_sum ^ num)
+    hex_str: str = str(hex(check_sum))[2:]
+    if len(hex_str) == 2:
+        return hex_str.upper()
+    return f'0{hex_str}'.upper()
+
+
+class LegacyNMEAMessage(NMEAMessage):
+    """
+    Class represents NMEA message with the previous sentence building - str templates and f-strings encoded before
+    sending.
+    """
+    def _get_sentence_templates(self) -> List[tuple]:
+        if self._sentence_templates is None:
+            templates = []
+            for sentence_number, sentence_payload in enumerate(self.payload_parts, 1):
+                fill_bits = self.payload.fill_bits if sentence_number == self.number_of_sentences else 0
+                head = f'{self.nmea_msg_type},{self.number_of_sentences},{sentence_number},'
+                tail = f',{self.ais_channel},{sentence_payload},{fill_bits}'
+                templates.append((head, tail, int(legacy_nmea_checksum(head + tail), 16)))
+            self._sentence_templates = templates
+        return self._sentence_templates
+
+    def get_sentences(self, seq_msg_id: int = 0, as_bytes: bool = False) -> List[bytes]:
+        sequential_msg_id = str(seq_msg_id) if self.number_of_sentences > 1 else ''
+        seq_checksum = int(legacy_nmea_checksum(sequential_msg_id), 16)
+        return [f'!{head}{sequential_msg_id}{tail}*{checksum ^ seq_checksum:02X}\r\n'.encode()
+                for head, tail, checksum in self._get_sentence_templates()]
+
+
+def measure(name: str, func: Callable, baseline: float = 0) -> float:
+    """
+    Prints and returns mean time (in microseconds) of a single func call.
+    """
+    elapsed = timeit.timeit(func, number=NUMBER) / NUMBER * 1e6
+    speedup = f' ({baseline / elapsed:.1f}x faster)' if baseline else ''
+    print(f'{name:<40} {elapsed:8.3f} us{speedup}')
+    return elapsed
+
+
+def main() -> None:
+    data = SENTENCE_DATA.encode()
+    baseline = measure('legacy nmea_checksum (str)', lambda: legacy_nmea_checksum(SENTENCE_DATA))
+    measure('nmea_checksum (str)', lambda: nmea_checksum(SENTENCE_DATA), baseline=baseline)
+    measure('xor_checksum (bytes)', lambda: xor_checksum(data), baseline=baseline)
+
+    type_1_payload = AISMsgPayloadType1Lite(mmsi=205344990, nav_status=15, lon=4.407046666667, lat=51.229636666667,
+                                            course=110.7, timestamp=40)
+    assert LegacyNMEAMessage(payload=type_1_payload).get_sentences() == \
+        NMEAMessage(payload=type_1_payload).get_sentences(as_bytes=True)
+    baseline = measure('legacy type 1 msg', lambda: LegacyNMEAMessage(payload=type_1_payload).get_sentences())
+    measure('type 1 msg', lambda: NMEAMessage(payload=type_1_payload).get_sentences(as_bytes=True),
+            baseline=baseline)
+
+    type_5_payload = AISMsgPayloadType5Lite(mmsi=205344990, imo=9134270, call_sign='3FOF8', ship_name='EVER DIADEM',
+                                            ship_type=70,
+                                            dimension=ShipDimension(to_bow=225, to_stern=70, to_port=1,
+                                                                    to_starboard=31),
+                                            eta=ShipEta(month=5, day=15, hour=14, minute=0), draught=12.2,
+                                            destination='NEW YORK')
+    legacy_msg = LegacyNMEAMessage(payload=type_5_payload)
+    nmea_msg = NMEAMessage(payload=type_5_payload)
+    assert legacy_msg.get_sentences(seq_msg_id=1) == nmea_msg.get_sentences(seq_msg_id=1, as_bytes=True)
+    baseline = measure('legacy type 5 msg (cached templates)', lambda: legacy_msg.get_sentences(seq_msg_id=1))
+    measure('type 5 msg (cached templates)', lambda: nmea_msg.get_sentences(seq_msg_id=1, as_bytes=True),
+            baseline=baseline)
+
+
+if __name__ == '__main__':
+    main()
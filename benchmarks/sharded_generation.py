@@ -0,0 +1,40 @@
+"""
+Benchmark of NMEA msgs generation sharded across worker processes (200k tracks fleet, 60 s of simulated time).
+Throughput scales with the number of processes only up to the number of available CPU cores.
+
+Run from the repository root: python -m benchmarks.sharded_generation
+"""
+import os
+import time
+
+from ais.ais_shard import ShardedGenerator, SimulatedClock
+from benchmarks.fleet_snapshot import generate_fleet
+
+
+FLEET_TRACKS = 200000
+TICKS_COUNT = 120
+PROCESSES = [1, 2, 4, 8]
+
+
+def main() -> None:
+    print(f'Available CPU cores: {len(os.sched_getaffinity(0))}')
+    fleet = generate_fleet(size=FLEET_TRACKS)
+    base_rate = None
+    for processes in PROCESSES:
+        generator = ShardedGenerator(fleet=fleet, processes=processes, clock=SimulatedClock(start=0),
+                                     ticks_count=TICKS_COUNT)
+        start = time.perf_counter()
+        generator.start(start=0)
+        # Msgs are read (and dropped) until the workers exit
+        generator.collect()
+        elapsed = time.perf_counter() - start
+        msgs_count = sum(stats.msgs for stats in generator.stats)
+        msgs_bytes = sum(stats.bytes for stats in generator.stats)
+        rate = msgs_count / elapsed
+        base_rate = base_rate or rate
+        print(f'{processes} processes: {msgs_count} msgs ({msgs_bytes / 1e6:.1f} MB) in {elapsed:.2f} s, '
+              f'{rate:,.0f} msgs/s (x{rate / base_rate:.2f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Microbenchmark of the six-bit payload armoring, dearmoring and six-bit text encoding.
+Compares the lookup tables / bytes.translate bulk paths with the previous per-char implementation.
+
+Run from the repository root: python -m benchmarks.sixbit
+"""
+from nmea.nmea_utils import SIXBIT_ARMOR_CHARS, armor_payload, dearmor_payload, encode_sixbit_text
+from benchmarks.nmea_sentences import measure
+
+
+PAYLOAD = '533m@o`2;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp888888888880'
+SHIP_NAME = 'EVER DIADEM'
+
+
+def legacy_armor_payload(value: int, bits_count: int) -> tuple:
+    """
+    Returns armored payload (previous implementation - one table index per six-bit item).
+    """
+    fill_bits = -bits_count % 6
+    value <<= fill_bits
+    last_shift = bits_count + fill_bits - 6
+    payload = ''.join([SIXBIT_ARMOR_CHARS[(value >> shift) & 0x3f] for shift in range(last_shift, -1, -6)])
+    return payload, fill_bits
+
+
+def legacy_ascii_code_to_decimal(ascii_code: int) -> int:
+    if ascii_code < 48 or 87 < ascii_code < 96 or ascii_code > 119:
+        raise ValueError(f'Invalid ASCII {ascii_code}.')
+    decimal = ascii_code - 48
+    if decimal > 40:
+        decimal -= 8
+    return decimal
+
+
+def legacy_dearmor_payload(payload: bytes) -> int:
+    """
+    Returns dearmored payload (previous implementation - branchy conversion of each char).
+    """
+    value = 0
+    for ascii_code in payload:
+        value = (value << 6) | legacy_ascii_code_to_decimal(ascii_code)
+    return value
+
+
+def legacy_ascii_char_to_ascii6_code(char: str) -> int:
+    ascii_code = ord(char)
+    if 64 <= ascii_code <= 95:
+        ascii6_code = ascii_code - 64
+    elif 32 <= ascii_code <= 63:
+        ascii6_code = ascii_code
+    else:
+        raise ValueError(f'Invalid character {ascii_code}')
+    return ascii6_code
+
+
+def legacy_encode_sixbit_text(text: str, chars_count: int) -> int:
+    """
+    Returns six-bit text packed into int (previous implementation - branchy conversion of each char).
+    """
+    text = text[:chars_count].ljust(chars_count)
+    value = 0
+    for char in text:
+        value = (value << 6) | legacy_ascii_char_to_ascii6_code(char=char)
+    return value
+
+
+def main() -> None:
+    data = PAYLOAD.encode()
+    value = legacy_dearmor_payload(payload=data)
+    bits_count = len(PAYLOAD) * 6
+    assert dearmor_payload(payload=data) == value
+    assert armor_payload(value=value, bits_count=bits_count) == legacy_armor_payload(value=value, bits_count=bits_count)
+    assert encode_sixbit_text(text=SHIP_NAME, chars_count=20) == legacy_encode_sixbit_text(text=SHIP_NAME,
+                                                                                           chars_count=20)
+
+    baseline = measure('legacy armor_payload (type 5)', lambda: legacy_armor_payload(value=value,
+                                                                                       bits_count=bits_count))
+    measure('armor_payload (type 5)', lambda: armor_payload(value=value, bits_count=bits_count), baseline=baseline)
+    baseline = measure('legacy dearmor (type 5)', lambda: legacy_dearmor_payload(payload=data))
+    measure('dearmor_payload (type 5)', lambda: dearmor_payload(payload=data), baseline=baseline)
+    baseline = measure('legacy six-bit text (20 chars)', lambda: legacy_encode_sixbit_text(text=SHIP_NAME,
+                                                                                          chars_count=20))
+    measure('encode_sixbit_text (20 chars)', lambda: encode_sixbit_text(text=SHIP_NAME, chars_count=20),
+            baseline=baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,29 @@
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+from functools import partial
+import asyncio
 import json
 import sys
-import time
-from datetime import datetime
 import argparse
 
 from pydantic import ValidationError
 
-from ais.ais_track import AISTrackList
-from ais.ais_utils import Clients
-from nmea.nmea_stream import UDPStream
+from ais.ais_loader import TrackLoader
+from ais.ais_snapshot import is_snapshot, save_snapshot, save_tracks_json, SNAPSHOT_SUFFIX
+from ais.ais_checkpoint import Checkpointer, restore_checkpoint
+from ais.ais_motion import get_motion_model, MOTION_MODELS
+from ais.ais_scheduler import ReportScheduler, Ticker, SchedulerMetrics, MSG_TYPE_POSITION
+from ais.ais_shard import ShardedGenerator
+from ais.constants import ReportingIntervalEnum
+from ais.ais_utils import Clients, get_current_timestamp
+from nmea.nmea_fanout import FanOutEngine
+from nmea.nmea_tcp import TCPServerStream, TCP_DROP_POLICIES
+from nmea.nmea_stream import UDPStream, AsyncUDPStream, get_pacer, PACERS, MAX_DATAGRAM_SIZE
+from nmea.nmea_replay import NMEALog, LogReplay
+
+
+# Max time (in seconds) of loading AIS tracks at once - the rest of each tick is left for generating NMEA msgs
+TRACKS_LOAD_TIMEOUT = 0.2
 
 
 class AISDataTx:
@@ -18,111 +31,430 @@ class AISDataTx:
     Class represents generated AIS data for clients (customers).
     The AIS data is sent as UDP packets to clients in NMEA 0183 format and optionally can be displayed on CLI terminal.
     """
-    def __init__(self, tracks_file: str = 'data/tracks.json', terminal_output: bool = False, new_tracks_file: str = ''):
+    def __init__(self, tracks_file: str = 'data/tracks.json', terminal_output: bool = False, new_tracks_file: str = '',
+                 motion_model: str = 'geodesic', pacing: str = 'none', pacing_rate: float = 0,
+                 datagram_size: int = 0, bulk: bool = False, workers: int = 0, tcp_port: int = 0,
+                 tcp_drop_policy: str = 'drop_oldest', checkpoint_file: str = '', checkpoint_interval: float = 60,
+                 processes: int = 0, replay_file: str = '', replay_speed: float = 1.0, replay_seek: float = 0):
         self.tracks_file = tracks_file
         self.clients_file = 'data/clients.json'
-        self.track_list = None
+        self.fleet = None
+        self.track_loader = None
         self.clients = None
         self.terminal_output = terminal_output
         # Save current AIS tracks data to new JSON file
         self.new_tracks_file = new_tracks_file
+        # Motion model used to update AIS tracks positions
+        self.motion_model = get_motion_model(name=motion_model)
+        # Pacing of UDP datagrams (rate in datagrams per second)
+        self.pacing = pacing
+        self.pacing_rate = pacing_rate
+        self.pacer = get_pacer(name=pacing, rate=pacing_rate) if pacing_rate else get_pacer(name=pacing)
+        # Max size of UDP datagram with packed NMEA sentences (0 - single sentence per datagram)
+        self.datagram_size = datagram_size
+        # Send unpaced UDP datagrams in bulk (sendmmsg)
+        self.bulk = bulk
+        # Number of fan-out engine workers (0 - single sender thread)
+        self.workers = workers
+        # TCP server port (0 - TCP server disabled) and what to do with slow TCP readers
+        self.tcp_port = tcp_port
+        self.tcp_drop_policy = tcp_drop_policy
+        self.tcp_server = None
+        # Fleet state checkpoint (binary snapshot with delta log) written in the background with given interval
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpointer = None
+        # Number of worker processes generating NMEA msgs of tracks sharded by MMSI (0 - generated by this process)
+        self.processes = processes
+        # Recorded NMEA log replayed instead of generated AIS data - speed factor (0 - as fast as possible) and time
+        # offset (in seconds from the log start) of the replay
+        self.replay_file = replay_file
+        self.replay_speed = replay_speed
+        self.replay_seek = replay_seek
 
     def load_files(self) -> None:
         """
-        Loads clients and AIS tracks from JSON files.
+        Loads clients and the first part of AIS tracks from JSON files. The remaining tracks are loaded (streamed)
+        while NMEA msgs are generated.
         """
         try:
             # Load clients_file
             file_name = self.clients_file
             clients_list = Clients.parse_file(Path(file_name))
+            if self.replay_file:
+                # AIS tracks are not generated in the replay mode
+                self.clients = clients_list
+                return
             # Load tracks_file
             file_name = self.tracks_file
-            track_list = AISTrackList.parse_file(Path(file_name))
+            if is_snapshot(filename=file_name):
+                # Binary fleet snapshot is memory-mapped at once (with applied checkpoint delta log, if exists)
+                self.fleet = restore_checkpoint(filename=file_name)
+                self.clients = clients_list
+                print(f'Loaded {len(self.fleet)} AIS tracks from "{file_name}" snapshot')
+                return
+            self.track_loader = TrackLoader(filename=file_name)
+            # Tracks are validated once on load - the fleet state columns are the source of truth afterwards
+            self.fleet = self.track_loader.fleet
+            self.track_loader.load(timeout=TRACKS_LOAD_TIMEOUT)
+            self._report_load(first_error=0)
             self.clients = clients_list
-            self.track_list = track_list
             return
         except FileNotFoundError:
             print(f'Error: File {file_name} does not exist!')
         except json.decoder.JSONDecodeError as error:
             print(f'Error: File {file_name} - {error}')
+        except KeyError as error:
+            print(f'Error: File "{file_name}" - "{error.args[0]}" field required')
         except ValidationError as error:
             # Custom error msg
             error_data: List[Dict[str, Any]] = error.errors()
             error_msg: str = error_data[0]['msg']
-            item_no: int = error_data[0]['loc'][1] + 1
-            item_field: str = error_data[0]['loc'][-1]
-            print(f'Error: File "{file_name}" - check item with no {item_no}, "{item_field}" {error_msg}')
+            error_loc: tuple = error_data[0]['loc']
+            if len(error_loc) < 2:
+                # Error of the whole list (e.g. too many items)
+                print(f'Error: File "{file_name}" - "{error_loc[0]}" {error_msg}')
+            else:
+                item_no: int = error_loc[1] + 1
+                item_field: str = error_loc[-1]
+                print(f'Error: File "{file_name}" - check item with no {item_no}, "{item_field}" {error_msg}')
+        except ValueError as error:
+            # Invalid binary fleet snapshot
+            print(f'Error: File {file_name} - {error}')
         sys.exit()
 
-    def run(self, timer: int = 30):
+    def load_next_tracks(self, scheduler: ReportScheduler, now: float) -> None:
         """
-        Starts the process of sending AIS tracks data to selected hosts.
+        Loads next part of AIS tracks (if the tracks file is still being loaded) and schedules their first reports.
+        Invalid tracks are reported and skipped. Invalid JSON stops the loading - already loaded tracks are kept.
+        """
+        loader = self.track_loader
+        if loader is None or loader.done:
+            return
+        indices = self._load_tracks(timeout=TRACKS_LOAD_TIMEOUT)
+        if indices:
+            scheduler.schedule_new_tracks(fleet=self.fleet, start=now, indices=indices)
+
+    def _load_tracks(self, timeout: Optional[float]) -> range:
+        """
+        Loads next part of AIS tracks (all remaining tracks, if timeout is None). Returns indices of loaded tracks.
+        """
+        loader = self.track_loader
+        first_error = len(loader.errors)
+        try:
+            indices = loader.load(timeout=timeout)
+        except (OSError, ValueError, KeyError) as error:
+            print(f'Error: File {loader.filename} - {error}. Loading of AIS tracks stopped.')
+            indices = range(len(self.fleet), len(self.fleet))
+        self._report_load(first_error=first_error)
+        return indices
+
+    def _report_load(self, first_error: int) -> None:
+        """
+        Displays validation errors of AIS tracks (starting from given error) and summary, when the loading is done.
+        """
+        loader = self.track_loader
+        for error in loader.errors[first_error:]:
+            print(f'Error: File "{loader.filename}" - {error}')
+        if loader.done:
+            print(f'Loaded {len(self.fleet)} AIS tracks from "{loader.filename}" file '
+                  f'({loader.invalid_count} invalid items skipped)')
+
+    def generate_due_msgs(self, scheduler: ReportScheduler, now: float) -> List[bytes]:
+        """
+        Generates NMEA msgs for all AIS reports due at the given time and schedules the next reports.
+        Positions are updated only for tracks with a position report due. Msgs are returned as ready to send bytes.
+        Next part of AIS tracks is loaded first, if the tracks file is still being loaded. Fleet state is
+        checkpointed after the msgs generation, if the checkpoint is due.
+        """
+        self.load_next_tracks(scheduler=scheduler, now=now)
+        due_reports = scheduler.pop_due(now=now)
+        position_indices = [index for _, index, msg_type in due_reports if msg_type == MSG_TYPE_POSITION]
+        if position_indices:
+            self.fleet.update_positions(current_timestamp=now,
+                                        motion_model=self.motion_model,
+                                        indices=position_indices)
+        nmea_msgs = []
+        for report in due_reports:
+            _, index, msg_type = report
+            track = self.fleet[index]
+            if msg_type == MSG_TYPE_POSITION:
+                nmea_msgs += track.generate_nmea_type_1(as_bytes=True)
+            else:
+                nmea_msgs += track.generate_nmea_type_5(as_bytes=True)
+            scheduler.reschedule(report=report, fleet=self.fleet)
+        if self.checkpointer:
+            # Changed tracks are copied here (bounded pause) and written by the checkpointer thread
+            self.checkpointer.checkpoint(now=now)
+        return nmea_msgs
+
+    def _start(self, tick: float) -> Tuple[ReportScheduler, Ticker]:
+        """
+        Loads data files and schedules first AIS reports of all tracks. Returns scheduler and its ticker.
         """
         self.load_files()
-        udp = UDPStream(clients=self.clients)
+        self._start_output()
+        start = get_current_timestamp()
+        scheduler = ReportScheduler(start=start, tick=tick)
+        scheduler.schedule_tracks(fleet=self.fleet, start=start)
+        ticker = Ticker(tick=tick, metrics=scheduler.metrics)
+        if self.checkpoint_file:
+            self.checkpointer = Checkpointer(fleet=self.fleet,
+                                             filename=self.checkpoint_file,
+                                             interval=self.checkpoint_interval)
+        return scheduler, ticker
+
+    def _start_output(self) -> None:
+        """
+        Displays start info and starts TCP server (if enabled).
+        """
+        step = ReportingIntervalEnum.speed_0_14
+        print(f'Motion model: {self.motion_model.name} '
+              f'(max position error {self.motion_model.max_error(step=step):.3f} m per {step} s step)')
         print('Press "Ctrl + c" to exit\n')
         print(f'Sending NMEA AIS data via UDP stream...\n')
         if self.terminal_output:
             print('NMEA AIS data output:')
+        self._start_tcp_server()
+
+    def _start_tcp_server(self) -> None:
+        """
+        Starts TCP server (if enabled).
+        """
+        if self.tcp_port:
+            self.tcp_server = TCPServerStream(port=self.tcp_port, drop_policy=self.tcp_drop_policy)
+            print(f'TCP server listening on port {self.tcp_server.address[1]}\n')
+
+    def _publish(self, nmea_msgs: List[bytes]) -> None:
+        """
+        Queues NMEA data for TCP clients and prints it to terminal output (if enabled).
+        """
+        if self.tcp_server and nmea_msgs:
+            self.tcp_server.run(data=nmea_msgs)
+        if self.terminal_output:
+            for msg in nmea_msgs:
+                print(msg.decode(), end='')
+
+    def _exit(self, metrics: SchedulerMetrics) -> None:
+        """
+        Displays scheduler statistics, writes the last checkpoint and saves AIS tracks data (if required) before
+        the script exits.
+        """
+        print(f'\nScheduler: {metrics}')
+        if self.tcp_server:
+            self.tcp_server.close()
+            for connection_stats in self.tcp_server.stats:
+                print(f'TCP connection {connection_stats}')
+        if self.checkpointer:
+            print(f'\nWriting the last checkpoint to "{self.checkpoint_file}" file...')
+            self.checkpointer.close()
+            print(f'Checkpointer: {self.checkpointer.stats}')
+            if self.checkpointer.last_error:
+                print(f'Error: Checkpoint file {self.checkpoint_file} - {self.checkpointer.last_error}')
+        new_tracks_file = self.new_tracks_file
+        if new_tracks_file:
+            if self.track_loader and not self.track_loader.done:
+                # Tracks not loaded yet would be lost (e.g. the tracks file overwritten with the loaded ones)
+                print(f'\nLoading the remaining AIS tracks from "{self.track_loader.filename}" file...')
+                self._load_tracks(timeout=None)
+            print(f'\nSaving AIS data to "{new_tracks_file}" file...')
+            self.save_tracks_to_new_file(filename=new_tracks_file)
+        print('\nClosing the script...\n')
+
+    def run(self, tick: float = 0.5):
+        """
+        Starts the process of sending AIS tracks data to selected hosts.
+        Each track reports with its own interval (ITU-R M.1371), reports due within the same tick are sent together.
+        """
+        scheduler, ticker = self._start(tick=tick)
+        udp = self._create_udp_stream()
+        while True:
+            try:
+                nmea_msgs = self.generate_due_msgs(scheduler=scheduler, now=ticker.wait())
+                if nmea_msgs:
+                    # Send UDP packets with NMEA data
+                    udp.run(data=nmea_msgs)
+                self._publish(nmea_msgs=nmea_msgs)
+            except KeyboardInterrupt:
+                udp.close()
+                print(f'\nUDP stream: {udp.stats}')
+                self._exit(metrics=scheduler.metrics)
+                sys.exit()
+
+    def run_sharded(self, tick: float = 0.5):
+        """
+        Starts the process of sending AIS tracks data to selected hosts (multiprocess version of the run method).
+        Tracks are sharded by MMSI across worker processes, which update positions and encode NMEA msgs of their
+        shards - this process only sends the msgs. The whole tracks file is loaded first (shards are fixed).
+        """
+        self.load_files()
+        if self.track_loader and not self.track_loader.done:
+            self._load_tracks(timeout=None)
+        # Workers are started (forked) before the other threads
+        generator = ShardedGenerator(fleet=self.fleet,
+                                     processes=self.processes,
+                                     motion_model=self.motion_model.name,
+                                     tick=tick)
+        generator.start()
+        print(f'NMEA msgs generated by {self.processes} worker processes '
+              f'({", ".join(str(len(indices)) for indices in generator.shard_indices)} tracks)')
+        self._start_output()
+        udp = self._create_udp_stream()
         while True:
             try:
-                timer_start = time.perf_counter()
-                nmea_msgs = []
-                for track in self.track_list.tracks:
-                    # Update AIS track position with each while loop run
-                    current_timestamp = datetime.utcnow().timestamp()
-                    if track.speed > 0:
-                        # Updated only if track in move
-                        track.update_position(current_timestamp=current_timestamp)
-                    nmea_msgs += track.generate_nmea()
-                # Send UDP packets with NMEA data
-                udp.run(data=nmea_msgs)
-                # Print NMEA dat to terminal output
-                if self.terminal_output:
-                    for msg in nmea_msgs:
-                        print(msg, end='')
-                        time.sleep(0.02)
-                time.sleep(timer - (time.perf_counter() - timer_start))
+                nmea_msgs = generator.get_msgs(timeout=tick)
+                if nmea_msgs:
+                    # Send UDP packets with NMEA data
+                    udp.run(data=nmea_msgs)
+                self._publish(nmea_msgs=nmea_msgs)
             except KeyboardInterrupt:
-                new_tracks_file = self.new_tracks_file
-                if new_tracks_file:
-                    print(f'\nSaving AIS data to "{new_tracks_file}" file...')
-                    self.save_tracks_to_new_file(filename=new_tracks_file)
-                print('\nClosing the script...\n')
+                udp.close()
+                print(f'\nUDP stream: {udp.stats}')
+                self.fleet = generator.stop()
+                for stats in generator.stats:
+                    print(f'Shard {stats}')
+                self._exit(metrics=generator.metrics)
                 sys.exit()
 
+    def run_replay(self):
+        """
+        Starts the process of sending recorded NMEA data (log file) to selected hosts. Sentences are sent with
+        the original timing (scaled by the replay speed) starting from the replay time offset.
+        """
+        self.load_files()
+        try:
+            log = NMEALog(filename=self.replay_file)
+        except OSError as error:
+            print(f'Error: File {self.replay_file} - {error}')
+            sys.exit()
+        speed = f'{self.replay_speed:g}x speed' if self.replay_speed else 'max speed'
+        print(f'Replaying {log.sentences_count} NMEA sentences ({log.duration:.0f} s) from "{self.replay_file}" file '
+              f'at {speed}')
+        print('Press "Ctrl + c" to exit\n')
+        if self.terminal_output:
+            print('NMEA AIS data output:')
+        self._start_tcp_server()
+        udp = self._create_udp_stream()
+        replay = LogReplay(log=log, speed=self.replay_speed)
+        try:
+            for nmea_msgs in replay.replay(time_offset=self.replay_seek):
+                # Send UDP packets with NMEA data - replay waits for the sender, so no data is dropped
+                udp.run(data=nmea_msgs, block=True)
+                self._publish(nmea_msgs=nmea_msgs)
+            # Queued data is sent before the stream is closed
+            udp.flush()
+            print('\nEnd of the NMEA log')
+        except KeyboardInterrupt:
+            pass
+        udp.close()
+        log.close()
+        print(f'\nUDP stream: {udp.stats}')
+        print(f'Replay: {replay.stats}')
+        if self.tcp_server:
+            self.tcp_server.close()
+        print('\nClosing the script...\n')
+
+    def _create_udp_stream(self):
+        """
+        Returns UDP stream - fan-out engine, if workers are set, otherwise the sender thread.
+        """
+        if self.workers:
+            return FanOutEngine(clients=self.clients,
+                                workers=self.workers,
+                                pacing=self.pacing,
+                                pacing_rate=self.pacing_rate,
+                                datagram_size=self.datagram_size)
+        return UDPStream(clients=self.clients, pacer=self.pacer, datagram_size=self.datagram_size, bulk=self.bulk)
+
+    async def run_async(self, tick: float = 0.5):
+        """
+        Starts the process of sending AIS tracks data to selected hosts (asyncio version of the run method).
+        NMEA msgs are generated in the executor thread, while the previous msgs are sent by the event loop.
+        """
+        scheduler, ticker = self._start(tick=tick)
+        udp = AsyncUDPStream(clients=self.clients, pacer=self.pacer, datagram_size=self.datagram_size)
+        await udp.start()
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await asyncio.sleep(ticker.next_delay())
+                nmea_msgs = await loop.run_in_executor(None, partial(self.generate_due_msgs,
+                                                                     scheduler=scheduler,
+                                                                     now=ticker.clock()))
+                if nmea_msgs:
+                    # Send UDP packets with NMEA data
+                    udp.run(data=nmea_msgs)
+                self._publish(nmea_msgs=nmea_msgs)
+        except asyncio.CancelledError:
+            await udp.close()
+            print(f'\nUDP stream: {udp.stats}')
+            self._exit(metrics=scheduler.metrics)
+            raise
+
     def save_tracks_to_new_file(self, filename: str):
         """
-        Dumps AIS tracks to new JSON file.
-        """
-        path = Path(filename)
-        if self.new_tracks_file and self.track_list:
-            # Convert AISTrackList model to dictionary & exclude not set fields or with default values
-            tracks: List[Dict] = self.track_list.dict(exclude_unset=True)['tracks']
-            # Strip selected AIS track attrs (model fields) values
-            for track in tracks:
-                values_to_strip = ['ship_name', 'destination', 'call_sign']
-                for string in values_to_strip:
-                    track[string] = track[string].strip()
-            # Dump data as a dict
-            tracks_to_dump = {
-                'tracks': tracks
-            }
-            with open(path, 'w') as write_file:
-                json.dump(tracks_to_dump, write_file, indent=4)
+        Dumps AIS tracks to new JSON file or to binary fleet snapshot (filename with '.snap' suffix).
+        """
+        if self.new_tracks_file and self.fleet:
+            if Path(filename).suffix == SNAPSHOT_SUFFIX:
+                save_snapshot(fleet=self.fleet, filename=filename)
+            else:
+                save_tracks_json(fleet=self.fleet, filename=filename)
 
 
 if __name__ == '__main__':
-    default_timer = 15
-
     parser = argparse.ArgumentParser(description='The NMEA AIS data generating script')
     parser.add_argument('-f', '--filename', default='data/tracks.json', type=str,
-                        help='JSON filename with initial AIS tracks data (default: data/tracks.json)')
+                        help='JSON filename (or binary fleet snapshot) with initial AIS tracks data '
+                             '(default: data/tracks.json)')
     parser.add_argument('-s', '--save', type=str,
-                        help='JSON filename to which the updated AIS data should be saved when the script exits')
+                        help='JSON filename to which the updated AIS data should be saved when the script exits '
+                             f'(binary fleet snapshot, if the filename ends with "{SNAPSHOT_SUFFIX}")')
     parser.add_argument('-o', '--output', action="store_true",
                         help='Display NMEA AIS data on the terminal screen')
+    parser.add_argument('-m', '--motion-model', default='geodesic', choices=list(MOTION_MODELS),
+                        help='Motion model used to update AIS tracks positions (default: geodesic)')
+    parser.add_argument('-p', '--pacing', default='none', choices=list(PACERS),
+                        help='Pacing of sent UDP datagrams (default: none)')
+    parser.add_argument('-r', '--rate', type=float,
+                        help='Pacing rate in datagrams per second (default: 20 for fixed, 1000 for token_bucket)')
+    parser.add_argument('-d', '--datagram-size', type=int, nargs='?', const=MAX_DATAGRAM_SIZE,
+                        help=f'Pack NMEA sentences into UDP datagrams up to given size in bytes '
+                             f'(default: single sentence per datagram, {MAX_DATAGRAM_SIZE} if no size is given)')
+    parser.add_argument('-b', '--bulk', action='store_true',
+                        help='Send unpaced UDP datagrams in bulk - sendmmsg syscall (Linux only)')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='Send UDP datagrams to many clients with the fan-out engine using given number of '
+                             'worker threads (per-client pacing with optional "rate" field in clients file)')
+    parser.add_argument('-t', '--tcp-port', type=int,
+                        help='Send NMEA AIS data also to clients connected to TCP server on given port')
+    parser.add_argument('--tcp-drop-policy', default='drop_oldest', choices=list(TCP_DROP_POLICIES),
+                        help='What to do with slow TCP readers - drop the oldest queued data or disconnect '
+                             '(default: drop_oldest)')
+    parser.add_argument('-c', '--checkpoint', type=str,
+                        help='Binary fleet snapshot file to which AIS data is checkpointed in the background '
+                             '(changed tracks are appended to the delta log file with ".delta" suffix)')
+    parser.add_argument('--checkpoint-interval', type=float, default=60,
+                        help='Checkpoint interval in seconds (default: 60)')
+    parser.add_argument('-a', '--asyncio', action='store_true',
+                        help='Send NMEA AIS data with asyncio event loop (instead of the sender thread)')
+    parser.add_argument('-n', '--processes', type=int,
+                        help='Generate NMEA AIS data in given number of worker processes - tracks sharded by MMSI '
+                             '(cannot be used with checkpoint or asyncio)')
+    parser.add_argument('--replay', type=str,
+                        help='Replay recorded NMEA log file (instead of generating AIS data) - sentences with optional '
+                             'receive time (TAG block, UNIX time before or after the sentence)')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Replay speed factor - 1 for the original timing, 0 for as fast as possible (default: 1)')
+    parser.add_argument('--replay-seek', type=float, default=0,
+                        help='Start the replay at given time offset in seconds from the log start (default: 0)')
     args = parser.parse_args()
+    if args.processes and (args.checkpoint or args.asyncio):
+        parser.error('argument -n/--processes: not allowed with argument -c/--checkpoint or -a/--asyncio')
+    if args.workers is not None and args.workers < 1:
+        parser.error('argument -w/--workers: must be greater than or equal to 1')
+    if args.replay_speed < 0:
+        parser.error('argument --replay-speed: must be greater than or equal to 0')
 
     # Get data from argparse
     ais_class_attr = {}
@@ -132,5 +464,40 @@ if __name__ == '__main__':
         ais_class_attr['new_tracks_file'] = args.save
     if args.output:
         ais_class_attr['terminal_output'] = args.output
+    if args.motion_model:
+        ais_class_attr['motion_model'] = args.motion_model
+    if args.pacing:
+        ais_class_attr['pacing'] = args.pacing
+    if args.rate:
+        ais_class_attr['pacing_rate'] = args.rate
+    if args.datagram_size:
+        ais_class_attr['datagram_size'] = args.datagram_size
+    if args.bulk:
+        ais_class_attr['bulk'] = args.bulk
+    if args.workers:
+        ais_class_attr['workers'] = args.workers
+    if args.tcp_port:
+        ais_class_attr['tcp_port'] = args.tcp_port
+        ais_class_attr['tcp_drop_policy'] = args.tcp_drop_policy
+    if args.checkpoint:
+        ais_class_attr['checkpoint_file'] = args.checkpoint
+        ais_class_attr['checkpoint_interval'] = args.checkpoint_interval
+    if args.processes:
+        ais_class_attr['processes'] = args.processes
+    if args.replay:
+        ais_class_attr['replay_file'] = args.replay
+        ais_class_attr['replay_speed'] = args.replay_speed
+        ais_class_attr['replay_seek'] = args.replay_seek
     # Run AIS emulator
-    AISDataTx(**ais_class_attr).run(timer=default_timer)
\ No newline at end of file
+    ais_data_tx = AISDataTx(**ais_class_attr)
+    if args.replay:
+        ais_data_tx.run_replay()
+    elif args.asyncio:
+        try:
+            asyncio.run(ais_data_tx.run_async())
+        except KeyboardInterrupt:
+            pass
+    elif args.processes:
+        ais_data_tx.run_sharded()
+    else:
+        ais_data_tx.run()
\ No newline at end of file
@@ -0,0 +1,125 @@
+from typing import List, Union
+
+import numpy as np
+
+from nmea.nmea_utils import SIXBIT_ARMOR_CHARS
+from nmea.nmea_layout import TYPE_1_LAYOUT
+from ais.constants import AISMsgType1ConstsEnum
+
+
+# Six-bit value to armored ASCII code lookup table.
+ARMOR_TABLE = np.frombuffer(SIXBIT_ARMOR_CHARS.encode(), dtype=np.uint8)
+# Nibble to upper-case hex digit ASCII code lookup table.
+HEX_TABLE = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+TYPE_1_PAYLOAD_BITS = TYPE_1_LAYOUT.bits_count
+TYPE_1_PAYLOAD_CHARS = TYPE_1_PAYLOAD_BITS // 6
+# The payload is packed into 64-bit words holding 7 six-bit items (42 bits) each.
+WORD_BITS = 42
+WORD_CHARS = WORD_BITS // 6
+# Number of msgs encoded at once - bounds the size of intermediate arrays.
+BATCH_CHUNK_SIZE = 65536
+
+
+def _xor_reduce(data: bytes) -> int:
+    """
+    Returns XOR of all given bytes.
+    """
+    check_sum = 0
+    for num in data:
+        check_sum ^= num
+    return check_sum
+
+
+def _field_word_parts(offset: int, bits_count: int) -> List[tuple]:
+    """
+    Returns list of (word index, value shift, part mask, word shift) tuples for a field placed at a given payload offset.
+    Field bits that cross the words boundary are split into separate parts.
+    """
+    parts = []
+    field_end = offset + bits_count
+    while offset < field_end:
+        word_index = offset // WORD_BITS
+        part_end = min(field_end, (word_index + 1) * WORD_BITS)
+        part_bits = part_end - offset
+        value_shift = field_end - part_end
+        word_shift = (word_index + 1) * WORD_BITS - part_end
+        parts.append((word_index, value_shift, (1 << part_bits) - 1, word_shift))
+        offset = part_end
+    return parts
+
+
+def _pack_type_1_sixbits(fields: dict, rows: int) -> np.ndarray:
+    """
+    Packs columns (or scalars) of AIS msg type 1 field values into an (N, 28) array of six-bit values.
+    """
+    words = [np.zeros(rows, dtype=np.uint64) for _ in range(TYPE_1_PAYLOAD_BITS // WORD_BITS)]
+    for field in TYPE_1_LAYOUT.fields:
+        # Two's complement masking for signed fields
+        values = (np.asarray(fields[field.name]).astype(np.int64) & ((1 << field.width) - 1)).astype(np.uint64)
+        for word_index, value_shift, mask, word_shift in _field_word_parts(offset=field.offset, bits_count=field.width):
+            words[word_index] |= ((values >> np.uint64(value_shift)) & np.uint64(mask)) << np.uint64(word_shift)
+    sixbits = np.empty((rows, TYPE_1_PAYLOAD_CHARS), dtype=np.uint8)
+    for word_index, word in enumerate(words):
+        for char_index in range(WORD_CHARS):
+            shift = np.uint64(WORD_BITS - 6 * (char_index + 1))
+            sixbits[:, word_index * WORD_CHARS + char_index] = (word >> shift) & np.uint64(0x3f)
+    return sixbits
+
+
+def encode_type1_batch(mmsi, lon, lat, speed, course, heading=511, nav_status=15, timestamp=60,
+                       repeat_indicator=0, ais_channel: str = 'A', as_bytes: bool = False) -> Union[List[str], bytes]:
+    """
+    Encodes columns of AIS msg type 1 (Position Report Class A) data into '!AIVDM' NMEA sentences.
+    Arguments can be NumPy arrays, sequences or scalars (broadcast to the length of the other columns).
+    Returns list of sentences (same as NMEAMessage.get_sentences) or a single bytes buffer if as_bytes is set.
+    """
+    columns = np.broadcast_arrays(*[np.asarray(column) for column in
+                                    [mmsi, lon, lat, speed, course, heading, nav_status, timestamp, repeat_indicator]])
+    mmsi, lon, lat, speed, course, heading, nav_status, timestamp, repeat_indicator = [np.ravel(c) for c in columns]
+    const = AISMsgType1ConstsEnum
+    rows = len(mmsi)
+    # Constant parts of the sentence
+    prefix = f'!AIVDM,1,1,,{ais_channel},'.encode()
+    suffix = b',0'
+    sentence_size = len(prefix) + TYPE_1_PAYLOAD_CHARS + len(suffix) + 5
+    base_checksum = _xor_reduce(prefix[1:] + suffix)
+
+    output = np.empty((rows, sentence_size), dtype=np.uint8)
+    payload_start = len(prefix)
+    payload_end = payload_start + TYPE_1_PAYLOAD_CHARS
+    output[:, :payload_start] = np.frombuffer(prefix, dtype=np.uint8)
+    output[:, payload_end:payload_end + 3] = np.frombuffer(suffix + b'*', dtype=np.uint8)
+    output[:, -2:] = np.frombuffer(b'\r\n', dtype=np.uint8)
+
+    for start in range(0, rows, BATCH_CHUNK_SIZE):
+        chunk = slice(start, start + BATCH_CHUNK_SIZE)
+        chunk_rows = len(mmsi[chunk])
+        fields = {
+            'msg_type': const.msg_type,
+            'repeat_indicator': repeat_indicator[chunk],
+            'mmsi': mmsi[chunk],
+            'nav_status': nav_status[chunk],
+            'rot': const.rot,
+            'speed': np.trunc(speed[chunk] * 10),
+            'pos_accuracy': const.pos_accuracy,
+            'lon': np.trunc(lon[chunk] * 600000),
+            'lat': np.trunc(lat[chunk] * 600000),
+            'course': np.trunc(course[chunk] * 10),
+            'true_heading': heading[chunk],
+            'timestamp': timestamp[chunk],
+            'maneuver': const.maneuver,
+            'spare_type_1': const.spare_type_1,
+            'raim': const.raim,
+            'radio_status': const.radio_status,
+        }
+        payload_chars = ARMOR_TABLE[_pack_type_1_sixbits(fields=fields, rows=chunk_rows)]
+        check_sum = np.bitwise_xor.reduce(payload_chars, axis=1) ^ base_checksum
+        output[chunk, payload_start:payload_end] = payload_chars
+        output[chunk, -4] = HEX_TABLE[check_sum >> 4]
+        output[chunk, -3] = HEX_TABLE[check_sum & 0x0f]
+
+    buffer = output.tobytes()
+    if as_bytes:
+        return buffer
+    return buffer.decode().splitlines(keepends=True)
@@ -0,0 +1,178 @@
+from typing import Callable, List, Optional, Tuple
+import ctypes
+import ctypes.util
+import os
+import socket
+import sys
+
+import numpy as np
+
+
+# Max number of msgs sent by a single sendmmsg call (Linux UIO_MAXIOV)
+SENDMMSG_MAX_VLEN = 1024
+
+
+class IoVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p),
+                ('iov_len', ctypes.c_size_t)]
+
+
+class MsgHdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p),
+                ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.c_void_p),
+                ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p),
+                ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+
+class MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', MsgHdr),
+                ('msg_len', ctypes.c_uint)]
+
+
+class SockAddrIn(ctypes.Structure):
+    _fields_ = [('sin_family', ctypes.c_ushort),
+                ('sin_port', ctypes.c_uint16),
+                ('sin_addr', ctypes.c_uint8 * 4),
+                ('sin_zero', ctypes.c_uint8 * 8)]
+
+
+def _load_sendmmsg() -> Optional[Callable]:
+    """
+    Returns libc sendmmsg function or None, if not available (sendmmsg is Linux only).
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+
+class SendStats:
+    """
+    Class represents UDP sending statistics - send cycles, syscalls, datagrams and time spent on sending.
+    Datagrams dropped from the full queue (sender was behind) are counted too.
+    """
+    def __init__(self) -> None:
+        self.cycles = 0
+        self.syscalls = 0
+        self.datagrams = 0
+        self.send_time = 0.0
+        self.dropped = 0
+
+    def add(self, syscalls: int, datagrams: int, send_time: float) -> None:
+        self.cycles += 1
+        self.syscalls += syscalls
+        self.datagrams += datagrams
+        self.send_time += send_time
+
+    @property
+    def syscalls_per_cycle(self) -> float:
+        return self.syscalls / self.cycles if self.cycles else 0.0
+
+    @property
+    def datagrams_per_second(self) -> float:
+        return self.datagrams / self.send_time if self.send_time else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.datagrams} datagrams in {self.cycles} cycles, ' \
+               f'{self.syscalls_per_cycle:.1f} syscalls per cycle, {self.datagrams_per_second:.0f} datagrams/s, ' \
+               f'{self.dropped} datagrams dropped'
+
+
+class SocketSender:
+    """
+    Class represents datagrams sender using one sendto syscall per datagram per host.
+    """
+    name = 'sendto'
+
+    def send(self, sock: socket.socket, datagrams: List[bytes], addresses: List[Tuple[str, int]]) -> Tuple[int, int]:
+        """
+        Sends all datagrams to all hosts. Returns tuple - (number of datagrams sent, number of syscalls).
+        """
+        sent_count = 0
+        syscalls = 0
+        for address in addresses:
+            for datagram in datagrams:
+                syscalls += 1
+                try:
+                    sock.sendto(datagram, address)
+                    sent_count += 1
+                except OSError as err:
+                    # Skip the host until the next data is sent
+                    print(f'Error: {address[0]}:{address[1]} - {err.strerror}')
+                    break
+        return sent_count, syscalls
+
+
+class MMsgSender(SocketSender):
+    """
+    Class represents datagrams sender using Linux sendmmsg syscall (via ctypes) - up to 1024 datagrams per syscall.
+    The msg headers are built as a NumPy array pointing into a single buffer with all datagrams.
+    """
+    name = 'sendmmsg'
+
+    def __init__(self) -> None:
+        self._sendmmsg = _load_sendmmsg()
+        if self._sendmmsg is None:
+            raise OSError('sendmmsg is not available on this platform')
+        self._sockaddrs = {}
+
+    def _get_sockaddr(self, address: Tuple[str, int]) -> SockAddrIn:
+        """
+        Returns (cached) IPv4 socket address structure.
+        """
+        if address not in self._sockaddrs:
+            host, port = address
+            sockaddr = SockAddrIn(sin_family=socket.AF_INET, sin_port=socket.htons(port))
+            ctypes.memmove(sockaddr.sin_addr, socket.inet_aton(host), 4)
+            self._sockaddrs[address] = sockaddr
+        return self._sockaddrs[address]
+
+    def send(self, sock: socket.socket, datagrams: List[bytes], addresses: List[Tuple[str, int]]) -> Tuple[int, int]:
+        if not datagrams:
+            return 0, 0
+        # All datagrams in one buffer - one io vector (offset, length) per datagram
+        buffer = np.frombuffer(b''.join(datagrams), dtype=np.uint8)
+        lengths = np.fromiter(map(len, datagrams), dtype=np.uint64, count=len(datagrams))
+        iovecs = np.zeros(len(datagrams), dtype=np.dtype(IoVec))
+        iovecs['iov_base'] = buffer.ctypes.data + np.cumsum(lengths) - lengths
+        iovecs['iov_len'] = lengths
+        msgs = np.zeros(len(datagrams), dtype=np.dtype(MMsgHdr))
+        msgs['msg_hdr']['msg_namelen'] = ctypes.sizeof(SockAddrIn)
+        msgs['msg_hdr']['msg_iov'] = iovecs.ctypes.data + np.arange(len(datagrams), dtype=np.uint64) * iovecs.itemsize
+        msgs['msg_hdr']['msg_iovlen'] = 1
+        sent_count = 0
+        syscalls = 0
+        for address in addresses:
+            msgs['msg_hdr']['msg_name'] = ctypes.addressof(self._get_sockaddr(address=address))
+            offset = 0
+            while offset < len(msgs):
+                vlen = min(len(msgs) - offset, SENDMMSG_MAX_VLEN)
+                syscalls += 1
+                result = self._sendmmsg(sock.fileno(), msgs.ctypes.data + offset * msgs.itemsize, vlen, 0)
+                if result < 0:
+                    err = ctypes.get_errno()
+                    # Skip the host until the next data is sent
+                    print(f'Error: {address[0]}:{address[1]} - {os.strerror(err)}')
+                    break
+                offset += result
+                sent_count += result
+        return sent_count, syscalls
+
+
+def get_bulk_sender() -> SocketSender:
+    """
+    Returns sendmmsg based sender, if available - otherwise sender with one sendto syscall per datagram.
+    """
+    try:
+        return MMsgSender()
+    except OSError:
+        return SocketSender()
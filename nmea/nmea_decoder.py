@@ -0,0 +1,481 @@
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from nmea.nmea_layout import PayloadLayout, TYPE_1_LAYOUT, TYPE_5_LAYOUT, DEARMOR_ARRAY
+from nmea.nmea_msg import AISMsgPayloadType1, AISMsgPayloadType5
+from nmea.nmea_utils import xor_checksum, dearmor_payload, SIXBIT_DEARMOR_TABLE, INVALID_SIXBIT
+
+
+# Layouts of supported AIS msg types
+PAYLOAD_LAYOUTS: Dict[int, PayloadLayout] = {1: TYPE_1_LAYOUT, 5: TYPE_5_LAYOUT}
+PAYLOAD_MODELS = {1: AISMsgPayloadType1, 5: AISMsgPayloadType5}
+# Supported sentence formatters - AIVDM (data from other vessels) and AIVDO (own vessel data)
+SENTENCE_FORMATTERS = (b'VDM', b'VDO')
+# Min number of lines in a chunk for which the checksums are verified with NumPy (instead of one by one)
+VECTORIZED_MIN_LINES = 16
+# Hex digit ASCII code to value lookup table (invalid digits map to 0x100, so the checksum never matches).
+HEX_VALUES = np.full(256, 0x100, dtype=np.int32)
+HEX_VALUES[np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)] = np.arange(16)
+HEX_VALUES[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+# Max length of incomplete line kept until the next feed - longer line is not a sentence (the standard limit is 82
+# chars, some sources send longer ones), it is dropped up to the next line ending
+MAX_SENTENCE_LENGTH = 256
+# Single byte objects by ASCII code (one-char channels are looked up instead of sliced from the buffer).
+BYTE_CHARS = [bytes((code,)) for code in range(256)]
+
+
+class AIVDMSentence(NamedTuple):
+    """
+    Class represents single parsed AIVDM sentence (one fragment of AIS msg).
+    """
+    count: int
+    number: int
+    seq_msg_id: bytes
+    channel: bytes
+    payload: bytes
+    fill_bits: int
+
+
+class AISMessage(NamedTuple):
+    """
+    Class represents AIS msg decoded from AIVDM sentences (multi-sentence msgs are already reassembled).
+    Payload fields are unpacked on demand.
+    """
+    msg_type: int
+    channel: bytes
+    payload: bytes
+    fill_bits: int
+
+    @property
+    def layout(self) -> PayloadLayout:
+        if self.msg_type not in PAYLOAD_LAYOUTS:
+            raise ValueError(f'Unsupported AIS msg type {self.msg_type}')
+        return PAYLOAD_LAYOUTS[self.msg_type]
+
+    def fields(self) -> Dict[str, Any]:
+        """
+        Returns payload fields values (nested dicts for 'dimension' & 'eta' fields).
+        """
+        layout = self.layout
+        bits_count = len(self.payload) * 6 - self.fill_bits
+        if bits_count != layout.bits_count:
+            raise ValueError(f'Invalid AIS msg type {self.msg_type} payload length ({bits_count} bits)')
+        return layout.decode(value=dearmor_payload(payload=self.payload) >> self.fill_bits)
+
+    def to_payload(self) -> Union[AISMsgPayloadType1, AISMsgPayloadType5]:
+        """
+        Returns (validated) payload model of the msg.
+        """
+        return PAYLOAD_MODELS[self.msg_type](fill_bits=self.fill_bits, **self.fields())
+
+
+# Creates AISMessage from a tuple of fields (faster than AISMessage._make - no length check).
+_new_msg = partial(tuple.__new__, AISMessage)
+
+
+class AISMessageBatch(Sequence):
+    """
+    Class represents sequence of AIS msgs decoded from a chunk of NMEA stream. Msgs fields are kept in columns
+    (lists), AISMessage objects are created on access - no object is allocated (and tracked by the garbage
+    collector) per msg.
+    """
+    __slots__ = ('msg_types', 'channels', 'payloads', 'fill_bits')
+
+    def __init__(self, msg_types: Optional[List[int]] = None, channels: Optional[List[bytes]] = None,
+                 payloads: Optional[List[bytes]] = None, fill_bits: Optional[List[int]] = None) -> None:
+        self.msg_types = msg_types or []
+        self.channels = channels or []
+        self.payloads = payloads or []
+        self.fill_bits = fill_bits or []
+
+    @classmethod
+    def from_msgs(cls, msgs: Iterable[AISMessage]) -> 'AISMessageBatch':
+        """
+        Returns batch of given msgs.
+        """
+        columns = [list(column) for column in zip(*msgs)]
+        return cls(*columns)
+
+    @classmethod
+    def join(cls, batches: Iterable['AISMessageBatch']) -> 'AISMessageBatch':
+        """
+        Returns batch of msgs of all given batches (e.g. returned by the decoder for consecutive chunks).
+        """
+        joined = cls()
+        for batch in batches:
+            joined.msg_types += batch.msg_types
+            joined.channels += batch.channels
+            joined.payloads += batch.payloads
+            joined.fill_bits += batch.fill_bits
+        return joined
+
+    def __len__(self) -> int:
+        return len(self.msg_types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return AISMessageBatch(self.msg_types[index], self.channels[index], self.payloads[index],
+                                   self.fill_bits[index])
+        return _new_msg((self.msg_types[index], self.channels[index], self.payloads[index], self.fill_bits[index]))
+
+    def __iter__(self) -> Iterator[AISMessage]:
+        return map(_new_msg, zip(self.msg_types, self.channels, self.payloads, self.fill_bits))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)!r})'
+
+
+class DecoderStats:
+    """
+    Class represents AIVDM decoder statistics.
+    """
+    def __init__(self) -> None:
+        self.sentences = 0
+        self.msgs = 0
+        self.checksum_errors = 0
+        self.invalid_sentences = 0
+        # Fragments of multi-sentence msgs never completed (dropped because of missing parts or memory bound)
+        self.dropped_fragments = 0
+
+    def __str__(self) -> str:
+        return f'{self.sentences} sentences, {self.msgs} msgs, {self.checksum_errors} checksum errors, ' \
+               f'{self.invalid_sentences} invalid sentences, {self.dropped_fragments} dropped fragments'
+
+
+def verify_checksum(sentence: bytes) -> bool:
+    """
+    Returns True if the checksum of NMEA sentence (without line ending) is valid.
+    """
+    star = len(sentence) - 3
+    if star < 1 or sentence[star] != 42:
+        return False
+    try:
+        return xor_checksum(sentence[1:star]) == int(sentence[star + 1:], 16)
+    except ValueError:
+        return False
+
+
+def verify_checksums(buffer: bytes, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Returns bool array - True for each sentence (buffer[start:end], without line ending) with a valid checksum.
+    Checksums of all sentences are computed at once with NumPy.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    stars = ends - 3
+    valid = stars > starts
+    # Check the '*' position of valid sentences only (indices of the other sentences are clamped)
+    stars = np.where(valid, stars, starts + 1)
+    valid &= data[np.minimum(stars, len(data) - 1)] == 42
+    # XOR of [start + 1, star) range - reduceat of interleaved (range start, range end) indices
+    indices = np.empty(2 * len(starts), dtype=np.int64)
+    indices[0::2] = np.minimum(starts + 1, stars)
+    indices[1::2] = stars
+    checksums = np.bitwise_xor.reduceat(data, np.minimum(indices, len(data) - 1))[0::2].astype(np.int32)
+    # reduceat returns the first item (instead of 0) for empty ranges
+    checksums[indices[0::2] == indices[1::2]] = 0
+    digits = np.minimum(stars + 1, len(data) - 2)
+    expected = HEX_VALUES[data[digits]] * 16 + HEX_VALUES[data[digits + 1]]
+    return valid & (checksums == expected)
+
+
+def parse_sentences(array: np.ndarray, starts: np.ndarray,
+                    ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses sentences (array[start:end], without line ending) with NumPy. Returns tuple - (bool array, True for each
+    parsed AIVDM sentence, (N, 6) array of commas positions in each sentence, number of sentences of the msg,
+    sentence number). The checksums are not verified.
+    Sentences not parsed here (multi-digit fields, invalid sentences) should be parsed one by one.
+    """
+    last = len(array) - 1
+    comma_positions = np.flatnonzero(array == 44)
+    # Index of the first comma of each sentence and number of commas in the sentence
+    first = np.searchsorted(comma_positions, starts)
+    commas_count = np.searchsorted(comma_positions, ends) - first
+    commas = comma_positions[np.minimum(first[:, None] + np.arange(6), max(len(comma_positions) - 1, 0))] \
+        if len(comma_positions) else np.zeros((len(starts), 6), dtype=np.int64)
+    head = np.minimum(starts[:, None] + np.arange(6), last)
+    count = array[np.minimum(commas[:, 0] + 1, last)].astype(np.int64) - 48
+    number = array[np.minimum(commas[:, 1] + 1, last)].astype(np.int64) - 48
+    msg_type = DEARMOR_ARRAY[array[np.minimum(commas[:, 4] + 1, last)]]
+    fill_bits = array[np.minimum(commas[:, 5] + 1, last)]
+    parsed = (
+        (commas_count == 6)
+        # '!' and 'VDM' / 'VDO' formatter
+        & (array[head[:, 0]] == 33) & (commas[:, 0] == starts + 6)
+        & (array[head[:, 3]] == 86) & (array[head[:, 4]] == 68)
+        & ((array[head[:, 5]] == 77) | (array[head[:, 5]] == 79))
+        # Single digit number of sentences (1-9) and sentence number (1 - number of sentences)
+        & (commas[:, 1] == commas[:, 0] + 2) & (count >= 1) & (count <= 9)
+        & (commas[:, 2] == commas[:, 1] + 2) & (number >= 1) & (number <= count)
+        # Single digit fill-bits (0-5) followed by the checksum
+        & (commas[:, 5] + 2 == ends - 3) & (fill_bits >= 48) & (fill_bits <= 53)
+        # Single-sentence msg with non-empty payload and valid msg type
+        & ((count > 1) | ((commas[:, 5] > commas[:, 4] + 1) & (msg_type != INVALID_SIXBIT)))
+    )
+    return parsed, commas, count, number
+
+
+def parse_sentence(sentence: bytes) -> AIVDMSentence:
+    """
+    Returns parsed AIVDM sentence (without line ending). The checksum is not verified.
+    """
+    fields = sentence[1:-3].split(b',')
+    if len(fields) != 7 or sentence[:1] != b'!' or fields[0][2:] not in SENTENCE_FORMATTERS:
+        raise ValueError(f'Invalid AIVDM sentence {sentence!r}')
+    _, count, number, seq_msg_id, channel, payload, fill_bits = fields
+    count, number, fill_bits = int(count), int(number), int(fill_bits)
+    if not 1 <= number <= count or not 0 <= fill_bits <= 5:
+        raise ValueError(f'Invalid AIVDM sentence {sentence!r}')
+    return AIVDMSentence(count, number, seq_msg_id, channel, payload, fill_bits)
+
+
+class AIVDMDecoder:
+    """
+    Class represents streaming AIVDM decoder. Sentences are parsed, their checksums verified and multi-sentence msgs
+    reassembled (by channel and sequential message ID). Memory of pending fragments is bounded - the oldest
+    incomplete msg is dropped when there are more than max_pending incomplete msgs.
+    """
+    def __init__(self, max_pending: int = 64) -> None:
+        self.max_pending = max_pending
+        self.stats = DecoderStats()
+        # Incomplete line from the end of the last fed data
+        self._partial_line = b''
+        # Last fed data ended with CR (LF of CRLF line ending may start the next data)
+        self._after_cr = False
+        # Rest of too long line is dropped (up to the next line ending)
+        self._skip_line = False
+        # Fragments of incomplete msgs - (channel, sequential message ID): list of payload parts
+        self._pending: 'OrderedDict[Tuple[bytes, bytes], List[Optional[AIVDMSentence]]]' = OrderedDict()
+
+    def feed(self, data: bytes) -> AISMessageBatch:
+        """
+        Decodes chunk of NMEA stream (lines ending with LF, CRLF or CR). Returns batch of msgs completed by the data.
+        The last line of data without line ending is kept until the next feed - line longer than MAX_SENTENCE_LENGTH
+        is dropped (counted as invalid sentence).
+        """
+        if not data:
+            return AISMessageBatch()
+        if self._after_cr and data[:1] == b'\n':
+            # LF of CRLF line ending split between the feeds
+            data = data[1:]
+        if self._skip_line:
+            line_ends = [position for position in (data.find(b'\n'), data.find(b'\r')) if position >= 0]
+            if not line_ends:
+                self._after_cr = False
+                return AISMessageBatch()
+            data = data[min(line_ends):]
+            self._skip_line = False
+        buffer = self._partial_line + data
+        end = max(buffer.rfind(b'\n'), buffer.rfind(b'\r')) + 1
+        self._partial_line = buffer[end:]
+        self._after_cr = buffer.endswith(b'\r')
+        if len(self._partial_line) > MAX_SENTENCE_LENGTH:
+            self.stats.invalid_sentences += 1
+            self._partial_line = b''
+            self._skip_line = True
+        if not end:
+            return AISMessageBatch()
+        array = np.frombuffer(buffer, dtype=np.uint8, count=end)
+        ends = np.flatnonzero(array == 10)
+        # Lines split by other line boundaries (CR only) are decoded one by one
+        if len(ends) >= VECTORIZED_MIN_LINES and array[-1] == 10 and \
+                np.count_nonzero(array == 13) == np.count_nonzero(array[ends - 1] == 13):
+            return self._decode_chunk(buffer=buffer, array=array, ends=ends)
+        lines = buffer[:end].splitlines()
+        return AISMessageBatch.from_msgs(self._decode_lines(lines=lines,
+                                                            valid=[verify_checksum(line) for line in lines]))
+
+    def decode(self, lines: Iterable[Union[str, bytes]]) -> List[AISMessage]:
+        """
+        Decodes NMEA sentences (with or without line endings). Returns completed msgs.
+        """
+        lines = [(line.encode() if isinstance(line, str) else line).rstrip(b'\r\n') for line in lines]
+        return self._decode_lines(lines=lines, valid=[verify_checksum(line) for line in lines])
+
+    def _decode_chunk(self, buffer: bytes, array: np.ndarray, ends: np.ndarray) -> AISMessageBatch:
+        """
+        Decodes chunk of lines (ending at given LF positions). Checksums are verified and sentences parsed with NumPy
+        for all lines at once. Columns of single-sentence msgs are created in bulk, the other lines are decoded
+        one by one.
+        """
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        # CR is not a part of the sentence
+        ends = ends - (array[np.maximum(ends - 1, 0)] == 13)
+        valid = verify_checksums(buffer=buffer, starts=starts, ends=ends)
+        parsed, commas, count, number = parse_sentences(array=array, starts=starts, ends=ends)
+        parsed &= valid
+        # Single-sentence msgs with one-char channel (e.g. 'A', 'B')
+        single = parsed & (count == 1) & (commas[:, 4] == commas[:, 3] + 2)
+        indices = np.flatnonzero(single)
+        single_commas = commas[indices]
+        msg_types = DEARMOR_ARRAY[array[single_commas[:, 4] + 1]].tolist()
+        fill_bits = (array[single_commas[:, 5] + 1] - 48).tolist()
+        channels = list(map(BYTE_CHARS.__getitem__, array[single_commas[:, 4] - 1].tolist()))
+        payloads = [buffer[start:end] for start, end in zip((single_commas[:, 4] + 1).tolist(),
+                                                            single_commas[:, 5].tolist())]
+        msgs = AISMessageBatch(msg_types=msg_types, channels=channels, payloads=payloads, fill_bits=fill_bits)
+        self.stats.sentences += len(msgs)
+        self.stats.msgs += len(msgs)
+        if len(indices) == len(ends):
+            return msgs
+        # Other lines are decoded one by one, their msgs are merged with the single-sentence msgs in the lines order
+        other_msgs = []
+        other_indices = []
+        others = np.flatnonzero(~single & (ends > starts))
+        other_commas = commas[others]
+        pairs = self._find_pairs(buffer=buffer, others=others, other_commas=other_commas, parsed=parsed, count=count,
+                                 number=number)
+        fields = zip(others.tolist(), parsed[others].tolist(), count[others].tolist(), number[others].tolist(),
+                     other_commas.tolist(), (array[other_commas[:, 5] + 1] - 48).tolist(),
+                     starts[others].tolist(), ends[others].tolist(), pairs)
+        # Payload of the first fragment of 2-sentence msg completed by the next line
+        first_payload = None
+        for index, is_parsed, sentences_count, sentence_number, positions, sentence_fill_bits, start, end, \
+                is_pair in fields:
+            if first_payload is not None:
+                self.stats.sentences += 1
+                msg = self._complete_msg(channel=buffer[positions[3] + 1:positions[4]],
+                                         payload=first_payload + buffer[positions[4] + 1:positions[5]],
+                                         fill_bits=sentence_fill_bits)
+                first_payload = None
+            elif is_pair and len(self._pending) < self.max_pending and \
+                    (buffer[positions[3] + 1:positions[4]], buffer[positions[2] + 1:positions[3]]) not in self._pending:
+                # Fragments are not added to the pending ones (no pending fragments of the msg are dropped)
+                self.stats.sentences += 1
+                first_payload = buffer[positions[4] + 1:positions[5]]
+                continue
+            elif is_parsed:
+                self.stats.sentences += 1
+                sentence = AIVDMSentence(sentences_count, sentence_number,
+                                         buffer[positions[2] + 1:positions[3]],
+                                         buffer[positions[3] + 1:positions[4]],
+                                         buffer[positions[4] + 1:positions[5]],
+                                         sentence_fill_bits)
+                msg = self._add_sentence(sentence=sentence)
+            else:
+                msg = self._decode_line(line=buffer[start:end], is_valid=bool(valid[index]))
+            if msg is not None:
+                other_msgs.append(msg)
+                other_indices.append(index)
+        if not other_msgs:
+            return msgs
+        order = np.argsort(np.concatenate((indices, other_indices)), kind='stable').tolist()
+        columns = [column + list(other_column) for column, other_column in zip(
+            (msg_types, channels, payloads, fill_bits), zip(*other_msgs))]
+        return AISMessageBatch(*[[column[index] for index in order] for column in columns])
+
+    @staticmethod
+    def _find_pairs(buffer: bytes, others: np.ndarray, other_commas: np.ndarray, parsed: np.ndarray,
+                    count: np.ndarray, number: np.ndarray) -> List[bool]:
+        """
+        Returns list of flags of lines (given indices of lines) - True for the first fragment of 2-sentence msg,
+        which is followed by the second fragment (the same channel and sequential message ID) in the next line.
+        """
+        fragments = parsed[others] & (count[others] == 2)
+        first = fragments[:-1] & fragments[1:] & (number[others[:-1]] == 1) & (number[others[1:]] == 2) \
+            & (others[1:] == others[:-1] + 1)
+        pairs = [False] * len(others)
+        for position in np.flatnonzero(first).tolist():
+            first_commas, second_commas = other_commas[position].tolist(), other_commas[position + 1].tolist()
+            if buffer[first_commas[2]:first_commas[4]] == buffer[second_commas[2]:second_commas[4]]:
+                pairs[position] = True
+        return pairs
+
+    def _decode_lines(self, lines: List[bytes], valid: List[bool]) -> List[AISMessage]:
+        msgs = []
+        for line, is_valid in zip(lines, valid):
+            if line:
+                msg = self._decode_line(line=line, is_valid=is_valid)
+                if msg is not None:
+                    msgs.append(msg)
+        return msgs
+
+    def _decode_line(self, line: bytes, is_valid: bool) -> Optional[AISMessage]:
+        """
+        Decodes single sentence. Returns msg, if the sentence completes it.
+        """
+        self.stats.sentences += 1
+        if not is_valid:
+            self.stats.checksum_errors += 1
+            return None
+        try:
+            sentence = parse_sentence(sentence=line)
+        except ValueError:
+            self.stats.invalid_sentences += 1
+            return None
+        return self._add_sentence(sentence=sentence)
+
+    def _add_sentence(self, sentence: AIVDMSentence) -> Optional[AISMessage]:
+        """
+        Adds parsed sentence with valid checksum. Returns msg, if the sentence completes it.
+        """
+        if sentence.count == 1:
+            payload, fill_bits = sentence.payload, sentence.fill_bits
+        else:
+            reassembled = self._reassemble(sentence=sentence)
+            if reassembled is None:
+                return None
+            payload, fill_bits = reassembled
+        return self._complete_msg(channel=sentence.channel, payload=payload, fill_bits=fill_bits)
+
+    def _complete_msg(self, channel: bytes, payload: bytes, fill_bits: int) -> Optional[AISMessage]:
+        """
+        Returns msg of the whole payload. Returns None, if the msg type is invalid.
+        """
+        msg_type = SIXBIT_DEARMOR_TABLE[payload[0]] if payload and payload[0] < 128 else INVALID_SIXBIT
+        if msg_type == INVALID_SIXBIT:
+            self.stats.invalid_sentences += 1
+            return None
+        self.stats.msgs += 1
+        return AISMessage(msg_type, channel, payload, fill_bits)
+
+    def _reassemble(self, sentence: AIVDMSentence) -> Optional[Tuple[bytes, int]]:
+        """
+        Adds fragment of multi-sentence msg. Returns tuple - (payload, fill-bits) of the msg, if all fragments
+        are received.
+        """
+        key = (sentence.channel, sentence.seq_msg_id)
+        fragments = self._pending.get(key)
+        if fragments is not None and (len(fragments) != sentence.count or fragments[sentence.number - 1] is not None):
+            # Fragments of other msg with the same sequential message ID - never completed
+            self.stats.dropped_fragments += len(fragments) - fragments.count(None)
+            fragments = None
+        if fragments is None:
+            fragments = [None] * sentence.count
+            self._pending[key] = fragments
+            self._pending.move_to_end(key)
+        fragments[sentence.number - 1] = sentence
+        if None in fragments:
+            while len(self._pending) > self.max_pending:
+                _, dropped = self._pending.popitem(last=False)
+                self.stats.dropped_fragments += len(dropped) - dropped.count(None)
+            return None
+        del self._pending[key]
+        return b''.join(fragment.payload for fragment in fragments), fragments[-1].fill_bits
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Returns number of incomplete multi-sentence msgs.
+        """
+        return len(self._pending)
+
+
+def decode_batch(msgs: Sequence[AISMessage], msg_type: int) -> Dict[str, np.ndarray]:
+    """
+    Returns columns (NumPy arrays) of payload fields of all msgs of given type (the other msgs are skipped).
+    """
+    layout = PAYLOAD_LAYOUTS[msg_type]
+    if isinstance(msgs, AISMessageBatch):
+        payloads = [payload for payload_type, payload in zip(msgs.msg_types, msgs.payloads) if payload_type == msg_type]
+    else:
+        payloads = [msg.payload for msg in msgs if msg.msg_type == msg_type]
+    return layout.decode_batch(payloads=payloads)
@@ -0,0 +1,259 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple, Union
+import socket
+import threading
+import time
+
+from ais.ais_utils import Clients
+from nmea.nmea_stream import Pacer, get_pacer, prepare_datagrams, create_multicast_socket
+
+
+# Max number of datagrams sent to one client before the worker moves to the next client
+FANOUT_CHUNK_SIZE = 64
+# Delay (in seconds) before retrying to send to a client when the socket send buffer is full
+FANOUT_BACKOFF = 0.001
+
+
+class CycleBuffer:
+    """
+    Class represents immutable buffer with datagrams of one cycle. Data is serialized once and shared by all clients.
+    """
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self, datagrams: List[bytes]) -> None:
+        self.data = memoryview(b''.join(datagrams))
+        self.offsets: List[Tuple[int, int]] = []
+        start = 0
+        for datagram in datagrams:
+            self.offsets.append((start, start + len(datagram)))
+            start += len(datagram)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def datagram(self, index: int) -> memoryview:
+        start, end = self.offsets[index]
+        return self.data[start:end]
+
+
+class Destination:
+    """
+    Class represents single fan-out destination (client or multicast group) with its own pacing and queue of pending
+    cycle buffers. When the queue is full, the oldest buffer is dropped (backpressure of slow clients).
+    Multicast group destination has its own socket (configured for the group), clients use the worker socket.
+    """
+    __slots__ = ('address', 'pacer', 'socket', 'pending', 'position', 'resume_at', 'reserved', 'sent', 'dropped',
+                 'errors')
+
+    def __init__(self, address: Tuple[str, int], pacer: Pacer, sock: Optional[socket.socket] = None) -> None:
+        self.address = address
+        self.pacer = pacer
+        self.socket = sock
+        self.pending: Deque[CycleBuffer] = deque()
+        # Index of the next datagram of the first pending buffer
+        self.position = 0
+        self.resume_at = 0.0
+        # Pacer reserved sending of the next datagram
+        self.reserved = False
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def push(self, buffer: CycleBuffer, max_pending: int) -> None:
+        """
+        Adds cycle buffer to the queue. Drops the oldest buffer, if the queue is full.
+        """
+        if len(self.pending) >= max_pending:
+            self.pending.popleft()
+            self.position = 0
+            self.dropped += 1
+        self.pending.append(buffer)
+
+    def service(self, sock: socket.socket, now: float) -> Optional[float]:
+        """
+        Sends pending datagrams (up to FANOUT_CHUNK_SIZE) without blocking.
+        Returns time at which the destination should be serviced again or None, if there is no data to send.
+        """
+        sock = self.socket or sock
+        sent_count = 0
+        while self.pending:
+            if self.resume_at > now:
+                return self.resume_at
+            buffer = self.pending[0]
+            if self.position >= len(buffer):
+                self.pending.popleft()
+                self.position = 0
+                continue
+            if not self.reserved:
+                self.reserved = True
+                delay = self.pacer.reserve()
+                if delay > 0:
+                    self.resume_at = now + delay
+                    return self.resume_at
+            try:
+                sock.sendto(buffer.datagram(self.position), self.address)
+            except BlockingIOError:
+                # Socket send buffer is full - retry later
+                self.resume_at = now + FANOUT_BACKOFF
+                return self.resume_at
+            except OSError as err:
+                # Skip the buffer - the client gets the next data
+                print(f'Error: {self.address[0]}:{self.address[1]} - {err.strerror}')
+                self.errors += 1
+                self.pending.popleft()
+                self.position = 0
+                continue
+            self.reserved = False
+            self.position += 1
+            self.sent += 1
+            sent_count += 1
+            if sent_count >= FANOUT_CHUNK_SIZE:
+                return now
+        return None
+
+
+class FanOutWorker:
+    """
+    Class represents fan-out worker thread serving a subset of destinations with one non-blocking socket.
+    """
+    def __init__(self, name: str) -> None:
+        self.destinations: List[Destination] = []
+        self.condition = threading.Condition()
+        self.closing = False
+        # Data queued since the destinations were checked the last time
+        self.new_data = False
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self) -> None:
+        while True:
+            next_wake = None
+            for destination in self.destinations:
+                with self.condition:
+                    wake = destination.service(sock=self.socket, now=time.monotonic())
+                    # Producer may wait for free space in the queue (blocking run or flush)
+                    self.condition.notify_all()
+                if wake is not None and (next_wake is None or wake < next_wake):
+                    next_wake = wake
+            with self.condition:
+                if self.closing:
+                    break
+                if self.new_data:
+                    self.new_data = False
+                elif next_wake is None:
+                    self.condition.wait()
+                elif next_wake > time.monotonic():
+                    self.condition.wait(timeout=next_wake - time.monotonic())
+        self.socket.close()
+
+
+class FanOutStats:
+    """
+    Class represents fan-out statistics summed over all destinations.
+    """
+    def __init__(self, destinations: List[Destination]) -> None:
+        self.destinations = len(destinations)
+        self.sent = sum(destination.sent for destination in destinations)
+        self.dropped = sum(destination.dropped for destination in destinations)
+        self.errors = sum(destination.errors for destination in destinations)
+
+    def __str__(self) -> str:
+        return f'{self.sent} datagrams sent to {self.destinations} clients, ' \
+               f'{self.dropped} cycles dropped (slow clients), {self.errors} send errors'
+
+
+class FanOutEngine:
+    """
+    Class represents a fan-out of UDP data to many clients (and multicast groups). Each cycle is serialized once into a shared immutable
+    buffer, which is sent to the clients by a bounded pool of worker threads. Each client has its own pacing and
+    a bounded queue of pending cycles.
+    """
+    def __init__(self, clients: Clients, workers: int = 4, pacing: str = 'none', pacing_rate: float = 0,
+                 datagram_size: int = 0, max_pending: int = 8) -> None:
+        self.clients_list = clients
+        # Max size of datagram with packed NMEA sentences (0 - single sentence per datagram)
+        self.datagram_size = datagram_size
+        # Max number of cycles waiting to be sent to a single client
+        self.max_pending = max_pending
+        self.destinations = [Destination(address=(client.host, client.port),
+                                         pacer=self._get_pacer(rate=client.rate,
+                                                               pacing=pacing,
+                                                               pacing_rate=pacing_rate))
+                             for client in clients.clients]
+        for group in clients.multicast:
+            multicast_socket = create_multicast_socket(group=group)
+            multicast_socket.setblocking(False)
+            self.destinations.append(Destination(address=(group.group, group.port),
+                                                 pacer=self._get_pacer(rate=None,
+                                                                       pacing=pacing,
+                                                                       pacing_rate=pacing_rate),
+                                                 sock=multicast_socket))
+        self.workers = [FanOutWorker(name=f'ais_fanout_{number}')
+                        for number in range(min(workers, len(self.destinations)))]
+        for number, destination in enumerate(self.destinations):
+            self.workers[number % len(self.workers)].destinations.append(destination)
+        for worker in self.workers:
+            worker.thread.start()
+
+    @staticmethod
+    def _get_pacer(rate: Optional[float], pacing: str, pacing_rate: float) -> Pacer:
+        """
+        Returns pacer of the destination - token bucket with the client rate or the pacer common for all destinations.
+        """
+        if rate:
+            return get_pacer(name='token_bucket', rate=rate)
+        return get_pacer(name=pacing, rate=pacing_rate) if pacing_rate else get_pacer(name=pacing)
+
+    def run(self, data: List[Union[str, bytes]], block: bool = False) -> None:
+        """
+        Starts UDP data fan-out. Data is serialized once and queued for all clients. If block is set, waits for free
+        space in the queues of the clients (backpressure) instead of dropping the oldest cycles.
+        """
+        buffer = CycleBuffer(datagrams=prepare_datagrams(data=data, datagram_size=self.datagram_size))
+        if not len(buffer):
+            return
+        for worker in self.workers:
+            with worker.condition:
+                if block:
+                    self._wait_pending(worker=worker, max_pending=self.max_pending - 1)
+                for destination in worker.destinations:
+                    destination.push(buffer=buffer, max_pending=self.max_pending)
+                worker.new_data = True
+                worker.condition.notify_all()
+
+    def flush(self) -> None:
+        """
+        Waits until queued data is sent to all clients.
+        """
+        for worker in self.workers:
+            with worker.condition:
+                self._wait_pending(worker=worker, max_pending=0)
+
+    @staticmethod
+    def _wait_pending(worker: FanOutWorker, max_pending: int) -> None:
+        """
+        Waits (with the worker condition acquired) until each destination of the worker has at most max_pending
+        cycles queued or the worker is closed.
+        """
+        while not worker.closing and any(len(destination.pending) > max_pending
+                                         for destination in worker.destinations):
+            worker.condition.wait()
+
+    @property
+    def stats(self) -> FanOutStats:
+        return FanOutStats(destinations=self.destinations)
+
+    def close(self) -> None:
+        """
+        Stops worker threads (data not sent yet is dropped).
+        """
+        for worker in self.workers:
+            with worker.condition:
+                worker.closing = True
+                worker.condition.notify_all()
+        for worker in self.workers:
+            worker.thread.join()
+        for destination in self.destinations:
+            if destination.socket is not None:
+                destination.socket.close()
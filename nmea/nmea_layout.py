@@ -0,0 +1,203 @@
+from operator import attrgetter
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from nmea.nmea_utils import convert_int_to_bits, encode_sixbit_text, decode_sixbit_text, SIXBIT_DEARMOR_TABLE, \
+    INVALID_SIXBIT
+from ais.constants import FieldBitsCountEnum, FieldCharsCountEnum, AISMsgType1ConstsEnum, AISMsgType5ConstsEnum
+
+
+class PayloadField(NamedTuple):
+    """
+    Class represents single AIS msg payload field - position (offset from the payload start) and width in bits.
+    Field value is multiplied by the scale before encoding. Signed fields are encoded in two's complement.
+    The name is an attribute path of the payload object (e.g. 'dimension.to_bow').
+    """
+    name: str
+    offset: int
+    width: int
+    scale: int = 1
+    signed: bool = False
+    text: bool = False
+
+
+# AIS msg type 1 payload fields in order - (name, scale, signed, text).
+TYPE_1_LAYOUT_SPEC = [
+    ('msg_type', 1, False, False),
+    ('repeat_indicator', 1, False, False),
+    ('mmsi', 1, False, False),
+    ('nav_status', 1, False, False),
+    ('rot', 1, False, False),
+    ('speed', 10, False, False),
+    ('pos_accuracy', 1, False, False),
+    ('lon', 600000, True, False),
+    ('lat', 600000, True, False),
+    ('course', 10, False, False),
+    ('true_heading', 1, False, False),
+    ('timestamp', 1, False, False),
+    ('maneuver', 1, False, False),
+    ('spare_type_1', 1, False, False),
+    ('raim', 1, False, False),
+    ('radio_status', 1, False, False),
+]
+
+# AIS msg type 5 payload fields in order - (name, scale, signed, text).
+TYPE_5_LAYOUT_SPEC = [
+    ('msg_type', 1, False, False),
+    ('repeat_indicator', 1, False, False),
+    ('mmsi', 1, False, False),
+    ('ais_version', 1, False, False),
+    ('imo', 1, False, False),
+    ('call_sign', 1, False, True),
+    ('ship_name', 1, False, True),
+    ('ship_type', 1, False, False),
+    ('dimension.to_bow', 1, False, False),
+    ('dimension.to_stern', 1, False, False),
+    ('dimension.to_port', 1, False, False),
+    ('dimension.to_starboard', 1, False, False),
+    ('pos_fix_type', 1, False, False),
+    ('eta.month', 1, False, False),
+    ('eta.day', 1, False, False),
+    ('eta.hour', 1, False, False),
+    ('eta.minute', 1, False, False),
+    ('draught', 10, False, False),
+    ('destination', 1, False, True),
+    ('dte', 1, False, False),
+    ('spare_type_5', 1, False, False),
+]
+
+
+# Armored ASCII code to six-bit value lookup table for NumPy arrays (256 entries).
+DEARMOR_ARRAY = np.frombuffer(SIXBIT_DEARMOR_TABLE + bytes([INVALID_SIXBIT]) * 128, dtype=np.uint8)
+# ASCII6 code to ASCII code lookup table for NumPy arrays (64 entries).
+ASCII6_TO_ASCII_ARRAY = np.array(list(range(64, 96)) + list(range(32, 64)), dtype=np.uint8)
+# Payloads are decoded in bulk from 64-bit words holding 7 six-bit items (42 bits) each.
+WORD_BITS = 42
+WORD_CHARS = WORD_BITS // 6
+WORD_SHIFTS = np.arange(WORD_BITS - 6, -1, -6, dtype=np.uint64)
+
+
+class PayloadLayout:
+    """
+    Class represents compiled layout of AIS msg payload. Constant fields are packed once into an int,
+    so encoding is a single pass over the variable fields only. The same layout is used to decode payloads.
+    """
+    def __init__(self, spec: List[Tuple[str, int, bool, bool]], consts: Dict[str, int]) -> None:
+        fields = []
+        offset = 0
+        for name, scale, signed, text in spec:
+            width = FieldBitsCountEnum[name.replace('.', '_')]
+            fields.append(PayloadField(name=name, offset=offset, width=width, scale=scale, signed=signed, text=text))
+            offset += width
+        self.fields: Tuple[PayloadField, ...] = tuple(fields)
+        self.bits_count = offset
+        self.const_value = 0
+        self.constants_bits: Dict[str, str] = {}
+        encoders = []
+        for field in self.fields:
+            shift = self.bits_count - field.offset - field.width
+            if field.name in consts:
+                self.const_value |= (consts[field.name] & ((1 << field.width) - 1)) << shift
+                self.constants_bits[field.name] = convert_int_to_bits(num=consts[field.name], bits_count=field.width)
+                continue
+            chars_count = FieldCharsCountEnum[field.name] if field.text else 0
+            encoders.append((attrgetter(field.name), shift, (1 << field.width) - 1, field.scale, chars_count))
+        self._encoders = tuple(encoders)
+        # Number of armored chars of the payload (with fill-bits)
+        self.chars_count = -(-self.bits_count // 6)
+        decoders = []
+        for field in self.fields:
+            parent, _, key = field.name.rpartition('.')
+            chars_count = FieldCharsCountEnum[field.name] if field.text else 0
+            decoders.append((field.name, parent, key, self.bits_count - field.offset - field.width,
+                             (1 << field.width) - 1, field.width, field.scale, field.signed, chars_count))
+        self._decoders = tuple(decoders)
+
+    def encode(self, payload: Any) -> int:
+        """
+        Returns payload object fields packed into int (bits_count long).
+        """
+        value = self.const_value
+        for getter, shift, mask, scale, chars_count in self._encoders:
+            item = getter(payload)
+            if chars_count:
+                num = encode_sixbit_text(text=item, chars_count=chars_count)
+            elif scale != 1:
+                num = int(item * scale)
+            else:
+                num = int(item)
+            value |= (num & mask) << shift
+        return value
+
+    def decode(self, value: int) -> Dict[str, Any]:
+        """
+        Returns fields values unpacked from payload int (bits_count long), e.g. {'mmsi': 205344990, 'lon': 4.40704, ...}.
+        Fields with dotted names are returned as nested dicts (e.g. {'dimension': {'to_bow': 225, ...}}).
+        """
+        fields = {}
+        for name, parent, key, shift, mask, width, scale, signed, chars_count in self._decoders:
+            num = (value >> shift) & mask
+            if chars_count:
+                item = decode_sixbit_text(value=num, chars_count=chars_count)
+            else:
+                if signed and num >> (width - 1):
+                    num -= 1 << width
+                item = num / scale if scale != 1 else num
+            if parent:
+                fields.setdefault(parent, {})[key] = item
+            else:
+                fields[name] = item
+        return fields
+
+    def decode_batch(self, payloads: Sequence[bytes]) -> Dict[str, np.ndarray]:
+        """
+        Returns columns (NumPy arrays) of fields values unpacked from armored payloads (chars_count long each).
+        Fields are keyed by the layout names (e.g. 'dimension.to_bow'), text fields are arrays of bytes strings.
+        """
+        rows = len(payloads)
+        data = np.frombuffer(b''.join(payloads), dtype=np.uint8)
+        if len(data) != rows * self.chars_count:
+            raise ValueError(f'Invalid payloads length - {self.chars_count} chars expected')
+        sixbits = DEARMOR_ARRAY[data]
+        if (sixbits == INVALID_SIXBIT).any():
+            raise ValueError('Invalid AIVDM payload chars')
+        # Payload bits packed into 64-bit words holding 7 six-bit items (42 bits) each
+        words_count = -(-self.chars_count // WORD_CHARS)
+        padded = np.zeros((rows, words_count * WORD_CHARS), dtype=np.uint64)
+        padded[:, :self.chars_count] = sixbits.reshape(rows, self.chars_count)
+        words = (padded.reshape(rows, words_count, WORD_CHARS) << WORD_SHIFTS).sum(axis=2, dtype=np.uint64)
+        columns = {}
+        for field in self.fields:
+            if field.text:
+                codes = np.stack([_unpack_bits(words=words, offset=field.offset + 6 * index, width=6)
+                                  for index in range(field.width // 6)], axis=1)
+                text = np.ascontiguousarray(ASCII6_TO_ASCII_ARRAY[codes])
+                columns[field.name] = np.char.rstrip(text.view(f'S{text.shape[1]}').ravel(), b'@ ')
+                continue
+            column = _unpack_bits(words=words, offset=field.offset, width=field.width).astype(np.int64)
+            if field.signed:
+                column = np.where(column >> (field.width - 1), column - (1 << field.width), column)
+            columns[field.name] = column / field.scale if field.scale != 1 else column
+        return columns
+
+
+def _unpack_bits(words: np.ndarray, offset: int, width: int) -> np.ndarray:
+    """
+    Returns column of values of the field placed at given payload offset (bits packed into 42-bit words).
+    """
+    column = np.zeros(len(words), dtype=np.uint64)
+    field_end = offset + width
+    while offset < field_end:
+        word_index = offset // WORD_BITS
+        part_end = min(field_end, (word_index + 1) * WORD_BITS)
+        part_bits = part_end - offset
+        part = words[:, word_index] >> np.uint64((word_index + 1) * WORD_BITS - part_end)
+        part &= np.uint64((1 << part_bits) - 1)
+        column = (column << np.uint64(part_bits)) | part
+        offset = part_end
+    return column
+
+
+TYPE_1_LAYOUT = PayloadLayout(spec=TYPE_1_LAYOUT_SPEC, consts=AISMsgType1ConstsEnum.dict())
+TYPE_5_LAYOUT = PayloadLayout(spec=TYPE_5_LAYOUT_SPEC, consts=AISMsgType5ConstsEnum.dict())
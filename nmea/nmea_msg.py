@@ -1,28 +1,39 @@
-from abc import ABC, abstractmethod
+from abc import ABC
 import textwrap
-from typing import Union, List, Dict
+from functools import lru_cache
+from typing import ClassVar, Union, List, Dict, Tuple
 
 from pydantic import BaseModel
 
-from nmea.nmea_utils import convert_bits_to_int, convert_int_to_bits, get_char_of_ascii_code, convert_decimal_to_ascii_code, \
-    convert_ascii_char_to_ascii6_code, add_padding, add_padding_0_bits, nmea_checksum
+from nmea.nmea_utils import convert_int_to_bits, convert_ascii_char_to_ascii6_code, add_padding, add_padding_0_bits, \
+    armor_payload, xor_checksum, HEX_CHECKSUMS
+from nmea.nmea_layout import PayloadLayout, TYPE_1_LAYOUT, TYPE_5_LAYOUT
 from ais.ais_utils import ShipDimension, ShipEta
-from ais.constants import FieldBitsCountEnum, AISMsgType1ConstsEnum, NavigationStatusEnum, ShipTypeEnum, \
-    AISMsgType5ConstsEnum, FieldCharsCountEnum
+from ais.constants import FieldBitsCountEnum, NavigationStatusEnum, ShipTypeEnum, FieldCharsCountEnum
 
 
-class AISMsgPayload(BaseModel, ABC):
+class AISMsgPayloadEncoderMixin:
     """
-    Class represent an abstract class which acts as a parent class for other AIS msgs.
+    Class represents AIS msg payload encoding shared by the pydantic payload models and the lightweight payloads.
     """
-    repeat_indicator: int = 0
-    mmsi: int
-    # Number of fill bits requires to pad the data payload to a 6 bit boundary (range 0-5).
-    fill_bits: int = 0
+    __slots__ = ()
 
-    @abstractmethod
-    def payload_bits(self) -> None:
-        pass
+    # Compiled payload layout (fields positions and constant fields)
+    layout: ClassVar[PayloadLayout]
+
+    @property
+    def _constants_bits(self) -> Dict[str, str]:
+        """
+        Returns AIS const fields in bits (precomputed once per msg type).
+        """
+        return dict(self.layout.constants_bits)
+
+    @property
+    def payload_bits(self) -> str:
+        """
+        Returns msg payload as a bit string.
+        """
+        return format(self.layout.encode(self), f'0{self.layout.bits_count}b')
 
     @property
     def _payload_sixbits_list(self) -> List[str]:
@@ -36,21 +47,22 @@ class AISMsgPayload(BaseModel, ABC):
         Returns message payload as a string of ASCII chars (AIVDM Payload Armoring).
         Adds fill-bits (padding) to last six-bit item, if necessary.
         """
-        payload = ''
-        for item in self._payload_sixbits_list:
-            # Add fill-bits (padding) to last six-bit item, if necessary
-            while len(item) < 6:
-                item += '0'
-                self.fill_bits += 1
-            decimal_num = convert_bits_to_int(bits=item)
-            ascii_code = convert_decimal_to_ascii_code(decimal_num=decimal_num)
-            payload_char = get_char_of_ascii_code(ascii_code=ascii_code)
-            payload += payload_char
+        payload, self.fill_bits = armor_payload(value=self.layout.encode(self), bits_count=self.layout.bits_count)
         return payload
 
     def __str__(self) -> str:
         return f'{self.encode()}'
 
+
+class AISMsgPayload(AISMsgPayloadEncoderMixin, BaseModel, ABC):
+    """
+    Class represent an abstract class which acts as a parent class for other AIS msgs.
+    """
+    repeat_indicator: int = 0
+    mmsi: int
+    # Number of fill bits requires to pad the data payload to a 6 bit boundary (range 0-5).
+    fill_bits: int = 0
+
     class Config:
         """
         Pydantic config class.
@@ -73,43 +85,7 @@ class AISMsgPayloadType1(AISMsgPayload):
     # True heading - default value, not available (511)
     true_heading: int = 511
     timestamp: int = 60
-
-    @property
-    def _constants_bits(self) -> Dict[str, str]:
-        """
-        Returns AIS const fields in bits.
-        """
-        bits, const = FieldBitsCountEnum, AISMsgType1ConstsEnum.dict()
-        return {name: convert_int_to_bits(num=value, bits_count=bits[name]) for name, value in const.items()}
-
-    @property
-    def payload_bits(self) -> str:
-        """
-        Returns msg payload as a bit string.
-        """
-        # Constants in bits
-        consts = self._constants_bits
-        # Object attrs (fields) in bits
-        fields = self._fields_to_bits()
-        payload_fields_list = [
-            consts['msg_type'],
-            fields['repeat_indicator'],
-            fields['mmsi'],
-            fields['nav_status'],
-            consts['rot'],
-            fields['speed'],
-            consts['pos_accuracy'],
-            fields['lon'],
-            fields['lat'],
-            fields['course'],
-            fields['true_heading'],
-            fields['timestamp'],
-            consts['maneuver'],
-            consts['spare_type_1'],
-            consts['raim'],
-            consts['radio_status']
-        ]
-        return ''.join(payload_fields_list)
+    layout: ClassVar[PayloadLayout] = TYPE_1_LAYOUT
 
     def _fields_to_bits(self) -> Dict[str, str]:
         """
@@ -148,42 +124,7 @@ class AISMsgPayloadType5(AISMsgPayload):
     eta: ShipEta
     draught: float
     destination: str
-
-    @property
-    def _constants_bits(self) -> Dict[str, str]:
-        """
-        Returns AIS const fields in bits.
-        """
-        bits, const = FieldBitsCountEnum, AISMsgType5ConstsEnum.dict()
-        return {name: convert_int_to_bits(num=value, bits_count=bits[name]) for name, value in const.items()}
-
-    @property
-    def payload_bits(self) -> str:
-        """
-        Returns msg payload as a bit string.
-        """
-        # Constants in bits
-        consts = self._constants_bits
-        # Object attrs (fields) in bits
-        fields = self._fields_to_bits()
-        payload_fields_list = [
-            consts['msg_type'],
-            fields['repeat_indicator'],
-            fields['mmsi'],
-            consts['ais_version'],
-            fields['imo'],
-            fields['call_sign'],
-            fields['ship_name'],
-            fields['ship_type'],
-            fields['dimension'],
-            consts['pos_fix_type'],
-            fields['eta'],
-            fields['draught'],
-            fields['destination'],
-            consts['dte'],
-            consts['spare_type_5']
-        ]
-        return ''.join(payload_fields_list)
+    layout: ClassVar[PayloadLayout] = TYPE_5_LAYOUT
 
     def _fields_to_bits(self) -> Dict[str, str]:
         """
@@ -220,33 +161,126 @@ class AISMsgPayloadType5(AISMsgPayload):
         return fields_in_bits
 
 
+class AISMsgPayloadLite(AISMsgPayloadEncoderMixin):
+    """
+    Class represents lightweight AIS msg payload - plain object without pydantic validation, used on the hot path.
+    The data must be already validated (e.g. by the AISTrack model when the tracks are loaded).
+    """
+    __slots__ = ('repeat_indicator', 'mmsi', 'fill_bits')
+
+    def __init__(self, mmsi: int, repeat_indicator: int = 0) -> None:
+        self.repeat_indicator = repeat_indicator
+        self.mmsi = mmsi
+        self.fill_bits = 0
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{self.__class__.__name__}({fields})'
+
+    @property
+    def _fields(self) -> List[str]:
+        return [name for cls in reversed(type(self).__mro__) for name in getattr(cls, '__slots__', ())]
+
+
+class AISMsgPayloadType1Lite(AISMsgPayloadLite):
+    """
+    Class represents lightweight payload of AIS msg type 1 (Position Report Class A).
+    """
+    __slots__ = ('nav_status', 'speed', 'lon', 'lat', 'course', 'true_heading', 'timestamp')
+    layout: ClassVar[PayloadLayout] = TYPE_1_LAYOUT
+
+    def __init__(self, mmsi: int, nav_status: int, lon: float, lat: float, course: float, speed: float = 0,
+                 true_heading: int = 511, timestamp: int = 60, repeat_indicator: int = 0) -> None:
+        super().__init__(mmsi=mmsi, repeat_indicator=repeat_indicator)
+        self.nav_status = nav_status
+        self.speed = speed
+        self.lon = lon
+        self.lat = lat
+        self.course = course
+        self.true_heading = true_heading
+        self.timestamp = timestamp
+
+
+class AISMsgPayloadType5Lite(AISMsgPayloadLite):
+    """
+    Class represents lightweight payload of AIS msg type 5 (Static and Voyage Related Data).
+    """
+    __slots__ = ('imo', 'call_sign', 'ship_name', 'ship_type', 'dimension', 'eta', 'draught', 'destination')
+    layout: ClassVar[PayloadLayout] = TYPE_5_LAYOUT
+
+    def __init__(self, mmsi: int, imo: int, call_sign: str, ship_name: str, ship_type: int, dimension: ShipDimension,
+                 eta: ShipEta, draught: float, destination: str, repeat_indicator: int = 0) -> None:
+        super().__init__(mmsi=mmsi, repeat_indicator=repeat_indicator)
+        self.imo = imo
+        self.call_sign = call_sign
+        self.ship_name = ship_name
+        self.ship_type = ship_type
+        self.dimension = dimension
+        self.eta = eta
+        self.draught = draught
+        self.destination = destination
+
+
+# Max number of payload chars in a single NMEA sentence (82 chars frame limit).
+SENTENCE_PAYLOAD_CHARS = 60
+
+
+@lru_cache(maxsize=None)
+def _sentence_head(nmea_msg_type: str, number_of_sentences: int, sentence_number: int) -> Tuple[bytes, int]:
+    """
+    Returns sentence head (fields before the sequential message ID) and its precomputed checksum.
+    """
+    head = f'{nmea_msg_type},{number_of_sentences},{sentence_number},'.encode()
+    return head, xor_checksum(head)
+
+
 class NMEAMessage:
     """
     Class represents NMEA message. It can consist of a single sequence or multiple sequences.
     """
-    def __init__(self, payload: Union[AISMsgPayloadType1, AISMsgPayloadType5]) -> None:
+    def __init__(self, payload: Union[AISMsgPayloadType1, AISMsgPayloadType5, AISMsgPayloadLite]) -> None:
         self.nmea_msg_type = 'AIVDM'
         self.payload = payload
-        self.payload_parts: list = textwrap.wrap(payload.encode(), 60)
+        encoded_payload = payload.encode()
+        self.payload_parts: list = [encoded_payload[start:start + SENTENCE_PAYLOAD_CHARS]
+                                    for start in range(0, len(encoded_payload), SENTENCE_PAYLOAD_CHARS)]
         # Default 1 unless it is multi-sentence msg
         self.number_of_sentences = len(self.payload_parts)
         self.ais_channel = 'A'
+        self._sentence_templates = None
 
-    def get_sentences(self, seq_msg_id: int = 0) -> List[str]:
-        """
-        Return list of NMEA sentences.
-        """
-        nmea_sentences = []
-        for sentence_number, sentence_payload in enumerate(self.payload_parts, 1):
-            # Number of unused bits at end of encoded data (0-5)
-            fill_bits = self.payload.fill_bits if sentence_number == self.number_of_sentences else 0
-            # Can be digit between 0-9, but is common for both messages.
-            sequential_msg_id = seq_msg_id if self.number_of_sentences > 1 else ''
-            # Data from which the checksum will be calculated.
-            sentence_data = f'{self.nmea_msg_type},{self.number_of_sentences},{sentence_number},{sequential_msg_id},' \
-                            f'{self.ais_channel},{sentence_payload},{fill_bits}'
-            nmea_sentences.append(f'!{sentence_data}*{nmea_checksum(sentence_data)}\r\n')
-        return nmea_sentences
+    def _get_sentence_templates(self) -> List[Tuple[bytes, bytes, int]]:
+        """
+        Returns list of (head, tail, checksum) tuples - data of each sentence split around the sequential message ID
+        field and the checksum of both parts. Templates are built once, so next calls only patch the sequential
+        message ID and the checksum.
+        """
+        if self._sentence_templates is None:
+            templates = []
+            for sentence_number, sentence_payload in enumerate(self.payload_parts, 1):
+                # Number of unused bits at end of encoded data (0-5)
+                fill_bits = self.payload.fill_bits if sentence_number == self.number_of_sentences else 0
+                head, head_checksum = _sentence_head(nmea_msg_type=self.nmea_msg_type,
+                                                     number_of_sentences=self.number_of_sentences,
+                                                     sentence_number=sentence_number)
+                tail = f',{self.ais_channel},{sentence_payload},{fill_bits}'.encode()
+                templates.append((b'!' + head, tail, head_checksum ^ xor_checksum(tail)))
+            self._sentence_templates = templates
+        return self._sentence_templates
+
+    def get_sentences(self, seq_msg_id: int = 0, as_bytes: bool = False) -> Union[List[str], List[bytes]]:
+        """
+        Return list of NMEA sentences. Sentences are built as bytes - returned as ready to send bytes if as_bytes is set.
+        """
+        # Can be digit between 0-9, but is common for both messages.
+        sequential_msg_id = str(seq_msg_id).encode() if self.number_of_sentences > 1 else b''
+        # XOR checksum is updated with the sequential message ID field only.
+        seq_checksum = xor_checksum(sequential_msg_id)
+        sentences = [b''.join((head, sequential_msg_id, tail, b'*', HEX_CHECKSUMS[checksum ^ seq_checksum], b'\r\n'))
+                     for head, tail, checksum in self._get_sentence_templates()]
+        if as_bytes:
+            return sentences
+        return [sentence.decode() for sentence in sentences]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,236 @@
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+import math
+import mmap
+import re
+import time
+
+import numpy as np
+
+from ais.ais_utils import get_current_timestamp
+
+
+# NMEA log line - sentence with optional receive time (TAG block, number before or after the sentence), e.g.
+# '\s:station,c:1577836800*5C\!AIVDM,...*hh', '1577836800.25 !AIVDM,...*hh' or '!AIVDM,...*hh,1577836800'
+LOG_LINE_PATTERN = re.compile(rb'(?:\\(?P<tag>[^\\]*)\\|(?P<prefix>\d+(?:\.\d+)?)[ \t;,]+)?'
+                              rb'(?P<sentence>[!$][^*\r\n]*\*[0-9A-Fa-f]{2})(?:,(?P<suffix>\d+(?:\.\d+)?))?')
+# Receive time ('c' parameter) of TAG block - UNIX time in seconds (or milliseconds)
+TAG_TIME_PATTERN = re.compile(rb'(?:^|,)c:(\d+)')
+# UNIX time greater than the limit is in milliseconds
+MILLISECONDS_LIMIT = 1e11
+# Size of the log file part read at once
+REPLAY_CHUNK_SIZE = 1 << 20
+# Time (in seconds of log time) between entries of the timestamp index
+REPLAY_INDEX_INTERVAL = 1.0
+# Max number of sentences replayed at once
+REPLAY_BATCH_SIZE = 1000
+# Sentences due within the interval (in seconds) are replayed at once
+REPLAY_BATCH_INTERVAL = 0.01
+
+PathType = Union[str, Path]
+
+
+def parse_log_line(line: bytes) -> Tuple[Optional[float], Optional[bytes]]:
+    """
+    Returns tuple - receive time (None, if the line has no time) and NMEA sentence (without line ending) of a log
+    line. Sentence is None, if the line is not a NMEA sentence (e.g. comment).
+    """
+    match = LOG_LINE_PATTERN.match(line)
+    if not match:
+        return None, None
+    tag, prefix, sentence, suffix = match.group('tag', 'prefix', 'sentence', 'suffix')
+    timestamp = None
+    if tag:
+        tag_time = TAG_TIME_PATTERN.search(tag)
+        if tag_time:
+            timestamp = float(tag_time.group(1))
+    elif prefix or suffix:
+        timestamp = float(prefix or suffix)
+    if timestamp is not None and timestamp > MILLISECONDS_LIMIT:
+        timestamp /= 1000
+    return timestamp, sentence
+
+
+class NMEALog:
+    """
+    Class represents recorded NMEA log file. The file is memory-mapped and read in chunks. Index of receive times
+    (byte offset of the first line of each index_interval of log time) is built on open, so the log can be read from
+    a time offset without parsing the preceding lines.
+    Lines without receive time (e.g. next sentences of multi-sentence msgs) have the time of the preceding line.
+    """
+    def __init__(self, filename: PathType, index_interval: float = REPLAY_INDEX_INTERVAL,
+                 chunk_size: int = REPLAY_CHUNK_SIZE) -> None:
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.lines_count = 0
+        self.sentences_count = 0
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        with open(filename, 'rb') as file:
+            size = Path(filename).stat().st_size
+            # Empty file cannot be memory-mapped
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.index_times, self.index_offsets = self._build_index(index_interval=index_interval)
+
+    @property
+    def duration(self) -> float:
+        """
+        Returns log time (in seconds) between the first and the last line with receive time.
+        """
+        if self.start_time is None:
+            return 0.0
+        return self.end_time - self.start_time
+
+    def _iter_lines(self, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """
+        Returns iterator of (byte offset, line) tuples of the log starting at given offset.
+        """
+        data = self._data
+        size = len(data)
+        while offset < size:
+            end = min(offset + self.chunk_size, size)
+            if end < size:
+                end = data.rfind(b'\n', offset, end) + 1
+                if not end:
+                    # Line longer than chunk
+                    end = data.find(b'\n', offset) + 1 or size
+            for line in data[offset:end].splitlines(keepends=True):
+                yield offset, line
+                offset += len(line)
+
+    def _build_index(self, index_interval: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Counts lines and sentences of the log. Returns arrays of receive times and byte offsets of the index.
+        """
+        times = []
+        offsets = []
+        next_time = None
+        for offset, line in self._iter_lines():
+            self.lines_count += 1
+            timestamp, sentence = parse_log_line(line=line)
+            if sentence is None:
+                continue
+            self.sentences_count += 1
+            if timestamp is None:
+                continue
+            if self.start_time is None:
+                self.start_time = timestamp
+                # Sentences without receive time before the first time are read from the start of the log
+                offset = 0
+            self.end_time = timestamp
+            if next_time is None or timestamp >= next_time:
+                times.append(timestamp)
+                offsets.append(offset)
+                next_time = timestamp + index_interval
+        return np.array(times, dtype=np.float64), np.array(offsets, dtype=np.int64)
+
+    def find_offset(self, time_offset: float) -> int:
+        """
+        Returns byte offset of the index entry preceding given time offset (in seconds from the log start time).
+        """
+        if not len(self.index_times):
+            return 0
+        position = np.searchsorted(self.index_times, self.start_time + time_offset, side='right') - 1
+        return int(self.index_offsets[max(position, 0)])
+
+    def read_batches(self, time_offset: float = 0.0, batch_interval: float = 0.0,
+                     batch_size: int = REPLAY_BATCH_SIZE) -> Iterator[Tuple[Optional[float], List[bytes]]]:
+        """
+        Returns iterator of (receive time of the first sentence, sentences) tuples - sentences (ready to send bytes)
+        received within batch_interval (the same receive time by default) are batched, at most batch_size sentences.
+        Sentences received before the time offset (in seconds from the log start time) are skipped.
+        """
+        if time_offset and self.start_time is not None:
+            skip_before = self.start_time + time_offset
+            offset = self.find_offset(time_offset=time_offset)
+        else:
+            skip_before = None
+            offset = 0
+        current_time = None
+        batch_time = None
+        batch = []
+        for _, line in self._iter_lines(offset=offset):
+            timestamp, sentence = parse_log_line(line=line)
+            if sentence is None:
+                continue
+            if timestamp is not None:
+                current_time = timestamp
+            if skip_before is not None and (current_time is None or current_time < skip_before):
+                # Sentences received before the time offset (including next sentences of multi-sentence msgs)
+                continue
+            if batch and (len(batch) == batch_size or current_time != batch_time and (
+                    current_time is None or batch_time is None or abs(current_time - batch_time) >= batch_interval)):
+                yield batch_time, batch
+                batch = []
+            if not batch:
+                batch_time = current_time
+            batch.append(sentence + b'\r\n')
+        if batch:
+            yield batch_time, batch
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self) -> 'NMEALog':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ReplayStats:
+    """
+    Class represents log replay statistics - replayed sentences and lag (in seconds) of batches sent late.
+    """
+    def __init__(self) -> None:
+        self.sentences = 0
+        self.batches = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def __str__(self) -> str:
+        mean_lag = self.total_lag / self.batches if self.batches else 0.0
+        return f'{self.sentences} sentences in {self.batches} batches, ' \
+               f'lag mean {mean_lag:.3f} s / max {self.max_lag:.3f} s'
+
+
+class LogReplay:
+    """
+    Class represents replay of NMEA log with the original timing of sentences scaled by the speed factor (e.g. 10 -
+    ten times faster, 0 - as fast as possible). Due times are computed from the replay start time, so time spent
+    on sending does not accumulate. Sentences due within batch_interval are sent at once.
+    """
+    def __init__(self, log: NMEALog, speed: float = 1.0, clock: Callable[[], float] = get_current_timestamp,
+                 sleep: Callable[[float], None] = time.sleep, batch_interval: float = REPLAY_BATCH_INTERVAL) -> None:
+        if speed < 0:
+            raise ValueError('replay speed must be greater than or equal to 0')
+        self.log = log
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+        self.batch_interval = batch_interval
+        self.stats = ReplayStats()
+
+    def replay(self, time_offset: float = 0.0) -> Iterator[List[bytes]]:
+        """
+        Returns iterator of sentence batches - each batch is returned at its due time. The log is replayed from
+        the time offset (in seconds from the log start time).
+        """
+        start = self.clock()
+        log_start = None
+        # Batch interval of the log time
+        batch_interval = self.batch_interval * self.speed if self.speed else math.inf
+        for timestamp, sentences in self.log.read_batches(time_offset=time_offset, batch_interval=batch_interval):
+            if self.speed and timestamp is not None:
+                if log_start is None:
+                    log_start = timestamp
+                delay = start + (timestamp - log_start) / self.speed - self.clock()
+                if delay > 0:
+                    self.sleep(delay)
+                else:
+                    self.stats.total_lag -= delay
+                    self.stats.max_lag = max(self.stats.max_lag, -delay)
+            self.stats.batches += 1
+            self.stats.sentences += len(sentences)
+            yield sentences
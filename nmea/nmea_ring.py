@@ -0,0 +1,88 @@
+from multiprocessing import shared_memory
+from multiprocessing.synchronize import Semaphore
+from typing import Optional
+import multiprocessing
+import struct
+
+
+# Default number of ring slots and size (in bytes) of a single slot
+RING_SLOTS_COUNT = 128
+RING_SLOT_SIZE = 1 << 16
+# Ring slot starts with the size of stored data
+RING_SLOT_HEADER = struct.Struct('<I')
+
+
+class SharedRingBuffer:
+    """
+    Class represents single-producer single-consumer ring buffer of fixed-size slots in shared memory - data is handed
+    over between processes without pickling. Semaphores count free and used slots (and order the memory access),
+    the producer and the consumer keep their own slot positions.
+    Optional shared ready semaphore is released with each written slot, so a consumer of many rings can wait for
+    data of any of them.
+    """
+    def __init__(self, slots_count: int = RING_SLOTS_COUNT, slot_size: int = RING_SLOT_SIZE,
+                 ready: Optional[Semaphore] = None, context=None) -> None:
+        context = context or multiprocessing.get_context()
+        self.slots_count = slots_count
+        self.slot_size = slot_size
+        self._memory = shared_memory.SharedMemory(create=True, size=slots_count * slot_size)
+        self._free = context.Semaphore(slots_count)
+        self._used = context.Semaphore(0)
+        self._ready = ready
+        # Positions of the next written and read slot - each is used only by the producer or the consumer
+        self._write_position = 0
+        self._read_position = 0
+
+    @property
+    def max_size(self) -> int:
+        """
+        Returns max size of data stored in a single slot.
+        """
+        return self.slot_size - RING_SLOT_HEADER.size
+
+    def put(self, data: bytes, timeout: Optional[float] = None) -> bool:
+        """
+        Writes data into the next free slot. Returns False, if no slot was freed in time (data is not written).
+        """
+        if len(data) > self.max_size:
+            raise ValueError(f'data size {len(data)} exceeds ring slot size {self.max_size}')
+        if not self._free.acquire(timeout=timeout):
+            return False
+        offset = self._write_position * self.slot_size
+        start = offset + RING_SLOT_HEADER.size
+        buffer = self._memory.buf
+        RING_SLOT_HEADER.pack_into(buffer, offset, len(data))
+        buffer[start:start + len(data)] = data
+        self._write_position = (self._write_position + 1) % self.slots_count
+        self._used.release()
+        if self._ready is not None:
+            self._ready.release()
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """
+        Returns data of the next used slot and frees the slot. Returns None, if the ring is empty (does not wait).
+        """
+        if not self._used.acquire(block=False):
+            return None
+        offset = self._read_position * self.slot_size
+        start = offset + RING_SLOT_HEADER.size
+        buffer = self._memory.buf
+        size, = RING_SLOT_HEADER.unpack_from(buffer, offset)
+        data = bytes(buffer[start:start + size])
+        self._read_position = (self._read_position + 1) % self.slots_count
+        self._free.release()
+        return data
+
+    def close(self) -> None:
+        """
+        Closes access to the shared memory (in the calling process).
+        """
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """
+        Closes and destroys the shared memory - should be called once by the process, which created the ring.
+        """
+        self._memory.close()
+        self._memory.unlink()
@@ -1,41 +1,445 @@
-from typing import List
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
+import asyncio
+import queue
 import socket
 import time
-import sys
 import threading
 
-from ais.ais_utils import Clients
+from ais.ais_utils import Clients, MulticastGroup
+from nmea.nmea_bulk import SocketSender, SendStats, get_bulk_sender
+
+
+class Pacer(ABC):
+    """
+    Class represents an abstract pacing policy - decides how long to wait before sending the next datagram.
+    """
+    name = ''
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.clock = clock
+        self.sleep = sleep
+
+    @abstractmethod
+    def reserve(self) -> float:
+        """
+        Reserves sending of the next datagram. Returns delay (in seconds) to wait before the datagram is sent.
+        """
+        pass
+
+    def wait(self) -> None:
+        """
+        Blocks until the next datagram can be sent.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            self.sleep(delay)
+
+    async def wait_async(self) -> None:
+        """
+        Waits (without blocking the event loop) until the next datagram can be sent.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class NoPacer(Pacer):
+    """
+    Class represents no pacing - datagrams are sent as fast as possible.
+    """
+    name = 'none'
+
+    def __init__(self, rate: float = 0, burst: int = 1, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+    def reserve(self) -> float:
+        return 0.0
+
+
+class FixedIntervalPacer(Pacer):
+    """
+    Class represents fixed interval pacing - datagrams are sent at a constant rate (datagrams per second).
+    Send times are computed from the previous send time, so the time spent on sending does not accumulate.
+    """
+    name = 'fixed'
+
+    def __init__(self, rate: float = 20, burst: int = 1, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.interval = 1 / rate
+        self._next_send = None
+
+    def reserve(self) -> float:
+        now = self.clock()
+        if self._next_send is None or self._next_send < now:
+            # First datagram or sender was idle - do not send the missed datagrams in a burst
+            self._next_send = now
+        delay = self._next_send - now
+        self._next_send += self.interval
+        return delay
+
+
+class TokenBucketPacer(Pacer):
+    """
+    Class represents token bucket pacing - up to 'burst' datagrams can be sent at once, then datagrams are sent
+    at an average rate (datagrams per second).
+    """
+    name = 'token_bucket'
+
+    def __init__(self, rate: float = 1000, burst: int = 100, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated_at = self.clock()
+
+    def reserve(self) -> float:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        # Token is taken in advance - the bucket goes into debt until the delay passes
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+PACERS: Dict[str, Type[Pacer]] = {pacer.name: pacer for pacer in [NoPacer, FixedIntervalPacer, TokenBucketPacer]}
+
+
+def get_pacer(name: str = 'none', **kwargs) -> Pacer:
+    """
+    Returns pacer object with given name.
+    """
+    try:
+        return PACERS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f'Invalid pacing {name}. Should be one of: {", ".join(PACERS)}.')
+
+
+def encode_nmea_msgs(data: List[Union[str, bytes]]) -> List[bytes]:
+    """
+    Returns NMEA msgs as a list of bytes (ready to send). Msgs already encoded are not encoded again.
+    """
+    return [msg if isinstance(msg, bytes) else msg.encode() for msg in data]
+
+
+# Max UDP payload not fragmented on the Ethernet link (MTU 1500 - 20 bytes IPv4 header - 8 bytes UDP header)
+MAX_DATAGRAM_SIZE = 1472
+
+
+def group_nmea_sentences(data: List[bytes]) -> List[bytes]:
+    """
+    Returns NMEA msgs with all sentences of each multi-sentence msg (e.g. AIS msg type 5) joined together.
+    """
+    groups = []
+    group = b''
+    for sentence in data:
+        group += sentence
+        # Sentence format: !AIVDM,<number of sentences>,<sentence number>,...
+        fields = sentence.split(b',', 3)
+        if len(fields) < 3 or fields[1] == fields[2]:
+            groups.append(group)
+            group = b''
+    if group:
+        # Incomplete multi-sentence msg
+        groups.append(group)
+    return groups
+
+
+def pack_datagrams(data: List[bytes], max_size: int = MAX_DATAGRAM_SIZE) -> List[bytes]:
+    """
+    Returns NMEA sentences packed into datagrams up to max_size bytes. Sentences are never split and all sentences
+    of a multi-sentence msg are kept in the same datagram (msg longer than max_size is sent as a single datagram).
+    """
+    datagrams = []
+    datagram = []
+    datagram_size = 0
+    for msg in group_nmea_sentences(data=data):
+        if datagram and datagram_size + len(msg) > max_size:
+            datagrams.append(b''.join(datagram))
+            datagram = []
+            datagram_size = 0
+        datagram.append(msg)
+        datagram_size += len(msg)
+    if datagram:
+        datagrams.append(b''.join(datagram))
+    return datagrams
+
+
+def prepare_datagrams(data: List[Union[str, bytes]], datagram_size: int = 0) -> List[bytes]:
+    """
+    Returns NMEA msgs as datagrams ready to send. Sentences are packed into datagrams up to datagram_size bytes,
+    if the size is provided - otherwise each sentence is sent in a separate datagram.
+    """
+    datagrams = encode_nmea_msgs(data=data)
+    if datagram_size:
+        datagrams = pack_datagrams(data=datagrams, max_size=datagram_size)
+    return datagrams
+
+
+def create_multicast_socket(group: MulticastGroup) -> socket.socket:
+    """
+    Returns UDP socket configured for sending to the multicast group (TTL, loopback and outgoing interface).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, group.ttl)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, int(group.loopback))
+    if group.interface:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(group.interface))
+    return sock
+
+
+# Max number of data batches queued for the UDP sender - the oldest batch is dropped, when the queue is full
+UDP_QUEUE_SIZE = 64
 
 
 class UDPStream:
     """
     Class represents a stream of UDP data sent to selected hosts.
+    All hosts are served by a single sender thread using one long-lived socket (and one socket per multicast group).
+    Unpaced data can be sent in bulk (sendmmsg syscall on Linux, up to 1024 datagrams per syscall).
+    The sender queue is bounded - the oldest data is dropped (and counted in stats), if the sender is behind.
+    """
+    def __init__(self, clients: Clients, pacer: Optional[Pacer] = None, datagram_size: int = 0,
+                 bulk: bool = False, max_queue_size: int = UDP_QUEUE_SIZE) -> None:
+        self.clients_list = clients
+        self.pacer = pacer or NoPacer()
+        # Max size of datagram with packed NMEA sentences (0 - single sentence per datagram)
+        self.datagram_size = datagram_size
+        self.addresses: List[Tuple[str, int]] = [(client.host, client.port) for client in clients.clients]
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Each multicast group gets datagrams once, no matter how many consumers listen
+        self.multicast_sockets: List[Tuple[socket.socket, Tuple[str, int]]] = [
+            (create_multicast_socket(group=group), (group.group, group.port)) for group in clients.multicast
+        ]
+        self.bulk_sender: Optional[SocketSender] = get_bulk_sender() if bulk else None
+        self.stats = SendStats()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._sender: Optional[threading.Thread] = None
+        self._closing = threading.Event()
+
+    def run(self, data: List[Union[str, bytes]], block: bool = False) -> None:
+        """
+        Starts UDP stream tx. Data is sent in the background by the sender thread. If block is set, waits for free
+        space in the sender queue (backpressure) instead of dropping the oldest data.
+        """
+        if self._sender is None:
+            self._sender = threading.Thread(target=self._send_loop, name='ais_udp_sender', daemon=True)
+            self._sender.start()
+        datagrams = prepare_datagrams(data=data, datagram_size=self.datagram_size)
+        if block:
+            self._queue.put(datagrams)
+        else:
+            self._put(item=datagrams)
+
+    def flush(self) -> None:
+        """
+        Waits until queued data is sent.
+        """
+        if self._sender is not None:
+            self._queue.join()
+
+    def _put(self, item: Optional[List[bytes]]) -> None:
+        """
+        Adds item to the sender queue. The oldest queued data is dropped, if the queue is full.
+        """
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                dropped = self._queue.get_nowait()
+            except queue.Empty:
+                # Sender took the data meanwhile
+                continue
+            self._queue.task_done()
+            if dropped is not None:
+                self.stats.dropped += len(dropped)
+
+    def _send_loop(self) -> None:
+        """
+        Sends queued data until the stream is closed.
+        """
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None or self._closing.is_set():
+                    break
+                self.send_data(data=data)
+            finally:
+                self._queue.task_done()
+
+    @property
+    def routes(self) -> List[Tuple[socket.socket, List[Tuple[str, int]]]]:
+        """
+        Returns list of (socket, addresses) tuples - all destinations with the socket used to reach them.
+        """
+        routes = [(self.socket, self.addresses)] if self.addresses else []
+        return routes + [(sock, [address]) for sock, address in self.multicast_sockets]
+
+    def send_data(self, data: List[bytes]) -> int:
+        """
+        Sends datagrams with NMEA msgs to all hosts. Returns number of datagrams sent.
+        """
+        send_start = time.perf_counter()
+        if self.bulk_sender is not None and isinstance(self.pacer, NoPacer):
+            sent_count, syscalls = 0, 0
+            for sock, addresses in self.routes:
+                route_sent_count, route_syscalls = self.bulk_sender.send(sock=sock, datagrams=data, addresses=addresses)
+                sent_count += route_sent_count
+                syscalls += route_syscalls
+        else:
+            sent_count, syscalls = self._send_paced(data=data)
+        self.stats.add(syscalls=syscalls, datagrams=sent_count, send_time=time.perf_counter() - send_start)
+        return sent_count
+
+    def _send_paced(self, data: List[bytes]) -> Tuple[int, int]:
+        """
+        Sends datagrams one by one (with pacing). Returns tuple - (number of datagrams sent, number of syscalls).
+        """
+        sent_count = 0
+        syscalls = 0
+        failed_addresses = set()
+        routes = self.routes
+        for nmea in data:
+            if self._closing.is_set():
+                break
+            self.pacer.wait()
+            for sock, addresses in routes:
+                for address in addresses:
+                    if address in failed_addresses:
+                        continue
+                    syscalls += 1
+                    try:
+                        sock.sendto(nmea, address)
+                        sent_count += 1
+                    except OSError as err:
+                        # Skip the host until the next data is sent
+                        print(f'Error: {address[0]}:{address[1]} - {err.strerror}')
+                        failed_addresses.add(address)
+        return sent_count, syscalls
+
+    def close(self) -> None:
+        """
+        Stops the sender thread (data not sent yet is dropped) and closes the sockets.
+        """
+        self._closing.set()
+        if self._sender is not None:
+            self._put(item=None)
+            self._sender.join()
+            self._sender = None
+        self.socket.close()
+        for sock, _ in self.multicast_sockets:
+            sock.close()
+
+
+# Number of NMEA msgs sent by the async sender before it yields to the event loop (unpaced sending)
+ASYNC_SEND_CHUNK_SIZE = 256
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    """
+    Class represents asyncio datagram protocol of the AsyncUDPStream endpoint.
+    Sending is paused while the transport write buffer is full.
     """
-    def __init__(self, clients: Clients) -> None:
+    def __init__(self) -> None:
+        self.writable = asyncio.Event()
+        self.writable.set()
+
+    def pause_writing(self) -> None:
+        self.writable.clear()
+
+    def resume_writing(self) -> None:
+        self.writable.set()
+
+    def error_received(self, exc: Exception) -> None:
+        print(f'Error: {exc}')
+
+
+class AsyncUDPStream:
+    """
+    Class represents a stream of UDP data sent to selected hosts, based on asyncio datagram endpoints (one endpoint
+    for unicast hosts and one per multicast group).
+    All hosts are served by a single sender task, so msgs generation and sending overlap in one event loop.
+    The sender queue is bounded - the oldest data is dropped (and counted in stats), if the sender is behind.
+    """
+    def __init__(self, clients: Clients, pacer: Optional[Pacer] = None, datagram_size: int = 0,
+                 max_queue_size: int = UDP_QUEUE_SIZE) -> None:
         self.clients_list = clients
-        self.data_to_send = []
+        self.pacer = pacer or NoPacer()
+        # Max size of datagram with packed NMEA sentences (0 - single sentence per datagram)
+        self.datagram_size = datagram_size
+        self.addresses: List[Tuple[str, int]] = [(client.host, client.port) for client in clients.clients]
+        # List of (transport, protocol, addresses) tuples
+        self.endpoints: List[Tuple[asyncio.DatagramTransport, _DatagramProtocol, List[Tuple[str, int]]]] = []
+        self.max_queue_size = max_queue_size
+        self.stats = SendStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Creates datagram endpoints and starts the sender task.
+        """
+        loop = asyncio.get_running_loop()
+        if self.addresses:
+            transport, protocol = await loop.create_datagram_endpoint(_DatagramProtocol, family=socket.AF_INET)
+            self.endpoints.append((transport, protocol, self.addresses))
+        for group in self.clients_list.multicast:
+            transport, protocol = await loop.create_datagram_endpoint(_DatagramProtocol,
+                                                                      sock=create_multicast_socket(group=group))
+            self.endpoints.append((transport, protocol, [(group.group, group.port)]))
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._sender = loop.create_task(self._send_loop())
+
+    def run(self, data: List[Union[str, bytes]]) -> None:
+        """
+        Starts UDP stream tx. Data is sent by the sender task. The oldest queued data is dropped, if the queue is full.
+        """
+        if self._queue.full():
+            self.stats.dropped += len(self._queue.get_nowait())
+        self._queue.put_nowait(prepare_datagrams(data=data, datagram_size=self.datagram_size))
+
+    async def _send_loop(self) -> None:
+        """
+        Sends queued data until the stream is closed.
+        """
+        while True:
+            data = await self._queue.get()
+            await self.send_data(data=data)
 
-    def run(self, data: List[str]) -> None:
+    async def send_data(self, data: List[bytes]) -> int:
         """
-        Starts UDP stream tx.
+        Sends datagrams with NMEA msgs to all hosts. Returns number of datagrams sent.
         """
-        self.data_to_send = data
-        for client in self.clients_list.clients:
-            host, port = client.host, client.port
-            # Send data to each host:port in a separate thread
-            threading.Thread(target=self.send_data,
-                             kwargs={'host': host, 'port': port},
-                             name=f'ais_thread_{host}:{port}').start()
+        send_start = time.perf_counter()
+        sent_count = 0
+        for msg_number, nmea in enumerate(data, 1):
+            await self.pacer.wait_async()
+            for transport, protocol, addresses in self.endpoints:
+                if not protocol.writable.is_set():
+                    await protocol.writable.wait()
+                for address in addresses:
+                    transport.sendto(nmea, address)
+                    sent_count += 1
+            if msg_number % ASYNC_SEND_CHUNK_SIZE == 0:
+                # Let msgs generation run between chunks
+                await asyncio.sleep(0)
+        self.stats.add(syscalls=sent_count, datagrams=sent_count, send_time=time.perf_counter() - send_start)
+        return sent_count
 
-    def send_data(self, host: str, port: int) -> None:
+    async def close(self) -> None:
         """
-        Sends UDP data stream to specified host:port pair.
+        Stops the sender task (data not sent yet is dropped) and closes the endpoints.
         """
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            for nmea in self.data_to_send:
-                try:
-                    s.sendto(nmea.encode(), (host, port))
-                    time.sleep(0.05)
-                except OSError as err:
-                    print(f'Error: {err.strerror}')
-                    sys.exit()
+        if self._sender is not None:
+            self._sender.cancel()
+            try:
+                await self._sender
+            except asyncio.CancelledError:
+                pass
+            self._sender = None
+        for transport, _, _ in self.endpoints:
+            transport.close()
+        self.endpoints = []
@@ -0,0 +1,241 @@
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Union
+import selectors
+import socket
+import threading
+import time
+
+from nmea.nmea_stream import encode_nmea_msgs
+
+
+# What to do with a slow reader when its queue is full:
+# 'drop_oldest' - the oldest queued data is lost, 'disconnect' - the connection is closed.
+TCP_DROP_POLICIES = ('drop_oldest', 'disconnect')
+
+
+class TCPConnectionStats:
+    """
+    Class represents statistics of a single TCP connection - throughput, dropped data and lag (in seconds) between
+    queuing the data and writing it to the socket.
+    """
+    def __init__(self, address: Tuple[str, int]) -> None:
+        self.address = address
+        self.connected_at = time.monotonic()
+        self.bytes_sent = 0
+        self.chunks_sent = 0
+        self.chunks_dropped = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def add_sent_chunk(self, lag: float) -> None:
+        self.chunks_sent += 1
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.chunks_sent if self.chunks_sent else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Returns mean throughput in bytes per second.
+        """
+        duration = time.monotonic() - self.connected_at
+        return self.bytes_sent / duration if duration else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.address[0]}:{self.address[1]} - {self.bytes_sent} bytes sent ({self.throughput:.0f} B/s), ' \
+               f'{self.chunks_dropped} chunks dropped, lag mean {self.mean_lag:.3f} s / max {self.max_lag:.3f} s'
+
+
+class TCPConnection:
+    """
+    Class represents single TCP client connection with a bounded queue of data chunks (one chunk per cycle).
+    """
+    def __init__(self, sock: socket.socket, address: Tuple[str, int]) -> None:
+        self.socket = sock
+        self.address = address
+        # Queue of (data, queued at) tuples
+        self.queue: Deque[Tuple[bytes, float]] = deque()
+        self.queued_bytes = 0
+        # Number of bytes of the first chunk already sent
+        self.offset = 0
+        self.closing = False
+        self.stats = TCPConnectionStats(address=address)
+
+    def push(self, chunk: bytes, now: float, max_queue_bytes: int, drop_policy: str) -> None:
+        """
+        Adds data chunk to the queue. Applies drop policy, if the queue is full.
+        """
+        if self.closing:
+            return
+        while self.queue and self.queued_bytes + len(chunk) > max_queue_bytes:
+            if drop_policy == 'disconnect':
+                self.closing = True
+                return
+            # Partially sent chunk can not be dropped (NMEA sentence would be broken)
+            drop_index = 1 if self.offset else 0
+            if len(self.queue) <= drop_index:
+                break
+            dropped, _ = self.queue[drop_index]
+            del self.queue[drop_index]
+            self.queued_bytes -= len(dropped)
+            self.stats.chunks_dropped += 1
+        self.queue.append((chunk, now))
+        self.queued_bytes += len(chunk)
+
+    def send(self, now: float) -> None:
+        """
+        Writes queued data to the socket (without blocking).
+        """
+        while self.queue:
+            chunk, queued_at = self.queue[0]
+            sent = self.socket.send(memoryview(chunk)[self.offset:])
+            self.offset += sent
+            self.stats.bytes_sent += sent
+            if self.offset < len(chunk):
+                # Socket send buffer is full
+                return
+            self.queue.popleft()
+            self.queued_bytes -= len(chunk)
+            self.offset = 0
+            self.stats.add_sent_chunk(lag=now - queued_at)
+
+
+class TCPServerStream:
+    """
+    Class represents TCP server sending NMEA data to all connected clients (e.g. OpenCPN-style TCP feeds).
+    Connections are served by one thread with non-blocking sockets, so slow readers never block the generation -
+    each connection has a bounded queue and the drop policy is applied when the queue is full.
+    """
+    def __init__(self, host: str = '0.0.0.0', port: int = 10110, max_queue_bytes: int = 1 << 20,
+                 drop_policy: str = 'drop_oldest') -> None:
+        if drop_policy not in TCP_DROP_POLICIES:
+            raise ValueError(f'Invalid drop policy {drop_policy}. Should be one of: {", ".join(TCP_DROP_POLICIES)}.')
+        self.max_queue_bytes = max_queue_bytes
+        self.drop_policy = drop_policy
+        self.connections: Dict[socket.socket, TCPConnection] = {}
+        # Statistics of closed connections
+        self.closed_stats: List[TCPConnectionStats] = []
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((host, port))
+        self.server_socket.listen()
+        self.server_socket.setblocking(False)
+        self.address: Tuple[str, int] = self.server_socket.getsockname()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.server_socket, selectors.EVENT_READ)
+        # Socket pair used to wake up the server thread when new data is queued
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._lock = threading.Lock()
+        self._closing = False
+        self._thread = threading.Thread(target=self._serve, name='ais_tcp_server', daemon=True)
+        self._thread.start()
+
+    def run(self, data: List[Union[str, bytes]]) -> None:
+        """
+        Queues NMEA data for all connected clients. Never blocks on slow clients.
+        """
+        chunk = b''.join(encode_nmea_msgs(data=data))
+        if not chunk:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for connection in self.connections.values():
+                connection.push(chunk=chunk,
+                                now=now,
+                                max_queue_bytes=self.max_queue_bytes,
+                                drop_policy=self.drop_policy)
+        self._wakeup()
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_send.send(b'\0')
+        except BlockingIOError:
+            # Wake up already pending
+            pass
+
+    def _accept(self) -> None:
+        try:
+            sock, address = self.server_socket.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        with self._lock:
+            self.connections[sock] = TCPConnection(sock=sock, address=address)
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def _close_connection(self, connection: TCPConnection) -> None:
+        self._selector.unregister(connection.socket)
+        connection.socket.close()
+        with self._lock:
+            del self.connections[connection.socket]
+            self.closed_stats.append(connection.stats)
+
+    def _serve(self) -> None:
+        while not self._closing:
+            for key, _ in self._selector.select(timeout=1):
+                sock = key.fileobj
+                if sock is self.server_socket:
+                    self._accept()
+                elif sock is self._wakeup_recv:
+                    while True:
+                        try:
+                            if not self._wakeup_recv.recv(4096):
+                                break
+                        except BlockingIOError:
+                            break
+                else:
+                    connection = self.connections[sock]
+                    try:
+                        # Data sent by clients is ignored - empty data means the client closed the connection
+                        if not sock.recv(4096):
+                            connection.closing = True
+                    except BlockingIOError:
+                        pass
+                    except OSError:
+                        connection.closing = True
+            now = time.monotonic()
+            for connection in list(self.connections.values()):
+                with self._lock:
+                    if not connection.closing:
+                        try:
+                            connection.send(now=now)
+                        except BlockingIOError:
+                            pass
+                        except OSError:
+                            connection.closing = True
+                    pending = bool(connection.queue)
+                if connection.closing:
+                    self._close_connection(connection=connection)
+                else:
+                    events = selectors.EVENT_READ | selectors.EVENT_WRITE if pending else selectors.EVENT_READ
+                    if self._selector.get_key(connection.socket).events != events:
+                        self._selector.modify(connection.socket, events)
+
+    @property
+    def stats(self) -> List[TCPConnectionStats]:
+        """
+        Returns statistics of all (open and closed) connections.
+        """
+        with self._lock:
+            return self.closed_stats + [connection.stats for connection in self.connections.values()]
+
+    def close(self) -> None:
+        """
+        Stops the server thread and closes all connections (data not sent yet is dropped).
+        """
+        self._closing = True
+        self._wakeup()
+        self._thread.join()
+        for connection in list(self.connections.values()):
+            self._close_connection(connection=connection)
+        self._selector.close()
+        self.server_socket.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
@@ -1,3 +1,30 @@
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+# AIVDM payload armoring - ASCII char for each six-bit value (0-63).
+SIXBIT_ARMOR_CHARS = '0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVW`abcdefghijklmnopqrstuvw'
+# Marks ASCII codes without six-bit value in the lookup tables.
+INVALID_SIXBIT = 0xff
+# Six-bit value (0-63) to armored ASCII code lookup table (64 entries).
+SIXBIT_ARMOR_TABLE = SIXBIT_ARMOR_CHARS.encode()
+# Armored ASCII code to six-bit value lookup table (128 entries).
+SIXBIT_DEARMOR_TABLE = bytes(SIXBIT_ARMOR_TABLE.find(code) if code in SIXBIT_ARMOR_TABLE else INVALID_SIXBIT
+                             for code in range(128))
+# ASCII code to ASCII6 code (six-bit text) lookup table (128 entries) - '@' to '_' are 0-31, ' ' to '?' are 32-63.
+ASCII6_TABLE = bytes(code - 64 if 64 <= code <= 95 else code if 32 <= code <= 63 else INVALID_SIXBIT
+                     for code in range(128))
+
+# Bulk paths convert six-bit items with base64 (six-bit groups are packed and unpacked in C), the base64 alphabet
+# is mapped to the armored chars / six-bit text with bytes.translate tables (256 entries, invalid chars map to '!').
+_BASE64_CHARS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+_BASE64_TO_ARMOR = bytes.maketrans(_BASE64_CHARS, SIXBIT_ARMOR_TABLE)
+_ARMOR_TO_BASE64 = bytes(_BASE64_CHARS[value] if value != INVALID_SIXBIT else ord('!')
+                         for value in SIXBIT_DEARMOR_TABLE + bytes([INVALID_SIXBIT]) * 128)
+_ASCII_TO_BASE64 = bytes(_BASE64_CHARS[value] if value != INVALID_SIXBIT else ord('!')
+                         for value in ASCII6_TABLE + bytes([INVALID_SIXBIT]) * 128)
+_BASE64_TO_ASCII = bytes.maketrans(_BASE64_CHARS, bytes(range(64, 96)) + bytes(range(32, 64)))
+
+
 def get_ascii_code_of_char(char: str) -> int:
     """
     Returns ACSII code (decimal) of provided char.
@@ -34,11 +61,8 @@ def convert_ascii_char_to_ascii6_code(char: str) -> int:
     Convert ASCII char to ASCII6 code.
     """
     ascii_code = ord(char)
-    if 64 <= ascii_code <= 95:
-        ascii6_code = ascii_code - 64
-    elif 32 <= ascii_code <= 63:
-        ascii6_code = ascii_code
-    else:
+    ascii6_code = ASCII6_TABLE[ascii_code] if ascii_code < 128 else INVALID_SIXBIT
+    if ascii6_code == INVALID_SIXBIT:
         raise ValueError(f'Invalid character {ascii_code}')
     return ascii6_code
 
@@ -47,11 +71,9 @@ def convert_ascii_code_to_decimal(ascii_code: int) -> int:
     """
     Converts ASCII code to six-bit decimal number.
     """
-    if ascii_code < 48 or 87 < ascii_code < 96 or ascii_code > 119:
+    decimal = SIXBIT_DEARMOR_TABLE[ascii_code] if 0 <= ascii_code < 128 else INVALID_SIXBIT
+    if decimal == INVALID_SIXBIT:
         raise ValueError(f'Invalid ASCII {ascii_code}.')
-    decimal = ascii_code - 48
-    if decimal > 40:
-        decimal -= 8
     return decimal
 
 
@@ -61,10 +83,7 @@ def convert_decimal_to_ascii_code(decimal_num: int) -> int:
     """
     if decimal_num < 0 or decimal_num > 63:
         raise ValueError('Wrong decimal number')
-    if decimal_num not in range(33,40) and decimal_num + 8 > 40:
-        decimal_num += 8
-    ascii_code = decimal_num + 48
-    return ascii_code
+    return SIXBIT_ARMOR_TABLE[decimal_num]
 
 
 def add_padding(text: str, required_length: int, padding_char: str = ' ') -> str:
@@ -90,29 +109,105 @@ def add_padding_0_bits(bits_string: str, required_length: int) -> tuple:
     return bits_string, extra_0_bits_count
 
 
+# Two hex digits (upper-case) for each checksum value (0-255).
+HEX_CHECKSUMS = tuple(f'{num:02X}'.encode() for num in range(256))
+# Max number of bytes XORed by folding a single int (1024 bits).
+XOR_FOLD_MAX_BYTES = 128
+
+
+def xor_checksum(data: bytes) -> int:
+    """
+    Returns XOR of all given bytes (NMEA checksum as int).
+    Data is loaded into a single int and folded in halves, so there is no Python loop over the bytes.
+    """
+    if len(data) > XOR_FOLD_MAX_BYTES:
+        check_sum = 0
+        for start in range(0, len(data), XOR_FOLD_MAX_BYTES):
+            check_sum ^= xor_checksum(data[start:start + XOR_FOLD_MAX_BYTES])
+        return check_sum
+    num = int.from_bytes(data, 'little')
+    num ^= num >> 512
+    num ^= num >> 256
+    num ^= num >> 128
+    num ^= num >> 64
+    num ^= num >> 32
+    num ^= num >> 16
+    num ^= num >> 8
+    return num & 0xff
+
+
 def nmea_checksum(data: str) -> str:
     """
     Return calculated NMEA checksum.
     """
-    check_sum: int = 0
-    for char in data:
-        num = bytearray(char, encoding='utf-8')[0]
-        # XOR operation.
-        check_sum = (check_sum ^ num)
-    # Returns only hex digits string without leading 0x.
-    hex_str: str = str(hex(check_sum))[2:]
-    if len(hex_str) == 2:
-        return hex_str.upper()
-    return f'0{hex_str}'.upper()
+    return HEX_CHECKSUMS[xor_checksum(data.encode())].decode()
 
 
 def convert_ais_payload_to_bits(payload: str) -> str:
     """
     Return string of bits from given AIS msg payload.
     """
-    payload_bits = ''
-    for char in payload:
-        ascii_code = get_ascii_code_of_char(char)
-        decimal = convert_ascii_code_to_decimal(ascii_code)
-        payload_bits += convert_int_to_bits(decimal)
-    return payload_bits
+    if not payload:
+        return ''
+    return format(dearmor_payload(payload=payload.encode()), f'0{len(payload) * 6}b')
+
+
+def _pack_sixbit_chars(data: bytes) -> int:
+    """
+    Returns base64 chars (one per six-bit item) packed into int (6 bits per char).
+    """
+    padding = -len(data) % 4
+    try:
+        value = int.from_bytes(b64decode(data + b'A' * padding, validate=True), 'big')
+    except BinasciiError:
+        raise ValueError('Invalid six-bit chars') from None
+    return value >> (padding * 6)
+
+
+def _unpack_sixbit_chars(value: int, chars_count: int) -> bytes:
+    """
+    Returns int (6 bits per char) unpacked into base64 chars (one per six-bit item).
+    """
+    padding = -chars_count % 4
+    return b64encode((value << (padding * 6)).to_bytes((chars_count + padding) * 3 // 4, 'big'))[:chars_count]
+
+
+def armor_payload(value: int, bits_count: int) -> tuple:
+    """
+    Converts packed payload int to a string of ASCII chars (AIVDM Payload Armoring).
+    Returns tuple - (payload string, number of fill-bits added to the last six-bit item)
+    """
+    fill_bits = -bits_count % 6
+    chars_count = (bits_count + fill_bits) // 6
+    payload = _unpack_sixbit_chars(value=value << fill_bits, chars_count=chars_count).translate(_BASE64_TO_ARMOR)
+    return payload.decode(), fill_bits
+
+
+def dearmor_payload(payload: bytes) -> int:
+    """
+    Converts AIVDM payload (armored ASCII chars) to packed payload int (6 bits per char, fill-bits included).
+    """
+    try:
+        return _pack_sixbit_chars(data=payload.translate(_ARMOR_TO_BASE64))
+    except ValueError:
+        raise ValueError(f'Invalid AIVDM payload {payload!r}') from None
+
+
+def encode_sixbit_text(text: str, chars_count: int) -> int:
+    """
+    Returns text (padded with spaces or truncated to chars_count) encoded as ASCII6 codes packed into int.
+    """
+    if len(text) != chars_count:
+        text = text[:chars_count].ljust(chars_count)
+    try:
+        return _pack_sixbit_chars(data=text.encode('ascii').translate(_ASCII_TO_BASE64))
+    except ValueError:
+        raise ValueError(f'Invalid six-bit text {text!r}') from None
+
+
+def decode_sixbit_text(value: int, chars_count: int) -> str:
+    """
+    Returns text decoded from ASCII6 codes packed into int. Trailing '@' and spaces (padding) are removed.
+    """
+    text = _unpack_sixbit_chars(value=value, chars_count=chars_count).translate(_BASE64_TO_ASCII).decode()
+    return text.rstrip('@ ')
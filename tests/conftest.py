@@ -2,6 +2,8 @@ from pytest import fixture
 
 from nmea.nmea_msg import AISMsgPayloadType1, AISMsgPayloadType5
 from ais.ais_utils import ShipDimension, ShipEta, Client
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState
 
 
 @fixture
@@ -76,6 +78,15 @@ def dummy_ais_tracks_list_single(dummy_ship_dimension, dummy_ship_eta):
     return tracks
 
 
+@fixture
+def dummy_fleet(request, dummy_ais_tracks_list_single):
+    # Tracks differ by index (the first track is not moving), number of tracks is set by indirect parametrization
+    size = getattr(request, 'param', 5)
+    tracks = [dict(dummy_ais_tracks_list_single[0], mmsi=205344990 + index, lon=float(index), speed=index,
+                   course=10 * index, ship_name=f'SHIP {index}') for index in range(size)]
+    return FleetState.from_track_list(AISTrackList(tracks=tracks))
+
+
 @fixture
 def dummy_client():
     return Client(host='192.168.1.1', port=1111)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import numpy as np
+import pytest
+
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_checkpoint import Checkpointer, restore_checkpoint, read_delta_log, get_delta_path, DELTA_RESET, \
+    DELTA_COMPLETE
+from ais.ais_snapshot import save_snapshot
+
+
+def assert_fleets_equal(fleet, expected_fleet):
+    assert len(fleet) == len(expected_fleet)
+    for name in FLEET_COLUMNS:
+        assert np.array_equal(getattr(fleet, name), getattr(expected_fleet, name))
+
+
+def test_fleet_state_dirty_tracks(dummy_fleet):
+    assert dummy_fleet.take_dirty().tolist() == [0, 1, 2, 3, 4]
+    assert dummy_fleet.take_dirty().tolist() == []
+    dummy_fleet[3].lon = 1.5
+    dummy_fleet[1].generate_nmea_type_5()
+    dummy_fleet.update_positions(current_timestamp=dummy_fleet.updated_at[0] + 10, indices=[4])
+    assert dummy_fleet.take_dirty().tolist() == [1, 3, 4]
+
+
+def test_checkpointer(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, interval=10)
+    assert checkpointer.checkpoint(now=100)
+    checkpointer.flush()
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    # Checkpoint is not due - changed tracks are written with the next checkpoint
+    dummy_fleet[2].lon = 50.5
+    assert not checkpointer.checkpoint(now=105)
+    assert checkpointer.checkpoint(now=110)
+    checkpointer.flush()
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    assert deltas[-1][0]['index'].tolist() == [2]
+    assert restore_checkpoint(filename=path).lon.tolist() == [0, 1, 50.5, 3, 4]
+    checkpointer.close()
+    assert checkpointer.stats.errors == 0
+    assert get_delta_path(filename=path).stat().st_size == 0
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+
+
+def test_checkpointer_bounded_rows(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, interval=10, max_rows=2, compact_ratio=100)
+    # The remaining changed tracks are copied with the next calls (even if the checkpoint is not due)
+    for now in [100, 100.5, 101, 101.5]:
+        checkpointer.checkpoint(now=now)
+        checkpointer.flush()
+    # The first pass is compacted into the snapshot, when complete (there is no snapshot file yet)
+    assert checkpointer.stats.compactions == 1
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    assert deltas == []
+    for index in [0, 2, 4]:
+        dummy_fleet[index].course = 90
+    for now in [111, 111.5]:
+        checkpointer.checkpoint(now=now)
+        checkpointer.flush()
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    assert [rows['index'].tolist() for rows, _, _ in deltas] == [[0, 2], [4]]
+    assert [flags for _, _, flags in deltas] == [0, 0]
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    checkpointer.close(compact=False)
+
+
+def test_checkpointer_torn_first_pass(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    fleet = FleetState.from_track_list(AISTrackList(tracks=[dict(dummy_fleet[0].to_dict(), mmsi=205344991 + index)
+                                                             for index in range(5)]))
+    checkpointer = Checkpointer(fleet=fleet, filename=path, interval=10, max_rows=2, compact_ratio=100)
+    checkpointer.checkpoint(now=100)
+    checkpointer.flush()
+    # Crash during the first pass - the previous snapshot is restored
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    assert [flags for _, _, flags in deltas] == [DELTA_RESET]
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    for now in [100.5, 101]:
+        checkpointer.checkpoint(now=now)
+        checkpointer.flush()
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    assert [flags for _, _, flags in deltas] == [DELTA_RESET, 0, DELTA_COMPLETE]
+    assert_fleets_equal(restore_checkpoint(filename=path), fleet)
+    checkpointer.close(compact=False)
+
+
+@pytest.mark.parametrize('dummy_fleet', [20], indirect=True)
+def test_checkpointer_tracks_changed_with_every_call(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=FleetState(), filename=path)
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, interval=5, max_rows=4, compact_ratio=100)
+    # Tracks are changed faster than max_rows per call - the generation of the checkpoint is copied first
+    for now in [100, 100.5, 101, 101.5, 102, 110, 110.5]:
+        dummy_fleet.mark_dirty(indices=np.arange(6))
+        checkpointer.checkpoint(now=now)
+        checkpointer.flush()
+    deltas, _ = read_delta_log(filename=get_delta_path(filename=path))
+    assert [rows['index'].tolist() for rows, _, _ in deltas] == [list(range(index, index + 4))
+                                                               for index in range(0, 20, 4)] + [[0, 1, 2, 3], [4, 5]]
+    assert [flags for _, _, flags in deltas] == [DELTA_RESET] + [0] * 3 + [DELTA_COMPLETE, 0, 0]
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    checkpointer.close(compact=False)
+
+
+def test_checkpointer_appended_tracks(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, interval=10)
+    checkpointer.checkpoint(now=100)
+    dummy_fleet.append(track=AISTrackList(tracks=[dummy_fleet[0].to_dict()]).tracks[0])
+    checkpointer.checkpoint(now=110)
+    checkpointer.flush()
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    checkpointer.close()
+
+
+def test_checkpointer_compaction(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, interval=1, compact_ratio=0.5)
+    for now in range(100, 110):
+        dummy_fleet[now % 5].course = now
+        checkpointer.checkpoint(now=now)
+        checkpointer.flush()
+    assert checkpointer.stats.compactions > 1
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    checkpointer.close()
+
+
+def test_checkpointer_reset_previous_state(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    fleet = FleetState.from_track_list(AISTrackList(tracks=[dummy_fleet[0].to_dict()]))
+    checkpointer = Checkpointer(fleet=fleet, filename=path, compact_ratio=100)
+    checkpointer.checkpoint(now=100)
+    checkpointer.flush()
+    # Tracks of the previous snapshot are dropped
+    assert_fleets_equal(restore_checkpoint(filename=path), fleet)
+    checkpointer.close()
+
+
+def test_checkpoint_torn_delta_record(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=FleetState(), filename=path)
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, compact_ratio=100)
+    checkpointer.checkpoint(now=100)
+    checkpointer.close(compact=False)
+    delta_path = get_delta_path(filename=path)
+    valid_size = delta_path.stat().st_size
+    assert valid_size > 100
+    with open(delta_path, 'ab') as file:
+        file.write(delta_path.read_bytes()[:100])
+    assert_fleets_equal(restore_checkpoint(filename=path), dummy_fleet)
+    # Torn record is dropped, so new records can be read
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path, compact_ratio=100)
+    assert delta_path.stat().st_size == valid_size
+    dummy_fleet[0].lon = 20.5
+    checkpointer.close(compact=False)
+    assert restore_checkpoint(filename=path).lon.tolist() == [20.5, 1, 2, 3, 4]
+
+
+def test_checkpointer_write_error(tmp_path, dummy_fleet):
+    path = tmp_path / 'missing' / 'fleet.snap'
+    checkpointer = Checkpointer(fleet=dummy_fleet, filename=path)
+    checkpointer.checkpoint(now=100)
+    checkpointer.close()
+    assert checkpointer.stats.errors == 2
+    assert isinstance(checkpointer.last_error, OSError)
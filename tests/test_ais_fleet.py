@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState, AISTrackView
+
+
+def test_fleet_state_from_track_list(dummy_ais_tracks_list_single):
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    assert len(fleet) == 1
+    assert isinstance(fleet[0], AISTrackView)
+    assert fleet.mmsi.tolist() == [205344990]
+    assert fleet.lon.dtype == np.float64
+
+
+def test_fleet_state_view_attrs(dummy_ais_tracks_list_single):
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    view = fleet[0]
+    for name in ['mmsi', 'nav_status', 'lon', 'lat', 'speed', 'course', 'true_heading', 'imo', 'call_sign',
+                 'ship_name', 'ship_type', 'dimension', 'eta', 'draught', 'destination', 'timestamp']:
+        assert getattr(view, name) == getattr(track, name)
+
+
+def test_fleet_state_view_assignment(dummy_ais_tracks_list_single):
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    view = fleet[0]
+    view.lon = 10.5
+    view.ship_name = 'STORM' + ' ' * 15
+    assert fleet.lon[0] == 10.5
+    assert fleet.ship_name[0] == b'STORM' + b' ' * 15
+
+
+def test_fleet_state_view_generate_nmea(dummy_ais_tracks_list_single):
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    for _ in range(12):
+        assert fleet[0].generate_nmea() == track.generate_nmea()
+
+
+def test_fleet_state_view_update_position(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0]['speed'] = 10
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    current_timestamp = track._updated_at + 60
+    track.update_position(current_timestamp=current_timestamp)
+    fleet[0].update_position(current_timestamp=current_timestamp)
+    assert (fleet[0].lon, fleet[0].lat) == (track.lon, track.lat)
+    assert fleet.updated_at[0] == current_timestamp
+
+
+def test_fleet_state_append_grows(dummy_ais_tracks_list_single):
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    fleet = FleetState()
+    for _ in range(5):
+        fleet.append(track=track)
+    assert len(fleet) == 5
+    assert fleet.capacity >= 5
+    assert len(fleet.mmsi) == 5
+    with pytest.raises(IndexError):
+        fleet[5]
+
+
+def test_fleet_state_to_track_list(dummy_ais_tracks_list_single):
+    track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
+    fleet = FleetState.from_track_list(track_list)
+    assert fleet.to_track_list() == track_list
+
+
+def test_fleet_state_nbytes(dummy_ais_tracks_list_single):
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    assert fleet.nbytes < 200
+
+
+def test_fleet_state_update_positions(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0]['speed'] = 10
+    dummy_ais_tracks_list_single.append(dict(dummy_ais_tracks_list_single[0], speed=0))
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    lon, lat, updated_at = fleet.lon[1], fleet.lat[1], fleet.updated_at[1]
+    current_timestamp = track._updated_at + 60
+    track.update_position(current_timestamp=current_timestamp)
+    fleet.update_positions(current_timestamp=current_timestamp)
+    assert (fleet[0].lon, fleet[0].lat) == (track.lon, track.lat)
+    # Track not in move
+    assert (fleet.lon[1], fleet.lat[1], fleet.updated_at[1]) == (lon, lat, updated_at)
+
+
+def test_fleet_state_view_type_5_cache_invalidated(dummy_ais_tracks_list_single):
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    view = fleet[0]
+    view.generate_nmea()
+    assert fleet[0]._type_5_msg is not None
+    fleet[0].lat = 10
+    assert fleet[0]._type_5_msg is not None
+    fleet[0].draught = 5
+    assert fleet[0]._type_5_msg is None
+
+
+def test_fleet_state_append_wrapped_seq_msg_id(dummy_ais_tracks_list_single):
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    for _ in range(10):
+        track.generate_nmea_type_5()
+    fleet = FleetState()
+    view = fleet.append(track=track)
+    assert view.generate_nmea_type_5()[0].startswith('!AIVDM,2,1,0,')
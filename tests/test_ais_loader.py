@@ -0,0 +1,113 @@
+import io
+import json
+
+import pytest
+
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState
+from ais.ais_loader import JSONArrayReader, TrackLoader, TrackLoadError
+
+
+@pytest.fixture
+def dummy_tracks(dummy_ais_tracks_list_single):
+    return [dict(dummy_ais_tracks_list_single[0], lon=float(index)) for index in range(5)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+def test_json_array_reader(chunk_size):
+    data = '{"clients": [1, {"a": "]"}],\n "tracks" : [ {"x": 1.25}, [2, 3] , "s,]", 12345, null ], "z": 0}'
+    reader = JSONArrayReader(file=io.StringIO(data), key='tracks', chunk_size=chunk_size)
+    assert list(reader) == [{'x': 1.25}, [2, 3], 's,]', 12345, None]
+
+
+@pytest.mark.parametrize('data', ['{"tracks": []}', '{"tracks":[]}'])
+def test_json_array_reader_empty(data):
+    assert list(JSONArrayReader(file=io.StringIO(data), key='tracks', chunk_size=3)) == []
+
+
+@pytest.mark.parametrize('data', ['{}', '{"clients": []}'])
+def test_json_array_reader_no_key(data):
+    with pytest.raises(KeyError):
+        list(JSONArrayReader(file=io.StringIO(data), key='tracks'))
+
+
+def test_json_array_reader_invalid_json():
+    data = '{\n  "tracks": [\n    {"x": 1},\n    {"x": 2,,}\n  ]\n}'
+    reader = JSONArrayReader(file=io.StringIO(data), key='tracks', chunk_size=4)
+    items = iter(reader)
+    assert next(items) == {'x': 1}
+    with pytest.raises(json.JSONDecodeError) as error:
+        next(items)
+    # Position in the whole file - as json.loads reports it
+    with pytest.raises(json.JSONDecodeError) as expected_error:
+        json.loads(data)
+    assert (error.value.lineno, error.value.colno, error.value.pos) == \
+           (expected_error.value.lineno, expected_error.value.colno, expected_error.value.pos)
+
+
+def test_json_array_reader_truncated_file():
+    reader = JSONArrayReader(file=io.StringIO('{"tracks": [{"x": 1}, {"x":'), key='tracks', chunk_size=8)
+    with pytest.raises(json.JSONDecodeError):
+        list(reader)
+
+
+def test_track_loader(tmp_path, dummy_tracks):
+    path = tmp_path / 'tracks.json'
+    path.write_text(json.dumps({'tracks': dummy_tracks}, indent=4))
+    loader = TrackLoader(filename=str(path), chunk_size=100)
+    assert loader.load() == range(0, 5)
+    assert loader.done
+    assert loader.errors == []
+    expected_fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_tracks))
+    assert [view.to_dict() for view in loader.fleet] == [view.to_dict() for view in expected_fleet]
+
+
+def test_track_loader_partial_loads(tmp_path, dummy_tracks):
+    path = tmp_path / 'tracks.json'
+    path.write_text(json.dumps({'tracks': dummy_tracks}))
+    loader = TrackLoader(filename=str(path), chunk_size=64)
+    assert loader.load(max_items=2) == range(0, 2)
+    assert not loader.done
+    assert loader.load(max_items=2) == range(2, 4)
+    assert loader.load() == range(4, 5)
+    assert loader.done
+    assert loader.load() == range(5, 5)
+    assert loader.fleet.lon.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_track_loader_invalid_items(tmp_path, dummy_tracks):
+    dummy_tracks[1]['mmsi'] = 123
+    dummy_tracks[3]['lon'] = 500
+    dummy_tracks[3]['ship_type'] = 1000
+    path = tmp_path / 'tracks.json'
+    path.write_text(json.dumps({'tracks': dummy_tracks}))
+    loader = TrackLoader(filename=str(path))
+    assert loader.load() == range(0, 3)
+    # All errors are reported, the loading is not stopped
+    assert [(error.item_no, error.field) for error in loader.errors] == [(2, 'mmsi'), (4, 'lon'), (4, 'ship_type')]
+    assert loader.invalid_count == 2
+    assert loader.items_count == 5
+    assert loader.fleet.lon.tolist() == [0, 2, 4]
+
+
+def test_track_loader_invalid_json(tmp_path, dummy_tracks):
+    path = tmp_path / 'tracks.json'
+    path.write_text(json.dumps({'tracks': dummy_tracks})[:-100])
+    loader = TrackLoader(filename=str(path))
+    with pytest.raises(json.JSONDecodeError):
+        loader.load()
+    assert loader.done
+    # Tracks loaded before the error are kept
+    assert len(loader.fleet) == 4
+
+
+def test_track_loader_missing_file(tmp_path):
+    loader = TrackLoader(filename=str(tmp_path / 'tracks.json'))
+    with pytest.raises(FileNotFoundError):
+        loader.load()
+    assert loader.done
+
+
+def test_track_load_error_str():
+    error = TrackLoadError(item_no=2, field='mmsi', msg='field required')
+    assert str(error) == 'check item with no 2, "mmsi" field required'
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState
+from ais.ais_motion import get_motion_model, MOTION_MODELS, GeodesicMotionModel, TangentPlaneMotionModel
+from ais.ais_utils import calculate_new_position
+
+
+def test_get_motion_model():
+    assert isinstance(get_motion_model(), GeodesicMotionModel)
+    assert isinstance(get_motion_model('tangent_plane'), TangentPlaneMotionModel)
+
+
+def test_get_motion_model_invalid():
+    with pytest.raises(ValueError):
+        get_motion_model('xxx')
+
+
+def test_motion_models_close_to_geodesic():
+    lons, lats = np.array([18.68, -70.0, 120.0]), np.array([55.3184, -40.0, 10.0])
+    courses, distances = np.array([300.0, 90.0, 0.0]), np.array([270.0, 500.0, 800.0])
+    lons_exact, lats_exact = get_motion_model('geodesic').advance(lons, lats, courses, distances)
+    for name in MOTION_MODELS:
+        lons_new, lats_new = get_motion_model(name).advance(lons, lats, courses, distances)
+        assert np.allclose(lons_new, lons_exact, atol=1e-5)
+        assert np.allclose(lats_new, lats_exact, atol=1e-5)
+
+
+def test_motion_models_wrap_longitude():
+    for name in MOTION_MODELS:
+        lon_new, lat_new = get_motion_model(name).advance(179.9999, 0.0, 90.0, 1000.0)
+        assert -180 <= lon_new < -179.99
+
+
+def test_motion_models_max_error():
+    assert get_motion_model('geodesic').max_error() == 0
+    for name in ['tangent_plane', 'rhumb_line']:
+        model = get_motion_model(name)
+        # Error should grow with the step length
+        assert 0 < model.max_error(step=1) < model.max_error(step=15) < 1
+
+
+def test_motion_models_polar_band():
+    lons, lats = np.array([0.0, 30.0, 60.0, 0.0]), np.array([90.0, 89.99, -89.999, 84.999])
+    courses, distances = np.array([0.0, 45.0, 180.0, 0.0]), np.full(4, 800.0)
+    lons_exact, lats_exact = get_motion_model('geodesic').advance(lons, lats, courses, distances)
+    for name in MOTION_MODELS:
+        lons_new, lats_new = get_motion_model(name).advance(lons, lats, courses, distances)
+        assert np.allclose(lons_new, lons_exact) and np.allclose(lats_new, lats_exact)
+        lon_new, lat_new = get_motion_model(name).advance(0.0, 90.0, 0.0, 800.0)
+        assert np.isfinite(lon_new) and lat_new < 90
+
+
+def test_motion_models_pass_pole():
+    for name in MOTION_MODELS:
+        model = get_motion_model(name)
+        lon, lat = 0.0, 84.0
+        for _ in range(70):
+            lon, lat = model.advance(lon, lat, 0.0, 10000.0)
+            assert np.isfinite(lon) and np.isfinite(lat) and lat < 90
+        # Northbound track passes the pole (is not stuck at 90)
+        assert lon == 180
+
+
+def test_motion_models_max_error_polar_band():
+    for name in ['tangent_plane', 'rhumb_line']:
+        model = get_motion_model(name)
+        assert model.max_error(lat_limit=89.99) < 1
+        assert model.max_error(lat_limit=90) < 1
+
+
+def test_fleet_state_update_positions_polar_band(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0].update(lat=89.999, course=0, speed=20)
+    for name in MOTION_MODELS:
+        fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+        fleet.update_positions(current_timestamp=fleet.updated_at[0] + 60, motion_model=get_motion_model(name))
+        assert round(fleet.lon[0], 6) == -175.592953 and 89.99 < fleet.lat[0] < 90
+        assert fleet[0].generate_nmea_type_1()
+
+
+def test_ais_track_update_position_motion_model(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0]['speed'] = 10
+    track = AISTrackList(tracks=dummy_ais_tracks_list_single).tracks[0]
+    lon, lat = track.lon, track.lat
+    track.update_position(current_timestamp=track._updated_at + 10, motion_model=get_motion_model('tangent_plane'))
+    lon_exact, lat_exact = calculate_new_position(lon_start=lon, lat_start=lat, course=track.course,
+                                                  distance=51.444)
+    assert round(track.lon, 6) == round(lon_exact, 6)
+    assert round(track.lat, 6) == round(lat_exact, 6)
+
+
+def test_fleet_state_update_positions_motion_model(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0]['speed'] = 10
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    exact = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    current_timestamp = fleet.updated_at[0] + 60
+    fleet.update_positions(current_timestamp=current_timestamp, motion_model=get_motion_model('rhumb_line'))
+    exact.update_positions(current_timestamp=current_timestamp)
+    assert np.allclose(fleet.lon, exact.lon, atol=1e-6)
+    assert np.allclose(fleet.lat, exact.lat, atol=1e-6)
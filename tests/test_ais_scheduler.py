@@ -0,0 +1,138 @@
+import pytest
+
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState
+from ais.ais_scheduler import ReportScheduler, TimingWheel, Ticker, SchedulerMetrics, MSG_TYPE_POSITION, \
+    MSG_TYPE_STATIC
+
+
+def test_report_scheduler_pop_due():
+    scheduler = ReportScheduler(start=0)
+    scheduler.schedule(due=20, track_index=1, msg_type=MSG_TYPE_POSITION)
+    scheduler.schedule(due=10, track_index=0, msg_type=MSG_TYPE_STATIC)
+    scheduler.schedule(due=30, track_index=2, msg_type=MSG_TYPE_POSITION)
+    assert len(scheduler) == 3
+    assert scheduler.pop_due(now=5) == []
+    assert sorted(scheduler.pop_due(now=20)) == [(10, 0, MSG_TYPE_STATIC), (20, 1, MSG_TYPE_POSITION)]
+    assert len(scheduler) == 1
+
+
+def test_report_scheduler_empty():
+    scheduler = ReportScheduler(start=0)
+    assert scheduler.pop_due(now=100) == []
+
+
+def test_report_scheduler_schedule_tracks(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single += [dict(dummy_ais_tracks_list_single[0]) for _ in range(3)]
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    scheduler = ReportScheduler(start=1000)
+    scheduler.schedule_tracks(fleet=fleet, start=1000)
+    assert len(scheduler) == 8
+    # Not moving track (undefined nav status) reports every 10 s - reports spread over the interval
+    position_reports = sorted(due for due, _, msg_type in scheduler.pop_due(now=2000) if msg_type == MSG_TYPE_POSITION)
+    assert position_reports == [1000, 1002.5, 1005, 1007.5]
+
+
+def test_report_scheduler_schedule_new_tracks(dummy_ais_tracks_list_single):
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single * 5))
+    scheduler = ReportScheduler(start=1000)
+    scheduler.schedule_new_tracks(fleet=fleet, start=1000, indices=range(0, 2))
+    scheduler.schedule_new_tracks(fleet=fleet, start=1000, indices=range(2, 5))
+    assert len(scheduler) == 10
+    # Tracks appended one by one (streaming load) - reports spread with the golden ratio sequence
+    position_reports = sorted(due for due, _, msg_type in scheduler.pop_due(now=2000) if msg_type == MSG_TYPE_POSITION)
+    assert position_reports == pytest.approx([1000, 1002.36, 1004.72, 1006.18, 1008.54], abs=0.01)
+
+
+def test_report_scheduler_reschedule(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0]['speed'] = 30
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    scheduler = ReportScheduler(start=0)
+    scheduler.reschedule(report=(100, 0, MSG_TYPE_POSITION), fleet=fleet)
+    scheduler.reschedule(report=(100, 0, MSG_TYPE_STATIC), fleet=fleet)
+    assert sorted(scheduler.pop_due(now=1000)) == [(102, 0, MSG_TYPE_POSITION), (460, 0, MSG_TYPE_STATIC)]
+
+
+def test_report_scheduler_reschedule_late_report(dummy_ais_tracks_list_single):
+    dummy_ais_tracks_list_single[0]['speed'] = 30
+    fleet = FleetState.from_track_list(AISTrackList(tracks=dummy_ais_tracks_list_single))
+    scheduler = ReportScheduler(start=100)
+    # Report due at 100 s fired at 107 s - missed 2 s intervals are skipped, the cadence is kept
+    assert scheduler.pop_due(now=107) == []
+    scheduler.reschedule(report=(100, 0, MSG_TYPE_POSITION), fleet=fleet)
+    assert scheduler.pop_due(now=110) == [(108, 0, MSG_TYPE_POSITION)]
+
+
+def test_report_scheduler_metrics():
+    scheduler = ReportScheduler(start=0, tick=0.5)
+    scheduler.schedule(due=10, track_index=0, msg_type=MSG_TYPE_POSITION)
+    scheduler.schedule(due=11.8, track_index=1, msg_type=MSG_TYPE_POSITION)
+    scheduler.pop_due(now=12)
+    metrics = scheduler.metrics.as_dict()
+    assert metrics['events'] == 2
+    assert metrics['missed_deadlines'] == 1
+    assert metrics['max_lag'] == 2
+    assert round(metrics['mean_lag'], 3) == 1.1
+
+
+def test_timing_wheel_overdue_item():
+    wheel = TimingWheel(tick=1, slots_count=8, start=100)
+    wheel.schedule(due=50, item='a')
+    assert wheel.advance(now=100) == []
+    assert wheel.advance(now=101) == [(50, 'a')]
+
+
+def test_timing_wheel_item_beyond_revolution():
+    wheel = TimingWheel(tick=1, slots_count=8, start=0)
+    wheel.schedule(due=3, item='a')
+    wheel.schedule(due=11, item='b')
+    # Both items are in the same slot
+    assert wheel.advance(now=3) == [(3, 'a')]
+    assert wheel.advance(now=10) == []
+    assert wheel.advance(now=11) == [(11, 'b')]
+    assert len(wheel) == 0
+
+
+def test_timing_wheel_stopped_for_many_revolutions():
+    wheel = TimingWheel(tick=1, slots_count=8, start=0)
+    for due in range(1, 40, 3):
+        wheel.schedule(due=due, item=due)
+    assert sorted(wheel.advance(now=30)) == [(due, due) for due in range(1, 31, 3)]
+    assert len(wheel) == 3
+
+
+def test_ticker_drift_correction():
+    clock = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    ticker = Ticker(tick=0.5, metrics=SchedulerMetrics(), clock=lambda: clock[0], sleep=sleep)
+    # Processing took 0.2 s - next tick is still at 1000.5 s
+    clock[0] += 0.2
+    assert ticker.wait() == 1000.5
+    assert round(sleeps[-1], 3) == 0.3
+    assert ticker.metrics.overruns == 0
+
+
+def test_ticker_overrun():
+    clock = [1000.0]
+    ticker = Ticker(tick=0.5, metrics=SchedulerMetrics(), clock=lambda: clock[0], sleep=lambda seconds: None)
+    # Processing took 1.7 s - missed ticks are skipped
+    clock[0] += 1.7
+    assert ticker.wait() == 1001.7
+    assert ticker.metrics.overruns == 1
+    assert ticker.tick_number == 3
+
+
+def test_scheduler_metrics_merge():
+    metrics = SchedulerMetrics()
+    metrics.add_event(lag=0.5, tick=0.5)
+    other = SchedulerMetrics()
+    other.ticks = 2
+    other.add_event(lag=1.5, tick=0.5)
+    metrics.merge(other=other)
+    assert metrics.as_dict() == {'ticks': 2, 'overruns': 0, 'events': 2, 'missed_deadlines': 1, 'max_lag': 1.5,
+                                 'total_lag': 2.0, 'mean_lag': 1.0}
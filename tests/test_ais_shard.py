@@ -0,0 +1,74 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_scheduler import ReportScheduler, MSG_TYPE_POSITION
+from ais.ais_shard import ShardedGenerator, SimulatedClock, get_shard_indices, generate_shard_msgs, pack_msgs
+from nmea.nmea_decoder import AIVDMDecoder
+
+
+def test_get_shard_indices(dummy_fleet):
+    dummy_fleet.mmsi[4] = dummy_fleet.mmsi[0]
+    shard_indices = get_shard_indices(fleet=dummy_fleet, shards_count=2)
+    assert [indices.tolist() for indices in shard_indices] == [[0, 2, 4], [1, 3]]
+
+
+@pytest.mark.parametrize('dummy_fleet', [20], indirect=True)
+def test_generate_shard_msgs_same_as_track_msgs(dummy_fleet):
+    fleet = dummy_fleet
+    expected_fleet = FleetState.from_columns(columns={name: getattr(fleet, name).copy() for name in FLEET_COLUMNS})
+    start = fleet.updated_at[0]
+    scheduler = ReportScheduler(start=start)
+    scheduler.schedule_tracks(fleet=fleet, start=start)
+    expected_scheduler = ReportScheduler(start=start)
+    expected_scheduler.schedule_tracks(fleet=expected_fleet, start=start)
+    for now in np.arange(start + 0.5, start + 400, 0.5):
+        nmea_msgs = generate_shard_msgs(fleet=fleet, scheduler=scheduler, now=now)
+        due_reports = expected_scheduler.pop_due(now=now)
+        position_indices = [index for _, index, msg_type in due_reports if msg_type == MSG_TYPE_POSITION]
+        expected_fleet.update_positions(current_timestamp=now, indices=position_indices)
+        expected_msgs = []
+        for report in due_reports:
+            _, index, msg_type = report
+            if msg_type == MSG_TYPE_POSITION:
+                expected_msgs += expected_fleet[index].generate_nmea_type_1(as_bytes=True)
+            else:
+                expected_msgs += expected_fleet[index].generate_nmea_type_5(as_bytes=True)
+            expected_scheduler.reschedule(report=report, fleet=expected_fleet)
+        assert sorted(b''.join(nmea_msgs).splitlines()) == sorted(b''.join(expected_msgs).splitlines())
+    assert np.array_equal(fleet.seq_msg_id, expected_fleet.seq_msg_id)
+
+
+def test_pack_msgs():
+    nmea_msgs = [b'a\nb\nc\nd\n', b'e1\ne2\n', b'f\n']
+    assert list(pack_msgs(nmea_msgs=nmea_msgs, max_size=6)) == [b'a\nb\nc\n', b'd\n', b'e1\ne2\n', b'f\n']
+    assert list(pack_msgs(nmea_msgs=nmea_msgs, max_size=100)) == [b''.join(nmea_msgs)]
+    assert list(pack_msgs(nmea_msgs=[], max_size=6)) == []
+
+
+@pytest.mark.parametrize('dummy_fleet', [10], indirect=True)
+def test_sharded_generator(dummy_fleet):
+    fleet = dummy_fleet
+    start = fleet.updated_at[0]
+    # Simulated 800 s - at least two static data reports (type 5 msgs) of each track
+    generator = ShardedGenerator(fleet=fleet, processes=2, clock=SimulatedClock(start=start), ticks_count=1600,
+                                 slots_count=4, slot_size=1024)
+    generator.start()
+    nmea_msgs = []
+    # Workers exit after the last tick (small results of the shards do not block them)
+    while generator.is_alive():
+        nmea_msgs += generator.get_msgs(timeout=0.01)
+    nmea_msgs += generator.get_msgs(timeout=0)
+    generator.collect()
+    assert len(nmea_msgs) == sum(stats.msgs for stats in generator.stats)
+    assert sum(stats.dropped for stats in generator.stats) == 0
+    assert [stats.tracks for stats in generator.stats] == [5, 5]
+    static_msgs = Counter(msg.fields()['mmsi'] for msg in AIVDMDecoder().decode(nmea_msgs) if msg.msg_type == 5)
+    # Sequential message IDs of all tracks are merged into the fleet state
+    assert fleet.seq_msg_id.tolist() == [static_msgs[mmsi] % 10 for mmsi in fleet.mmsi.tolist()]
+    assert min(static_msgs.values()) >= 2
+    # Positions of moving tracks are updated
+    assert (fleet.updated_at[1:] > start + 790).all()
+    assert generator.metrics.ticks == 2 * 1600
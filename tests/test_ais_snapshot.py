@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+import pytest
+
+from ais.ais_track import AISTrackList
+from ais.ais_fleet import FleetState, FLEET_COLUMNS
+from ais.ais_snapshot import save_snapshot, load_snapshot, is_snapshot, save_tracks_json, convert, \
+    SNAPSHOT_ALIGNMENT
+
+
+@pytest.mark.parametrize('mmap_mode', ['c', 'r', None])
+def test_snapshot_save_load(tmp_path, dummy_fleet, mmap_mode):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    fleet = load_snapshot(filename=path, mmap_mode=mmap_mode)
+    assert len(fleet) == 5
+    for name in FLEET_COLUMNS:
+        assert np.array_equal(getattr(fleet, name), getattr(dummy_fleet, name))
+    assert [view.to_dict() for view in fleet] == [view.to_dict() for view in dummy_fleet]
+    assert fleet[1].generate_nmea_type_1() == dummy_fleet[1].generate_nmea_type_1()
+
+
+def test_snapshot_read_only(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    fleet = load_snapshot(filename=path, mmap_mode='r')
+    with pytest.raises(ValueError):
+        fleet[0].lon = 1.5
+
+
+def test_snapshot_columns_aligned(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    fleet = load_snapshot(filename=path)
+    for name in FLEET_COLUMNS:
+        column = getattr(fleet, name)
+        assert column.flags.c_contiguous
+        assert type(column) is np.ndarray
+    offsets = [getattr(fleet, name).ctypes.data - fleet.mmsi.ctypes.data for name in FLEET_COLUMNS]
+    assert all(offset % SNAPSHOT_ALIGNMENT == 0 for offset in offsets)
+
+
+def test_snapshot_copy_on_write(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    fleet = load_snapshot(filename=path)
+    fleet[0].lon = 100.5
+    fleet.append(track=AISTrackList(tracks=[dummy_fleet[0].to_dict()]).tracks[0])
+    assert fleet.lon.tolist() == [100.5, 1, 2, 3, 4, 0]
+    # File is not changed
+    assert load_snapshot(filename=path).lon.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_snapshot_empty_fleet(tmp_path):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=FleetState(), filename=path)
+    fleet = load_snapshot(filename=path)
+    assert len(fleet) == 0
+    assert fleet.dimension.shape == (0, 4)
+
+
+def test_snapshot_replaced(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    save_snapshot(fleet=FleetState(), filename=path)
+    old_fleet = load_snapshot(filename=path)
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    assert len(load_snapshot(filename=path)) == 5
+    assert len(old_fleet) == 0
+    assert [file.name for file in tmp_path.iterdir()] == ['fleet.snap']
+
+
+def test_snapshot_invalid_file(tmp_path, dummy_fleet):
+    path = tmp_path / 'fleet.snap'
+    path.write_bytes(b'{"tracks": []}' * 10)
+    assert not is_snapshot(filename=path)
+    with pytest.raises(ValueError, match='Invalid snapshot'):
+        load_snapshot(filename=path)
+    save_snapshot(fleet=dummy_fleet, filename=path)
+    assert is_snapshot(filename=path)
+    path.write_bytes(path.read_bytes()[:-100])
+    with pytest.raises(ValueError, match='Truncated snapshot'):
+        load_snapshot(filename=path)
+
+
+def test_snapshot_json_conversion(tmp_path, dummy_fleet):
+    json_path = tmp_path / 'tracks.json'
+    snapshot_path = tmp_path / 'fleet.snap'
+    new_json_path = tmp_path / 'new-tracks.json'
+    save_tracks_json(fleet=dummy_fleet, filename=json_path)
+    convert(source=json_path, target=snapshot_path)
+    assert is_snapshot(filename=snapshot_path)
+    assert [view.to_dict() for view in load_snapshot(filename=snapshot_path)] == \
+           [view.to_dict() for view in dummy_fleet]
+    convert(source=snapshot_path, target=new_json_path)
+    assert json.loads(new_json_path.read_text()) == json.loads(json_path.read_text())
+    assert json.loads(json_path.read_text())['tracks'][1]['ship_name'] == 'SHIP 1'
@@ -1,7 +1,7 @@
 import pytest
 
-from ais.ais_track import AISTrackList, ShipEta
-from nmea.nmea_msg import AISMsgPayloadType1, AISMsgPayloadType5
+from ais.ais_track import AISTrackList, AISTrackMsgMixin, ShipEta
+from nmea.nmea_msg import AISMsgPayloadType1Lite, AISMsgPayloadType5Lite, NMEAMessage
 
 
 def test_ais_track_list_single(dummy_ais_tracks_list_single):
@@ -454,7 +454,7 @@ def test_ship_eta_attrs_default_values_incorrect():
 def test_generate_payload_type_1_type(dummy_ais_tracks_list_single):
     track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
     track = track_list.tracks[0]
-    assert isinstance(track.generate_payload_type_1(), AISMsgPayloadType1)
+    assert isinstance(track.generate_payload_type_1(), AISMsgPayloadType1Lite)
 
 
 def test_generate_payload_type_1_encode(dummy_ais_tracks_list_single):
@@ -466,7 +466,7 @@ def test_generate_payload_type_1_encode(dummy_ais_tracks_list_single):
 def test_generate_payload_type_5_type(dummy_ais_tracks_list_single):
     track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
     track = track_list.tracks[0]
-    assert isinstance(track.generate_payload_type_5(), AISMsgPayloadType5)
+    assert isinstance(track.generate_payload_type_5(), AISMsgPayloadType5Lite)
 
 
 def test_generate_payload_type_5_encode(dummy_ais_tracks_list_single):
@@ -482,5 +482,65 @@ def test_generate_nmea_list_of_str(dummy_ais_tracks_list_single):
         assert isinstance(msg, str)
 
 
+def test_generate_nmea_as_bytes(dummy_ais_tracks_list_single):
+    track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
+    track = track_list.tracks[0]
+    assert track.generate_nmea_type_1(as_bytes=True) == [b'!AIVDM,1,1,,A,133m@ogP00PD;88MD5MTDww@0D7k,0*44\r\n']
+    assert track.generate_nmea(as_bytes=True)[1:] == [
+        b'!AIVDM,2,1,0,A,533m@o`2;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp8,0*7C\r\n',
+        b'!AIVDM,2,2,0,A,88888888880,2*24\r\n'
+    ]
+
+
+def test_generate_nmea_type_5_cached(dummy_ais_tracks_list_single):
+    track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
+    track = track_list.tracks[0]
+    track.generate_nmea()
+    type_5_msg = track._type_5_msg
+    msgs = track.generate_nmea()
+    assert track._type_5_msg is type_5_msg
+    assert msgs[1:] == [
+        '!AIVDM,2,1,1,A,533m@o`2;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp8,0*7D\r\n',
+        '!AIVDM,2,2,1,A,88888888880,2*25\r\n'
+    ]
+
+
+def test_generate_nmea_type_5_cache_invalidated(dummy_ais_tracks_list_single):
+    track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
+    track = track_list.tracks[0]
+    track.generate_nmea()
+    track.lon = 10
+    assert track._type_5_msg is not None
+    track.destination = 'BORNHOLM'
+    assert track._type_5_msg is None
+    assert track.generate_nmea()[1:] == NMEAMessage(payload=track.generate_payload_type_5()).get_sentences(1)
+
+
+def test_generate_nmea_type_5_cache_invalidated_nested(dummy_ais_tracks_list_single):
+    track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
+    track = track_list.tracks[0]
+    track.generate_nmea_type_5()
+    type_5_msg = track._type_5_msg
+    track.generate_nmea_type_5()
+    assert track._type_5_msg is type_5_msg
+    # Nested models changed in place
+    track.dimension.to_bow = 5
+    assert track.generate_nmea_type_5() == NMEAMessage(payload=track.generate_payload_type_5()).get_sentences(2)
+    assert track._type_5_msg is not type_5_msg
+    track.eta.month = 1
+    assert track.generate_nmea_type_5() == NMEAMessage(payload=track.generate_payload_type_5()).get_sentences(3)
+
+
+def test_generate_nmea_type_1_and_type_5(dummy_ais_tracks_list_single):
+    track_list = AISTrackList(tracks=dummy_ais_tracks_list_single)
+    track = track_list.tracks[0]
+    assert track.generate_nmea_type_1() == ['!AIVDM,1,1,,A,133m@ogP00PD;88MD5MTDww@0D7k,0*44\r\n']
+    assert len(track.generate_nmea_type_5()) == 2
+
 
+def test_ais_track_msg_mixin_abstract():
+    class Track(AISTrackMsgMixin):
+        pass
 
+    with pytest.raises(TypeError):
+        Track()
@@ -1,16 +1,23 @@
 from datetime import datetime
 
+import numpy as np
 from pydantic import ValidationError
 import pytest
 
+from ais.constants import NavigationStatusEnum
 from ais.ais_utils import (
     get_first_3_digits,
     check_mmsi_mid_code,
     verify_imo, ShipDimension,
     calculate_distance,
+    calculate_distances,
     calculate_new_position,
+    advance_positions,
+    get_geod,
+    get_reporting_interval,
     Client,
-    Clients
+    Clients,
+    MulticastGroup
 )
 
 
@@ -171,7 +178,76 @@ def test_clients_multiple_max_invalid(dummy_client):
         Clients(clients=clients_list)
 
 
+def test_clients_max_clients_configurable(dummy_client):
+    clients_list = [dummy_client for _ in range(1000)]
+    clients_obj = Clients(max_clients=1000, clients=clients_list)
+    assert len(clients_obj.clients) == 1000
+    with pytest.raises(ValidationError):
+        Clients(max_clients=999, clients=clients_list)
+
+
+def test_client_rate_invalid():
+    with pytest.raises(ValidationError):
+        Client(host='192.168.1.1', port=1111, rate=0)
+
+
+def test_multicast_group():
+    group = MulticastGroup(group='239.192.0.1', port=1111, interface='127.0.0.1')
+    assert group.group == '239.192.0.1'
+    assert group.ttl == 1
+    assert group.loopback is True
+
+
+def test_multicast_group_invalid_group():
+    with pytest.raises(ValidationError):
+        MulticastGroup(group='192.168.1.1', port=1111)
+
+
+def test_clients_multicast_only():
+    clients_obj = Clients(multicast=[{'group': '239.192.0.1', 'port': 1111}])
+    assert clients_obj.clients == []
+    assert len(clients_obj.multicast) == 1
+
+
+def test_clients_no_destinations_invalid():
+    with pytest.raises(ValidationError):
+        Clients()
+
+
 def test_clients_multiple_min_invalid():
     clients_list = []
     with pytest.raises(ValidationError):
         Clients(clients=clients_list)
+
+
+def test_advance_positions():
+    lons = np.array([-71. - (7. / 60.), 10.])
+    lats = np.array([42. + (15. / 60.), 54.])
+    courses = np.array([-66.531, 90.])
+    distances = np.array([4164192.708, 1000.])
+    lons_new, lats_new = advance_positions(lons=lons, lats=lats, courses=courses, distances=distances)
+    assert round(lons_new[0], 3) == -123.685
+    assert round(lats_new[0], 3) == 45.516
+    assert (lons_new[1], lats_new[1]) == calculate_new_position(lon_start=10., lat_start=54., course=90.,
+                                                                 distance=1000.)
+
+
+def test_get_geod_cached():
+    assert get_geod() is get_geod()
+
+
+def test_calculate_distances():
+    current_timestamp = datetime.utcnow().timestamp()
+    last_timestamps = np.array([current_timestamp - 60, current_timestamp - 30])
+    distances = calculate_distances(last_timestamps=last_timestamps, current_timestamp=current_timestamp,
+                                    speeds=np.array([10, 0]))
+    assert distances.tolist() == [308.667, 0]
+
+
+def test_get_reporting_interval():
+    assert get_reporting_interval(speed=0, nav_status=NavigationStatusEnum.Moored) == 180
+    assert get_reporting_interval(speed=5, nav_status=NavigationStatusEnum.At_anchor) == 10
+    assert get_reporting_interval(speed=0, nav_status=NavigationStatusEnum.Under_way_using_engine) == 10
+    assert get_reporting_interval(speed=14, nav_status=NavigationStatusEnum.Under_way_using_engine) == 10
+    assert get_reporting_interval(speed=20, nav_status=NavigationStatusEnum.Under_way_sailing) == 6
+    assert get_reporting_interval(speed=35, nav_status=NavigationStatusEnum.Under_way_using_engine) == 2
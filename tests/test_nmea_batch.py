@@ -0,0 +1,47 @@
+import numpy as np
+
+from nmea.nmea_batch import encode_type1_batch
+from nmea.nmea_msg import NMEAMessage, AISMsgPayloadType1
+
+
+def test_encode_type1_batch_single(dummy_ais_msg_payload_type_1):
+    msg = dummy_ais_msg_payload_type_1
+    sentences = encode_type1_batch(mmsi=[msg.mmsi], lon=[msg.lon], lat=[msg.lat], speed=[msg.speed],
+                                   course=[msg.course], heading=[msg.true_heading], nav_status=[msg.nav_status],
+                                   timestamp=[msg.timestamp])
+    assert sentences == ['!AIVDM,1,1,,A,133m@ogP00PD;88MD5MTDww@0D7k,0*44\r\n']
+
+
+def test_encode_type1_batch_bytes(dummy_ais_msg_payload_type_1):
+    msg = dummy_ais_msg_payload_type_1
+    sentences = encode_type1_batch(mmsi=[msg.mmsi] * 2, lon=msg.lon, lat=msg.lat, speed=msg.speed,
+                                   course=msg.course, nav_status=msg.nav_status, timestamp=msg.timestamp,
+                                   as_bytes=True)
+    assert sentences == b'!AIVDM,1,1,,A,133m@ogP00PD;88MD5MTDww@0D7k,0*44\r\n' * 2
+
+
+def test_encode_type1_batch_same_as_nmea_msg():
+    rng = np.random.default_rng(seed=1)
+    rows = 500
+    columns = {
+        'mmsi': rng.integers(200000000, 400000000, rows),
+        'lon': rng.uniform(-180, 180, rows),
+        'lat': rng.uniform(-90, 90, rows),
+        'speed': rng.uniform(0, 102.2, rows).round(1),
+        'course': rng.uniform(0, 360, rows).round(1),
+        'true_heading': rng.integers(0, 360, rows),
+        'nav_status': rng.choice([0, 1, 5, 8, 15], rows),
+        'timestamp': rng.integers(0, 61, rows),
+    }
+    desired_sentences = []
+    for row in range(rows):
+        payload = AISMsgPayloadType1(**{name: column[row].item() for name, column in columns.items()})
+        desired_sentences += NMEAMessage(payload=payload).get_sentences()
+    sentences = encode_type1_batch(mmsi=columns['mmsi'], lon=columns['lon'], lat=columns['lat'],
+                                   speed=columns['speed'], course=columns['course'], heading=columns['true_heading'],
+                                   nav_status=columns['nav_status'], timestamp=columns['timestamp'])
+    assert sentences == desired_sentences
+
+
+def test_encode_type1_batch_empty():
+    assert encode_type1_batch(mmsi=[], lon=[], lat=[], speed=[], course=[]) == []
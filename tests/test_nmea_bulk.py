@@ -0,0 +1,66 @@
+import socket
+
+import pytest
+
+from nmea.nmea_bulk import MMsgSender, SocketSender, SendStats, get_bulk_sender, SENDMMSG_MAX_VLEN
+
+
+@pytest.fixture
+def udp_receivers():
+    receivers = []
+    for _ in range(2):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(2)
+        receivers.append(receiver)
+    yield receivers
+    for receiver in receivers:
+        receiver.close()
+
+
+def receive_all(receiver: socket.socket, count: int) -> list:
+    return [receiver.recv(2048) for _ in range(count)]
+
+
+def test_socket_sender(udp_receivers):
+    addresses = [receiver.getsockname() for receiver in udp_receivers]
+    datagrams = [b'first\r\n', b'second\r\n']
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        assert SocketSender().send(sock=sock, datagrams=datagrams, addresses=addresses) == (4, 4)
+    for receiver in udp_receivers:
+        assert receive_all(receiver=receiver, count=2) == datagrams
+
+
+def test_mmsg_sender(udp_receivers):
+    try:
+        sender = MMsgSender()
+    except OSError:
+        pytest.skip('sendmmsg is not available')
+    addresses = [receiver.getsockname() for receiver in udp_receivers]
+    datagrams = [f'!AIVDM,{number}\r\n'.encode() for number in range(SENDMMSG_MAX_VLEN + 10)]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sent_count, syscalls = sender.send(sock=sock, datagrams=datagrams, addresses=addresses)
+    assert sent_count == 2 * len(datagrams)
+    # Two sendmmsg calls per host
+    assert syscalls == 4
+    for receiver in udp_receivers:
+        assert receive_all(receiver=receiver, count=len(datagrams)) == datagrams
+
+
+def test_mmsg_sender_no_datagrams():
+    sender = get_bulk_sender()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        assert sender.send(sock=sock, datagrams=[], addresses=[('127.0.0.1', 1111)]) == (0, 0)
+
+
+def test_send_stats():
+    stats = SendStats()
+    assert stats.datagrams_per_second == 0
+    stats.add(syscalls=2, datagrams=2000, send_time=0.01)
+    stats.add(syscalls=4, datagrams=2000, send_time=0.01)
+    assert stats.syscalls_per_cycle == 3
+    assert round(stats.datagrams_per_second) == 200000
+    stats.dropped = 5
+    assert str(stats) == '4000 datagrams in 2 cycles, 3.0 syscalls per cycle, 200000 datagrams/s, ' \
+                         '5 datagrams dropped'
@@ -0,0 +1,201 @@
+import pytest
+
+from nmea.nmea_batch import encode_type1_batch
+from nmea.nmea_decoder import AIVDMDecoder, AISMessage, AISMessageBatch, parse_sentence, verify_checksum, \
+    decode_batch, VECTORIZED_MIN_LINES
+from nmea.nmea_msg import NMEAMessage, AISMsgPayloadType1, AISMsgPayloadType5
+
+
+TYPE_1_SENTENCE = b'!AIVDM,1,1,,A,133m@ogP00PD;88MD5MTDww@0D7k,0*44'
+
+
+def test_verify_checksum():
+    assert verify_checksum(TYPE_1_SENTENCE)
+    assert not verify_checksum(TYPE_1_SENTENCE[:-1] + b'5')
+    assert not verify_checksum(TYPE_1_SENTENCE[:-3])
+    assert not verify_checksum(TYPE_1_SENTENCE[:-2] + b'XX')
+
+
+def test_parse_sentence():
+    sentence = parse_sentence(b'!AIVDM,2,2,1,A,88888888880,2*25')
+    assert sentence.count == 2
+    assert sentence.number == 2
+    assert sentence.seq_msg_id == b'1'
+    assert sentence.channel == b'A'
+    assert sentence.payload == b'88888888880'
+    assert sentence.fill_bits == 2
+
+
+@pytest.mark.parametrize('sentence', [b'!AIVDM,1,1,,A,1*00', b'$GPGGA,1,1,,A,1,0*00', b'!AIVDM,1,2,,A,1,7*00'])
+def test_parse_sentence_invalid(sentence):
+    with pytest.raises(ValueError):
+        parse_sentence(sentence)
+
+
+def test_decoder_type_1(dummy_ais_msg_payload_type_1):
+    decoder = AIVDMDecoder()
+    msgs = decoder.decode(NMEAMessage(payload=dummy_ais_msg_payload_type_1).get_sentences())
+    assert msgs == [AISMessage(1, b'A', b'133m@ogP00PD;88MD5MTDww@0D7k', 0)]
+    fields = msgs[0].fields()
+    assert fields['mmsi'] == 205344990
+    assert fields['nav_status'] == 15
+    assert fields['course'] == 110.7
+    assert fields['lon'] == pytest.approx(4.407046666667)
+    assert fields['lat'] == pytest.approx(51.229636666667)
+    assert fields['timestamp'] == 40
+    payload = msgs[0].to_payload()
+    assert isinstance(payload, AISMsgPayloadType1)
+    assert payload.mmsi == 205344990
+
+
+def test_decoder_type_5_reassembly(dummy_ais_msg_payload_type_5):
+    decoder = AIVDMDecoder()
+    sentences = NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(seq_msg_id=3)
+    assert decoder.decode(sentences[:1]) == []
+    assert decoder.pending_count == 1
+    msgs = decoder.decode(sentences[1:])
+    assert decoder.pending_count == 0
+    assert len(msgs) == 1
+    assert msgs[0].msg_type == 5
+    assert msgs[0].fill_bits == 2
+    payload = msgs[0].to_payload()
+    assert isinstance(payload, AISMsgPayloadType5)
+    assert payload.encode() == dummy_ais_msg_payload_type_5.encode()
+    assert payload.dimension == dummy_ais_msg_payload_type_5.dimension
+    assert payload.eta == dummy_ais_msg_payload_type_5.eta
+
+
+def test_decoder_fragments_out_of_order(dummy_ais_msg_payload_type_5):
+    decoder = AIVDMDecoder()
+    sentences = NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(seq_msg_id=3)
+    msgs = decoder.decode(sentences[::-1])
+    assert len(msgs) == 1
+    assert msgs[0].fill_bits == 2
+    assert msgs[0].fields()['ship_name'] == dummy_ais_msg_payload_type_5.ship_name
+
+
+def test_decoder_pending_fragments_bounded(dummy_ais_msg_payload_type_5):
+    decoder = AIVDMDecoder(max_pending=2)
+    nmea_msg = NMEAMessage(payload=dummy_ais_msg_payload_type_5)
+    for seq_msg_id in range(5):
+        decoder.decode(nmea_msg.get_sentences(seq_msg_id=seq_msg_id)[:1])
+    assert decoder.pending_count == 2
+    assert decoder.stats.dropped_fragments == 3
+    # Only fragments of the two latest msgs are kept
+    assert len(decoder.decode(nmea_msg.get_sentences(seq_msg_id=4)[1:])) == 1
+    assert decoder.decode(nmea_msg.get_sentences(seq_msg_id=0)[1:]) == []
+
+
+def test_decoder_checksum_error():
+    decoder = AIVDMDecoder()
+    assert decoder.decode([TYPE_1_SENTENCE[:-1] + b'5', TYPE_1_SENTENCE]) != []
+    assert decoder.stats.sentences == 2
+    assert decoder.stats.checksum_errors == 1
+    assert decoder.stats.msgs == 1
+
+
+@pytest.mark.parametrize('line_ending', [b'\r\n', b'\n', b'\r'])
+def test_decoder_feed_stream(dummy_ais_msg_payload_type_5, line_ending):
+    type_1_sentences = encode_type1_batch(mmsi=range(205344990, 205344990 + 3 * VECTORIZED_MIN_LINES), lon=4.4,
+                                          lat=51.2, speed=10.5, course=110.7, as_bytes=True).splitlines()
+    type_5_sentences = NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(seq_msg_id=1, as_bytes=True)
+    # Invalid sentences and a multi-sentence msg mixed with single-sentence msgs
+    lines = type_1_sentences[:5] + [type_5_sentences[0].rstrip(), b'', TYPE_1_SENTENCE[:-1] + b'5', b'!AIVDM,x*00'] \
+        + type_1_sentences[5:] + [type_5_sentences[1].rstrip()]
+    data = line_ending.join(lines) + line_ending
+    for chunk_size in [7, 100, len(data)]:
+        decoder = AIVDMDecoder()
+        msgs = []
+        for start in range(0, len(data), chunk_size):
+            msgs += decoder.feed(data[start:start + chunk_size])
+        assert [msg.msg_type for msg in msgs] == [1] * len(type_1_sentences) + [5]
+        assert [msg.fields()['mmsi'] for msg in msgs[:-1]] == list(range(205344990, 205344990 + len(msgs) - 1))
+        assert decoder.stats.sentences == len(lines) - 1
+        assert decoder.stats.checksum_errors == 2
+        assert decoder.stats.msgs == len(msgs)
+
+
+def test_decoder_feed_pending_fragment_with_pair(dummy_ais_msg_payload_type_5):
+    type_1_sentences = encode_type1_batch(mmsi=range(205344990, 205344990 + VECTORIZED_MIN_LINES), lon=4.4, lat=51.2,
+                                          speed=10.5, course=110.7, as_bytes=True).splitlines(keepends=True)
+    first, second = NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(seq_msg_id=1, as_bytes=True)
+    decoder = AIVDMDecoder()
+    # Pending second fragment completes the msg with the first fragment of the next pair (like line by line decoding)
+    assert decoder.decode([second]) == []
+    msgs = decoder.feed(b''.join(type_1_sentences + [first, second]))
+    assert [msg.msg_type for msg in msgs] == [1] * VECTORIZED_MIN_LINES + [5]
+    assert decoder.pending_count == 1
+    msgs = decoder.feed(b''.join([first] + type_1_sentences + [first, second]))
+    assert [msg.msg_type for msg in msgs] == [5] + [1] * VECTORIZED_MIN_LINES + [5]
+    assert decoder.pending_count == 0
+    assert decoder.stats.dropped_fragments == 0
+
+
+def test_decoder_feed_batch(dummy_ais_msg_payload_type_5):
+    data = encode_type1_batch(mmsi=range(205344990, 205344990 + VECTORIZED_MIN_LINES), lon=4.4, lat=51.2, speed=10.5,
+                              course=110.7, as_bytes=True)
+    data += b''.join(NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(seq_msg_id=1, as_bytes=True))
+    decoder = AIVDMDecoder()
+    batches = [decoder.feed(data), decoder.feed(data)]
+    assert isinstance(batches[0], AISMessageBatch)
+    assert len(batches[0]) == VECTORIZED_MIN_LINES + 1
+    assert batches[0][0] == AISMessage(1, b'A', batches[0].payloads[0], 0)
+    assert batches[0][-1].msg_type == 5
+    assert list(batches[0][1:3]) == list(batches[0])[1:3]
+    msgs = AISMessageBatch.join(batches)
+    assert len(msgs) == 2 * (VECTORIZED_MIN_LINES + 1)
+    assert msgs == list(batches[0]) + list(batches[1])
+    assert AISMessageBatch.from_msgs(list(msgs)) == msgs
+    assert decode_batch(msgs=msgs, msg_type=1)['mmsi'].tolist() == 2 * list(range(205344990, 205344990 +
+                                                                                 VECTORIZED_MIN_LINES))
+    assert len(decode_batch(msgs=msgs, msg_type=5)['mmsi']) == 2
+
+
+def test_decoder_feed_partial_line():
+    decoder = AIVDMDecoder()
+    assert decoder.feed(TYPE_1_SENTENCE[:10]) == []
+    assert len(decoder.feed(TYPE_1_SENTENCE[10:] + b'\r\n')) == 1
+
+
+def test_decoder_feed_cr_line_endings():
+    decoder = AIVDMDecoder()
+    msgs = [msg for _ in range(1000) for msg in decoder.feed(TYPE_1_SENTENCE + b'\r')]
+    assert len(msgs) == 1000
+    # LF of CRLF line ending split between the feeds is not an empty line
+    assert len(decoder.feed(TYPE_1_SENTENCE + b'\r')) == 1
+    assert len(decoder.feed(b'\n' + TYPE_1_SENTENCE + b'\r\n')) == 1
+    assert decoder.stats.sentences == 1002
+    assert decoder.stats.invalid_sentences == 0
+
+
+def test_decoder_feed_too_long_line():
+    decoder = AIVDMDecoder()
+    for _ in range(1000):
+        assert decoder.feed(b'x' * 1024) == []
+    # The rest of the too long line is dropped up to the line ending
+    assert len(decoder.feed(b'x' * 10 + b'\r\n' + TYPE_1_SENTENCE + b'\r\n')) == 1
+    assert decoder.stats.invalid_sentences == 1
+    assert decoder.stats.sentences == 1
+
+
+def test_decode_batch():
+    data = encode_type1_batch(mmsi=[205344990, 205344991], lon=[4.4, -4.4], lat=[51.2, -51.2], speed=[10.5, 0],
+                              course=[110.7, 0], heading=[100, 511], as_bytes=True)
+    msgs = AIVDMDecoder().feed(data)
+    columns = decode_batch(msgs=msgs, msg_type=1)
+    assert columns['mmsi'].tolist() == [205344990, 205344991]
+    assert columns['lon'].tolist() == pytest.approx([4.4, -4.4])
+    assert columns['lat'].tolist() == pytest.approx([51.2, -51.2])
+    assert columns['speed'].tolist() == pytest.approx([10.5, 0])
+    assert columns['true_heading'].tolist() == [100, 511]
+    for msg, mmsi in zip(msgs, columns['mmsi'].tolist()):
+        assert msg.fields()['mmsi'] == mmsi
+
+
+def test_decode_batch_type_5(dummy_ais_msg_payload_type_5):
+    decoder = AIVDMDecoder()
+    msgs = decoder.decode(NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences() * 2)
+    columns = decode_batch(msgs=msgs, msg_type=5)
+    assert columns['ship_name'].tolist() == [dummy_ais_msg_payload_type_5.ship_name.encode()] * 2
+    assert columns['dimension.to_bow'].tolist() == [dummy_ais_msg_payload_type_5.dimension.to_bow] * 2
+    assert columns['draught'].tolist() == pytest.approx([dummy_ais_msg_payload_type_5.draught] * 2)
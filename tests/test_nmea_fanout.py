@@ -0,0 +1,109 @@
+import socket
+
+import pytest
+
+from ais.ais_utils import Clients
+from nmea.nmea_fanout import CycleBuffer, Destination, FanOutEngine, FANOUT_CHUNK_SIZE
+from nmea.nmea_stream import NoPacer, TokenBucketPacer
+
+
+class FakeSocket:
+    def __init__(self, error: Exception = None) -> None:
+        self.sent = []
+        self.error = error
+
+    def sendto(self, data, address) -> int:
+        if self.error:
+            raise self.error
+        self.sent.append(bytes(data))
+        return len(data)
+
+
+@pytest.fixture
+def udp_receivers():
+    receivers = []
+    for _ in range(3):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(2)
+        receivers.append(receiver)
+    yield receivers
+    for receiver in receivers:
+        receiver.close()
+
+
+def test_cycle_buffer():
+    buffer = CycleBuffer(datagrams=[b'first\r\n', b'second\r\n'])
+    assert len(buffer) == 2
+    assert buffer.datagram(1) == b'second\r\n'
+
+
+def test_destination_service_chunks():
+    destination = Destination(address=('127.0.0.1', 1111), pacer=NoPacer())
+    destination.push(buffer=CycleBuffer(datagrams=[b'x'] * (FANOUT_CHUNK_SIZE + 1)), max_pending=2)
+    sock = FakeSocket()
+    assert destination.service(sock=sock, now=0) == 0
+    assert len(sock.sent) == FANOUT_CHUNK_SIZE
+    assert destination.service(sock=sock, now=0) is None
+    assert destination.sent == FANOUT_CHUNK_SIZE + 1
+
+
+def test_destination_pacing():
+    clock = [0.0]
+    destination = Destination(address=('127.0.0.1', 1111),
+                              pacer=TokenBucketPacer(rate=10, burst=2, clock=lambda: clock[0]))
+    destination.push(buffer=CycleBuffer(datagrams=[b'1', b'2', b'3']), max_pending=2)
+    sock = FakeSocket()
+    assert destination.service(sock=sock, now=0) == 0.1
+    assert sock.sent == [b'1', b'2']
+    clock[0] = 0.1
+    assert destination.service(sock=sock, now=0.1) is None
+    assert sock.sent == [b'1', b'2', b'3']
+
+
+def test_destination_backpressure():
+    destination = Destination(address=('127.0.0.1', 1111), pacer=NoPacer())
+    for datagram in [b'1', b'2', b'3']:
+        destination.push(buffer=CycleBuffer(datagrams=[datagram]), max_pending=2)
+    assert destination.dropped == 1
+    # Send buffer full - datagram is sent later
+    assert destination.service(sock=FakeSocket(error=BlockingIOError()), now=0) > 0
+    sock = FakeSocket()
+    destination.service(sock=sock, now=1)
+    assert sock.sent == [b'2', b'3']
+
+
+def test_fanout_engine(udp_receivers):
+    clients = Clients(clients=[{'host': host, 'port': port}
+                               for host, port in (receiver.getsockname() for receiver in udp_receivers)])
+    engine = FanOutEngine(clients=clients, workers=2)
+    assert len(engine.workers) == 2
+    engine.run(data=['first\r\n', 'second\r\n'])
+    for receiver in udp_receivers:
+        assert [receiver.recv(1024) for _ in range(2)] == [b'first\r\n', b'second\r\n']
+    engine.close()
+    assert engine.stats.sent == 6
+    assert str(engine.stats) == '6 datagrams sent to 3 clients, 0 cycles dropped (slow clients), 0 send errors'
+
+
+def test_fanout_engine_block(udp_receivers):
+    clients = Clients(clients=[{'host': host, 'port': port}
+                               for host, port in (receiver.getsockname() for receiver in udp_receivers)])
+    engine = FanOutEngine(clients=clients, pacing='fixed', pacing_rate=200, max_pending=1)
+    # Producer waits for the paced clients - no cycle is dropped
+    for number in range(5):
+        engine.run(data=[f'{number}\r\n'], block=True)
+    engine.flush()
+    assert all(not destination.pending for destination in engine.destinations)
+    for receiver in udp_receivers:
+        assert [receiver.recv(1024) for _ in range(5)] == [f'{number}\r\n'.encode() for number in range(5)]
+    engine.close()
+    assert (engine.stats.sent, engine.stats.dropped) == (15, 0)
+
+
+def test_fanout_engine_client_rate(dummy_client):
+    clients = Clients(clients=[dummy_client, dict(dummy_client, rate=5)])
+    engine = FanOutEngine(clients=clients, pacing='fixed', pacing_rate=50)
+    assert engine.destinations[0].pacer.interval == 0.02
+    assert engine.destinations[1].pacer.rate == 5
+    engine.close()
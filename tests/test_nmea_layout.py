@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from nmea.nmea_layout import PayloadLayout, TYPE_1_LAYOUT, TYPE_5_LAYOUT
+
+
+def test_payload_layout_bits_count():
+    assert TYPE_1_LAYOUT.bits_count == 168
+    assert TYPE_5_LAYOUT.bits_count == 424
+
+
+def test_payload_layout_fields_offsets():
+    field = TYPE_1_LAYOUT.fields[-1]
+    assert field.name == 'radio_status'
+    assert field.offset + field.width == 168
+    offsets = {field.name: (field.offset, field.width) for field in TYPE_1_LAYOUT.fields}
+    assert offsets['mmsi'] == (8, 30)
+    assert offsets['lon'] == (61, 28)
+    assert offsets['lat'] == (89, 27)
+    offsets = {field.name: (field.offset, field.width) for field in TYPE_5_LAYOUT.fields}
+    assert offsets['dimension.to_bow'] == (240, 9)
+    assert offsets['eta.minute'] == (288, 6)
+
+
+def test_payload_layout_constants():
+    layout = PayloadLayout(spec=[('msg_type', 1, False, False), ('mmsi', 1, False, False)], consts={'msg_type': 1})
+    assert layout.bits_count == 36
+    assert layout.const_value == 1 << 30
+    assert layout.constants_bits == {'msg_type': '000001'}
+
+
+def test_payload_layout_encode_type_1(dummy_ais_msg_payload_type_1):
+    payload = dummy_ais_msg_payload_type_1
+    bits = ''.join(payload._constants_bits.get(field.name) or payload._fields_to_bits()[field.name]
+                   for field in TYPE_1_LAYOUT.fields)
+    assert format(TYPE_1_LAYOUT.encode(payload), '0168b') == bits
+
+
+def test_payload_layout_encode_type_5(dummy_ais_msg_payload_type_5):
+    payload = dummy_ais_msg_payload_type_5
+    bits = payload._fields_to_bits()
+    payload_bits = format(TYPE_5_LAYOUT.encode(payload), '0424b')
+    assert payload_bits[40:70] == bits['imo']
+    assert payload_bits[240:270] == bits['dimension']
+    assert payload_bits[274:294] == bits['eta']
+    assert payload_bits[302:422] == bits['destination']
+
+
+def test_payload_layout_decode_type_1(dummy_ais_msg_payload_type_1):
+    fields = TYPE_1_LAYOUT.decode(value=TYPE_1_LAYOUT.encode(dummy_ais_msg_payload_type_1))
+    assert fields['msg_type'] == 1
+    assert fields['mmsi'] == dummy_ais_msg_payload_type_1.mmsi
+    assert fields['lon'] == pytest.approx(dummy_ais_msg_payload_type_1.lon)
+    assert fields['radio_status'] == 82419
+
+
+def test_payload_layout_decode_signed():
+    layout = PayloadLayout(spec=[('lon', 600000, True, False)], consts={})
+    assert layout.decode(value=layout.encode(SimpleNamespace(lon=-4.5))) == {'lon': -4.5}
+
+
+def test_payload_layout_decode_type_5(dummy_ais_msg_payload_type_5):
+    fields = TYPE_5_LAYOUT.decode(value=TYPE_5_LAYOUT.encode(dummy_ais_msg_payload_type_5))
+    assert fields['ship_name'] == dummy_ais_msg_payload_type_5.ship_name
+    assert fields['dimension'] == dummy_ais_msg_payload_type_5.dimension.dict()
+    assert fields['eta'] == dummy_ais_msg_payload_type_5.eta.dict()
+
+
+def test_payload_layout_decode_batch_invalid_length():
+    with pytest.raises(ValueError):
+        TYPE_1_LAYOUT.decode_batch(payloads=[b'133m@ogP00PD'])
+    with pytest.raises(ValueError):
+        TYPE_1_LAYOUT.decode_batch(payloads=[b'133m@ogP00PD;88MD5MTDxx@0D7k'])
@@ -1,6 +1,6 @@
 import pytest
 
-from nmea.nmea_msg import NMEAMessage
+from nmea.nmea_msg import NMEAMessage, AISMsgPayloadType1Lite, AISMsgPayloadType5Lite
 from nmea.nmea_utils import convert_ais_payload_to_bits
 
 
@@ -13,6 +13,16 @@ def test_nmea_msg_multi_sentence(dummy_ais_msg_payload_type_5):
     assert nmea_msg.get_sentences() == test_sentences
 
 
+def test_nmea_msg_multi_sentence_seq_msg_id(dummy_ais_msg_payload_type_5):
+    nmea_msg = NMEAMessage(payload=dummy_ais_msg_payload_type_5)
+    nmea_msg.get_sentences()
+    test_sentences = [
+        '!AIVDM,2,1,7,A,533m@o`2;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp8,0*7B\r\n',
+        '!AIVDM,2,2,7,A,88888888880,2*23\r\n'
+    ]
+    assert nmea_msg.get_sentences(seq_msg_id=7) == test_sentences
+
+
 def test_nmea_msg_single_sentence(dummy_ais_msg_payload_type_1):
     nmea_msg = NMEAMessage(payload=dummy_ais_msg_payload_type_1)
     test_sentences = [
@@ -170,6 +180,12 @@ def test_ais_msg_payload_type_5_after_encode_fill_bits(dummy_ais_msg_payload_typ
     assert msg_payload.fill_bits == 2
 
 
+def test_ais_msg_payload_type_5_encode_twice_fill_bits(dummy_ais_msg_payload_type_5):
+    msg_payload = dummy_ais_msg_payload_type_5
+    assert msg_payload.encode() == msg_payload.encode()
+    assert msg_payload.fill_bits == 2
+
+
 def test_ais_msg_payload_type_5_after_encode_payload_chars_length(dummy_ais_msg_payload_type_5):
     msg_payload = dummy_ais_msg_payload_type_5
     ais_payload = msg_payload.encode()
@@ -276,3 +292,30 @@ def test_ais_msg_payload_type_5_destination(dummy_ais_msg_payload_type_5):
     assert msg_payload.destination == 'NEW YORK'
     assert len(msg_payload._fields_to_bits()['destination']) == 120
     assert msg_payload._fields_to_bits()['destination'] == desired_output
+
+
+def test_ais_msg_payload_type_1_lite_encode(dummy_ais_msg_payload_type_1):
+    msg_payload = AISMsgPayloadType1Lite(**dummy_ais_msg_payload_type_1.dict(exclude={'fill_bits'}))
+    assert str(msg_payload) == '133m@ogP00PD;88MD5MTDww@0D7k'
+    assert msg_payload.payload_bits == dummy_ais_msg_payload_type_1.payload_bits
+
+
+def test_ais_msg_payload_type_5_lite_encode(dummy_ais_msg_payload_type_5):
+    msg_payload = AISMsgPayloadType5Lite(**{name: value for name, value in dummy_ais_msg_payload_type_5 if name != 'fill_bits'})
+    assert msg_payload.fill_bits == 0
+    assert str(msg_payload) == '533m@o`2;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp888888888880'
+    assert msg_payload.fill_bits == 2
+    assert NMEAMessage(payload=msg_payload).get_sentences() == \
+        NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences()
+
+
+def test_ais_msg_payload_lite_slots(dummy_ais_msg_payload_type_1):
+    msg_payload = AISMsgPayloadType1Lite(**dummy_ais_msg_payload_type_1.dict(exclude={'fill_bits'}))
+    assert not hasattr(msg_payload, '__dict__')
+
+
+def test_nmea_msg_get_sentences_as_bytes(dummy_ais_msg_payload_type_5):
+    nmea_msg = NMEAMessage(payload=dummy_ais_msg_payload_type_5)
+    sentences = nmea_msg.get_sentences(seq_msg_id=3, as_bytes=True)
+    assert sentences == [sentence.encode() for sentence in nmea_msg.get_sentences(seq_msg_id=3)]
+    assert sentences[1] == b'!AIVDM,2,2,3,A,88888888880,2*27\r\n'
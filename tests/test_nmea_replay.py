@@ -0,0 +1,94 @@
+import pytest
+
+from nmea.nmea_msg import NMEAMessage
+from nmea.nmea_replay import NMEALog, LogReplay, parse_log_line
+
+
+TYPE_1_SENTENCE = b'!AIVDM,1,1,,A,133m@ogP00PD;88MD5MTDww@0D7k,0*44'
+
+
+@pytest.fixture
+def dummy_log_path(tmp_path, dummy_ais_msg_payload_type_5):
+    type_5_sentences = NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(as_bytes=True)
+    lines = [
+        b'# AIS log\n',
+        b'\\s:station,c:1577836800*00\\' + TYPE_1_SENTENCE + b'\r\n',
+        b'1577836800.5 ' + type_5_sentences[0],
+        type_5_sentences[1],
+        TYPE_1_SENTENCE + b',1577836803000\n',
+        b'1577836803 ' + TYPE_1_SENTENCE + b'\n',
+        b'1577836810 ' + TYPE_1_SENTENCE,
+    ]
+    path = tmp_path / 'ais.log'
+    path.write_bytes(b''.join(lines))
+    return path
+
+
+def test_parse_log_line():
+    assert parse_log_line(line=TYPE_1_SENTENCE + b'\r\n') == (None, TYPE_1_SENTENCE)
+    assert parse_log_line(line=b'\\c:1577836800,s:station*00\\' + TYPE_1_SENTENCE) == (1577836800, TYPE_1_SENTENCE)
+    assert parse_log_line(line=b'1577836800.25\t' + TYPE_1_SENTENCE) == (1577836800.25, TYPE_1_SENTENCE)
+    assert parse_log_line(line=TYPE_1_SENTENCE + b',1577836800250\n') == (1577836800.25, TYPE_1_SENTENCE)
+    assert parse_log_line(line=b'# comment\n') == (None, None)
+
+
+def test_nmea_log_read_batches(dummy_log_path, dummy_ais_msg_payload_type_5):
+    type_5_sentences = NMEAMessage(payload=dummy_ais_msg_payload_type_5).get_sentences(as_bytes=True)
+    with NMEALog(filename=dummy_log_path, chunk_size=64) as log:
+        assert (log.lines_count, log.sentences_count) == (7, 6)
+        assert log.duration == 10
+        batches = list(log.read_batches())
+        # Sentences received within the batch interval are batched
+        assert [(timestamp, len(batch)) for timestamp, batch in log.read_batches(batch_interval=1)] == \
+               [(1577836800, 3), (1577836803, 2), (1577836810, 1)]
+        assert [len(batch) for _, batch in log.read_batches(batch_interval=100, batch_size=4)] == [4, 2]
+    # Sentences are sent in the same format as the generated ones
+    assert batches == [
+        (1577836800, [TYPE_1_SENTENCE + b'\r\n']),
+        (1577836800.5, type_5_sentences),
+        (1577836803, [TYPE_1_SENTENCE + b'\r\n'] * 2),
+        (1577836810, [TYPE_1_SENTENCE + b'\r\n']),
+    ]
+
+
+def test_nmea_log_seek(dummy_log_path):
+    with NMEALog(filename=dummy_log_path) as log:
+        assert log.index_times.tolist() == [1577836800, 1577836803, 1577836810]
+        assert log.find_offset(time_offset=5) == log.index_offsets[1]
+        assert [(timestamp, len(batch)) for timestamp, batch in log.read_batches(time_offset=0.5)] == \
+               [(1577836800.5, 2), (1577836803, 2), (1577836810, 1)]
+        assert [timestamp for timestamp, _ in log.read_batches(time_offset=5)] == [1577836810]
+        assert list(log.read_batches(time_offset=20)) == []
+
+
+def test_nmea_log_empty(tmp_path):
+    path = tmp_path / 'empty.log'
+    path.write_bytes(b'')
+    with NMEALog(filename=path) as log:
+        assert log.duration == 0
+        assert list(log.read_batches(time_offset=10)) == []
+
+
+def test_log_replay_timing(dummy_log_path):
+    clock = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    with NMEALog(filename=dummy_log_path) as log:
+        replay = LogReplay(log=log, speed=2, clock=lambda: clock[0], sleep=sleep)
+        batches = list(replay.replay())
+    assert len(batches) == 4
+    # Original timing scaled by the speed factor
+    assert sleeps == [0.25, 1.25, 3.5]
+    assert replay.stats.sentences == 6
+
+
+def test_log_replay_max_speed(dummy_log_path):
+    with NMEALog(filename=dummy_log_path) as log:
+        replay = LogReplay(log=log, speed=0, sleep=pytest.fail)
+        assert sum(len(batch) for batch in replay.replay(time_offset=3)) == 3
+    with pytest.raises(ValueError):
+        LogReplay(log=log, speed=-1)
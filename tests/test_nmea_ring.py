@@ -0,0 +1,31 @@
+import pytest
+
+from nmea.nmea_ring import SharedRingBuffer
+
+
+def test_shared_ring_buffer():
+    ring = SharedRingBuffer(slots_count=2, slot_size=64)
+    try:
+        assert ring.get() is None
+        assert ring.put(data=b'first')
+        assert ring.put(data=b'second')
+        # All slots are used
+        assert not ring.put(data=b'third', timeout=0)
+        assert ring.get() == b'first'
+        assert ring.put(data=b'third', timeout=0)
+        assert ring.get() == b'second'
+        assert ring.get() == b'third'
+        assert ring.get() is None
+    finally:
+        ring.unlink()
+
+
+def test_shared_ring_buffer_data_too_large():
+    ring = SharedRingBuffer(slots_count=2, slot_size=64)
+    try:
+        assert ring.max_size == 60
+        assert ring.put(data=b'x' * 60)
+        with pytest.raises(ValueError):
+            ring.put(data=b'x' * 61)
+    finally:
+        ring.unlink()
@@ -0,0 +1,297 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from ais.ais_utils import Clients, MulticastGroup
+from ais.ais_track import AISTrack
+from nmea.nmea_stream import UDPStream, AsyncUDPStream, FixedIntervalPacer, TokenBucketPacer, NoPacer, Pacer, \
+    get_pacer, encode_nmea_msgs, group_nmea_sentences, pack_datagrams, create_multicast_socket, MAX_DATAGRAM_SIZE
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0) -> None:
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class BlockingPacer(Pacer):
+    """
+    Pacer, which blocks the sender until released.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.entered = threading.Event()
+        self.released = threading.Event()
+
+    def reserve(self) -> float:
+        self.entered.set()
+        self.released.wait(timeout=2)
+        return 0.0
+
+
+@pytest.fixture
+def udp_receiver():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(2)
+    yield receiver
+    receiver.close()
+
+
+def test_get_pacer():
+    assert isinstance(get_pacer(), NoPacer)
+    assert get_pacer(name='token_bucket', rate=10).rate == 10
+    with pytest.raises(ValueError):
+        get_pacer(name='unknown')
+
+
+def test_fixed_interval_pacer():
+    clock = FakeClock()
+    pacer = FixedIntervalPacer(rate=10, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        pacer.wait()
+    assert clock.sleeps == [0.1, 0.1]
+    # Sender was idle - next datagram is sent immediately
+    clock.now += 5
+    pacer.wait()
+    assert clock.sleeps == [0.1, 0.1]
+
+
+def test_token_bucket_pacer():
+    clock = FakeClock()
+    pacer = TokenBucketPacer(rate=100, burst=5, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        pacer.wait()
+    assert clock.sleeps == []
+    pacer.wait()
+    pacer.wait()
+    assert clock.sleeps == [0.01, 0.01]
+
+
+def test_encode_nmea_msgs():
+    assert encode_nmea_msgs(data=['!AIVDM\r\n', b'!AIVDM\r\n']) == [b'!AIVDM\r\n', b'!AIVDM\r\n']
+
+
+def test_udp_stream_send_data(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+    udp = UDPStream(clients=clients)
+    assert udp.send_data(data=[b'first\r\n', b'second\r\n']) == 2
+    assert udp_receiver.recv(1024) == b'first\r\n'
+    assert udp_receiver.recv(1024) == b'second\r\n'
+    udp.close()
+
+
+def test_udp_stream_run_reuses_socket(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+    udp = UDPStream(clients=clients)
+    udp_socket = udp.socket
+    udp.run(data=['first\r\n'])
+    assert udp_receiver.recv(1024) == b'first\r\n'
+    udp.run(data=['second\r\n'])
+    assert udp_receiver.recv(1024) == b'second\r\n'
+    assert udp.socket is udp_socket
+    udp.close()
+
+
+def test_udp_stream_queue_drop_oldest(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+    pacer = BlockingPacer()
+    udp = UDPStream(clients=clients, pacer=pacer, max_queue_size=2)
+    udp.run(data=['first\r\n'])
+    assert pacer.entered.wait(timeout=2)
+    # Sender is blocked - the oldest queued data is dropped
+    for data in ['second\r\n', 'third\r\n', 'fourth\r\n']:
+        udp.run(data=[data])
+    assert udp.stats.dropped == 1
+    pacer.released.set()
+    assert [udp_receiver.recv(1024) for _ in range(3)] == [b'first\r\n', b'third\r\n', b'fourth\r\n']
+    udp.close()
+
+
+def test_udp_stream_run_block(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+    pacer = BlockingPacer()
+    udp = UDPStream(clients=clients, pacer=pacer, max_queue_size=1)
+    udp.run(data=['first\r\n'])
+    assert pacer.entered.wait(timeout=2)
+    udp.run(data=['second\r\n'])
+    # Queue is full - producer waits for the sender instead of dropping the oldest data
+    producer = threading.Thread(target=udp.run, kwargs={'data': ['third\r\n'], 'block': True})
+    producer.start()
+    producer.join(timeout=0.1)
+    assert producer.is_alive()
+    pacer.released.set()
+    producer.join(timeout=2)
+    udp.flush()
+    assert udp.stats.dropped == 0
+    assert [udp_receiver.recv(1024) for _ in range(3)] == [b'first\r\n', b'second\r\n', b'third\r\n']
+    udp.close()
+
+
+def test_pacer_wait_async():
+    clock = FakeClock()
+    pacer = FixedIntervalPacer(rate=1000, clock=clock, sleep=clock.sleep)
+    assert pacer.reserve() == 0
+    assert round(pacer.reserve(), 6) == 0.001
+    asyncio.run(pacer.wait_async())
+    # Async wait does not use the blocking sleep
+    assert clock.sleeps == []
+
+
+def test_async_udp_stream(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+
+    async def send():
+        udp = AsyncUDPStream(clients=clients)
+        await udp.start()
+        sent_count = await udp.send_data(data=[b'first\r\n'])
+        udp.run(data=['second\r\n'])
+        # Let the sender task send the queued data
+        await asyncio.sleep(0.1)
+        await udp.close()
+        return sent_count
+
+    assert asyncio.run(send()) == 1
+    assert udp_receiver.recv(1024) == b'first\r\n'
+    assert udp_receiver.recv(1024) == b'second\r\n'
+
+
+def test_async_udp_stream_queue_drop_oldest(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+
+    async def send():
+        udp = AsyncUDPStream(clients=clients, max_queue_size=2)
+        await udp.start()
+        # Sender task does not run until the event loop is free - the oldest queued data is dropped
+        for data in ['first\r\n', 'second\r\n', 'third\r\n']:
+            udp.run(data=[data])
+        await asyncio.sleep(0.1)
+        await udp.close()
+        return udp.stats
+
+    stats = asyncio.run(send())
+    assert stats.dropped == 1
+    assert stats.datagrams == 2
+    assert udp_receiver.recv(1024) == b'second\r\n'
+    assert udp_receiver.recv(1024) == b'third\r\n'
+
+
+def test_group_nmea_sentences():
+    data = [b'!AIVDM,1,1,,A,1\r\n', b'!AIVDM,2,1,3,A,5\r\n', b'!AIVDM,2,2,3,A,8\r\n', b'!AIVDM,1,1,,A,2\r\n']
+    assert group_nmea_sentences(data=data) == [
+        b'!AIVDM,1,1,,A,1\r\n',
+        b'!AIVDM,2,1,3,A,5\r\n!AIVDM,2,2,3,A,8\r\n',
+        b'!AIVDM,1,1,,A,2\r\n'
+    ]
+
+
+def test_pack_datagrams(dummy_ais_tracks_list_single):
+    track = AISTrack(**dummy_ais_tracks_list_single[0])
+    data = encode_nmea_msgs(data=track.generate_nmea() * 20)
+    datagrams = pack_datagrams(data=data, max_size=500)
+    assert b''.join(datagrams) == b''.join(data)
+    for datagram in datagrams:
+        assert len(datagram) <= 500
+        sentences = datagram.splitlines(keepends=True)
+        # Type 5 msg parts are never split between datagrams
+        assert sentences[0].startswith((b'!AIVDM,1,1', b'!AIVDM,2,1'))
+        assert sentences[-1].startswith((b'!AIVDM,1,1', b'!AIVDM,2,2'))
+
+
+def test_pack_datagrams_msg_longer_than_max_size():
+    data = [b'!AIVDM,2,1,3,A,5\r\n', b'!AIVDM,2,2,3,A,8\r\n', b'!AIVDM,1,1,,A,2\r\n']
+    assert pack_datagrams(data=data, max_size=20) == [
+        b'!AIVDM,2,1,3,A,5\r\n!AIVDM,2,2,3,A,8\r\n',
+        b'!AIVDM,1,1,,A,2\r\n'
+    ]
+
+
+def test_udp_stream_packed_datagrams(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+    udp = UDPStream(clients=clients, datagram_size=MAX_DATAGRAM_SIZE)
+    udp.run(data=['!AIVDM,1,1,,A,1\r\n', '!AIVDM,1,1,,A,2\r\n'])
+    assert udp_receiver.recv(2048) == b'!AIVDM,1,1,,A,1\r\n!AIVDM,1,1,,A,2\r\n'
+    udp.close()
+
+
+def test_udp_stream_bulk(udp_receiver):
+    host, port = udp_receiver.getsockname()
+    clients = Clients(clients=[{'host': host, 'port': port}])
+    udp = UDPStream(clients=clients, bulk=True)
+    assert udp.send_data(data=[b'first\r\n', b'second\r\n']) == 2
+    assert udp_receiver.recv(1024) == b'first\r\n'
+    assert udp_receiver.recv(1024) == b'second\r\n'
+    assert udp.stats.datagrams == 2
+    udp.close()
+
+
+MULTICAST_GROUP = '239.255.77.77'
+
+
+@pytest.fixture
+def multicast_listeners():
+    """
+    Returns two sockets listening to the multicast group on the loopback interface.
+    """
+    listeners = []
+    try:
+        for _ in range(2):
+            listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            listeners.append(listener)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, 'SO_REUSEPORT'):
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            listener.bind(('', listeners[0].getsockname()[1]))
+            listener.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                                socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton('127.0.0.1'))
+            listener.settimeout(1)
+        # Check if multicast loopback is supported
+        probe = create_multicast_socket(group=MulticastGroup(group=MULTICAST_GROUP,
+                                                             port=listeners[0].getsockname()[1],
+                                                             interface='127.0.0.1'))
+        probe.sendto(b'probe', (MULTICAST_GROUP, listeners[0].getsockname()[1]))
+        probe.close()
+        for listener in listeners:
+            listener.recv(1024)
+    except OSError:
+        for listener in listeners:
+            listener.close()
+        pytest.skip('multicast loopback is not supported')
+    yield listeners
+    for listener in listeners:
+        listener.close()
+
+
+def test_create_multicast_socket():
+    group = MulticastGroup(group=MULTICAST_GROUP, port=1111, ttl=4, loopback=False, interface='127.0.0.1')
+    with create_multicast_socket(group=group) as sock:
+        assert sock.getsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL) == 4
+        assert sock.getsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP) == 0
+
+
+def test_udp_stream_multicast(multicast_listeners):
+    port = multicast_listeners[0].getsockname()[1]
+    clients = Clients(multicast=[{'group': MULTICAST_GROUP, 'port': port, 'interface': '127.0.0.1'}])
+    udp = UDPStream(clients=clients)
+    data = [f'!AIVDM,1,1,,A,{number}\r\n'.encode() for number in range(10)]
+    # Each datagram is sent once
+    assert udp.send_data(data=data) == 10
+    udp.close()
+    streams = [[listener.recv(1024) for _ in range(10)] for listener in multicast_listeners]
+    assert streams[0] == streams[1] == data
@@ -0,0 +1,97 @@
+import socket
+import time
+
+import pytest
+
+from nmea.nmea_tcp import TCPConnection, TCPServerStream
+
+
+class FakeSocket:
+    def __init__(self, limit: int = 1 << 20) -> None:
+        self.data = b''
+        self.limit = limit
+
+    def send(self, data) -> int:
+        sent = bytes(data[:self.limit])
+        if not sent:
+            raise BlockingIOError
+        self.data += sent
+        return len(sent)
+
+
+def receive(sock: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        data += sock.recv(size - len(data))
+    return data
+
+
+def wait_for_connections(server: TCPServerStream, count: int) -> None:
+    deadline = time.monotonic() + 2
+    while len(server.connections) != count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(server.connections) == count
+
+
+def test_tcp_connection_drop_oldest():
+    connection = TCPConnection(sock=FakeSocket(), address=('127.0.0.1', 1111))
+    for chunk in [b'1111', b'2222', b'3333']:
+        connection.push(chunk=chunk, now=0, max_queue_bytes=8, drop_policy='drop_oldest')
+    assert [chunk for chunk, _ in connection.queue] == [b'2222', b'3333']
+    assert connection.stats.chunks_dropped == 1
+
+
+def test_tcp_connection_partially_sent_chunk_not_dropped():
+    connection = TCPConnection(sock=FakeSocket(limit=2), address=('127.0.0.1', 1111))
+    connection.push(chunk=b'1111', now=0, max_queue_bytes=8, drop_policy='drop_oldest')
+    # Socket send buffer is full after 2 bytes
+    connection.send(now=1)
+    assert connection.offset == 2
+    connection.push(chunk=b'2222', now=1, max_queue_bytes=8, drop_policy='drop_oldest')
+    connection.push(chunk=b'3333', now=1, max_queue_bytes=8, drop_policy='drop_oldest')
+    assert [chunk for chunk, _ in connection.queue] == [b'1111', b'3333']
+    connection.socket.limit = 100
+    connection.send(now=2)
+    assert connection.socket.data == b'11113333'
+    assert connection.stats.max_lag == 2
+
+
+def test_tcp_connection_disconnect_policy():
+    connection = TCPConnection(sock=FakeSocket(), address=('127.0.0.1', 1111))
+    connection.push(chunk=b'1111', now=0, max_queue_bytes=6, drop_policy='disconnect')
+    connection.push(chunk=b'2222', now=0, max_queue_bytes=6, drop_policy='disconnect')
+    assert connection.closing
+
+
+def test_tcp_server_stream():
+    server = TCPServerStream(host='127.0.0.1', port=0)
+    clients = [socket.create_connection(server.address, timeout=2) for _ in range(2)]
+    wait_for_connections(server=server, count=2)
+    server.run(data=['!AIVDM,1\r\n', '!AIVDM,2\r\n'])
+    for client in clients:
+        assert receive(sock=client, size=20) == b'!AIVDM,1\r\n!AIVDM,2\r\n'
+        client.close()
+    wait_for_connections(server=server, count=0)
+    assert [stats.bytes_sent for stats in server.stats] == [20, 20]
+    server.close()
+
+
+def test_tcp_server_stream_slow_reader_does_not_block():
+    server = TCPServerStream(host='127.0.0.1', port=0, max_queue_bytes=1 << 16)
+    client = socket.create_connection(server.address, timeout=2)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    wait_for_connections(server=server, count=1)
+    start = time.monotonic()
+    # Client does not read - queued data is dropped instead of blocking
+    for _ in range(200):
+        server.run(data=[b'!AIVDM,1,1,,A,14`Uw2hP5NQEPUBOaldKf9Gp0D7k,0*6E\r\n' * 100])
+    assert time.monotonic() - start < 1
+    time.sleep(0.1)
+    assert server.stats[0].chunks_dropped > 0
+    client.close()
+    server.close()
+
+
+def test_tcp_server_stream_invalid_drop_policy():
+    with pytest.raises(ValueError):
+        TCPServerStream(host='127.0.0.1', port=0, drop_policy='unknown')
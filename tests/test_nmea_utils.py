@@ -11,7 +11,15 @@ from nmea.nmea_utils import (
     add_padding,
     add_padding_0_bits,
     convert_ais_payload_to_bits,
-    nmea_checksum
+    nmea_checksum,
+    xor_checksum,
+    armor_payload,
+    dearmor_payload,
+    encode_sixbit_text,
+    decode_sixbit_text,
+    SIXBIT_ARMOR_TABLE,
+    SIXBIT_DEARMOR_TABLE,
+    ASCII6_TABLE
 )
 
 
@@ -213,3 +221,79 @@ def test_nmea_checksum_incorrect():
     assert checksum != 'XX'
     checksum = nmea_checksum('XXXXX')
     assert checksum != '2C'
+
+
+def test_xor_checksum():
+    assert xor_checksum(b'') == 0
+    assert xor_checksum(b'A') == 0x41
+    assert xor_checksum(b'AIVDM,2,2,8,A,88888888880,2') == 0x2C
+    # Data longer than a single fold
+    data = bytes(range(256)) * 3 + b'AIVDM'
+    check_sum = 0
+    for num in data:
+        check_sum ^= num
+    assert xor_checksum(data) == check_sum
+
+
+def test_nmea_checksum_leading_zero():
+    assert nmea_checksum('AA') == '00'
+    assert nmea_checksum('\x0a') == '0A'
+
+
+def test_armor_payload():
+    payload_bits = '0001010001010011110111011010101001100000000000100010110110000010111110110011000110001111000' \
+                   '11011100010000010000000010101011000010101001010000000010000100100000100010000010100110110000' \
+                   '010000010000010000010000010000010000010000010000001000110011100001001000110000001011111000101' \
+                   '010111101110000000011110100011100001010101111000000110010011110100100010111000001000001000001' \
+                   '000001000001000001000001000001000001000001000001000000000'
+    # Drop fill-bits
+    payload_bits = payload_bits[:424]
+    payload, fill_bits = armor_payload(value=int(payload_bits, 2), bits_count=len(payload_bits))
+    assert payload == '55?MbV02;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp888888888880'
+    assert fill_bits == 2
+
+
+def test_sixbit_lookup_tables():
+    assert len(SIXBIT_ARMOR_TABLE) == 64
+    assert len(SIXBIT_DEARMOR_TABLE) == 128
+    assert len(ASCII6_TABLE) == 128
+    for decimal in range(64):
+        assert SIXBIT_DEARMOR_TABLE[SIXBIT_ARMOR_TABLE[decimal]] == decimal
+    assert ASCII6_TABLE[ord('@')] == 0
+    assert ASCII6_TABLE[ord('?')] == 63
+    assert ASCII6_TABLE[ord('a')] == 0xff
+
+
+def test_dearmor_payload():
+    for payload in ['1', '13', '133m@ogP00PD;88MD5MTDww@0D7k', '88888888880', 'w' * 99]:
+        value = dearmor_payload(payload=payload.encode())
+        assert armor_payload(value=value, bits_count=len(payload) * 6) == (payload, 0)
+
+
+def test_dearmor_payload_invalid_char():
+    with pytest.raises(ValueError):
+        dearmor_payload(payload=b'133m@ogP00PD;88MD5MTDxx@0D7k')
+    with pytest.raises(ValueError):
+        dearmor_payload(payload=b'13\xff')
+
+
+def test_encode_sixbit_text():
+    assert encode_sixbit_text(text='AB', chars_count=2) == 0b000001000010
+    # Padded with spaces (ASCII6 code 32)
+    assert encode_sixbit_text(text='A', chars_count=2) == 0b000001100000
+    assert encode_sixbit_text(text='ABC', chars_count=2) == 0b000001000010
+    assert encode_sixbit_text(text='', chars_count=0) == 0
+
+
+def test_encode_sixbit_text_invalid_char():
+    with pytest.raises(ValueError):
+        encode_sixbit_text(text='ab', chars_count=2)
+    with pytest.raises(ValueError):
+        encode_sixbit_text(text='\u00c5B', chars_count=2)
+
+
+def test_decode_sixbit_text():
+    text = 'EVER DIADEM'
+    assert decode_sixbit_text(value=encode_sixbit_text(text=text, chars_count=20), chars_count=20) == text
+    # '@' padding removed
+    assert decode_sixbit_text(value=0b000001000000, chars_count=2) == 'A'